@@ -0,0 +1,127 @@
+"""Compare pickled models against slim artifacts and enforce the size budget.
+
+Run from the Backend directory:
+    python benchmarks/artifact_budget.py
+
+Exits non-zero if an artifact is over budget, is not enough smaller than
+the pickle, or forecasts differently from the model it was built from.
+tests/test_artifact_budget.py runs the same checks under pytest.
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from forecasting import DengueForecastingSystem
+from forecasting_covid import CovidForecastModel
+from model_artifacts import (
+    COVID_MAX_BYTES, DENGUE_MAX_BYTES,
+    load_covid_artifact, load_dengue_artifact,
+    save_covid_artifact, save_dengue_artifact,
+)
+
+# Minimum pickle/artifact size ratio. Flattened trees keep every node
+# losslessly (14 vs ~72 bytes), so the dengue ensemble cannot reach 10x.
+MIN_SIZE_RATIO = {"covid_forecaster": 10, "dengue_forecaster": 4}
+LOAD_REPEATS = 5
+
+
+def synthetic_daily_hospitalized(days: int = 365, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    t = np.arange(days)
+    wave = 800 * np.exp(-((t - days * 0.6) ** 2) / (2 * (days / 8) ** 2))
+    hospitalized = np.maximum(0, wave + rng.normal(0, 30, days)).astype(int)
+    dates = pd.date_range("2020-03-01", periods=days, freq="D")
+    return pd.DataFrame({"date": dates.strftime("%Y-%m-%d"), "hospitalized": hospitalized})
+
+
+def synthetic_weekly_dengue(weeks: int = 260, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2020-01-05", periods=weeks, freq="W")
+    monsoon = dates.month.isin([6, 7, 8, 9])
+    rainfall = np.where(monsoon, 180, 30) + rng.gamma(2, 15, weeks)
+    cases = 40 + 0.6 * np.roll(rainfall, 3) + rng.normal(0, 10, weeks)
+    return pd.DataFrame({
+        "date": dates.strftime("%Y-%m-%d"),
+        "reported_cases": np.maximum(cases, 0).astype(int),
+        "rainfall_mm": rainfall,
+    })
+
+
+def dir_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+
+
+def time_load(load, path: str):
+    timings = []
+    for _ in range(LOAD_REPEATS):
+        start = time.perf_counter()
+        load(path)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    model = load(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return model, float(np.median(timings)), peak
+
+
+def compare(name, model, save_artifact, load_artifact, max_bytes, forecast, workdir):
+    pkl_path = os.path.join(workdir, f"{name}.pkl")
+    artifact_path = os.path.join(workdir, name)
+    joblib.dump(model, pkl_path)
+    save_artifact(model, artifact_path)
+
+    pkl_bytes = os.path.getsize(pkl_path)
+    artifact_bytes = dir_size(artifact_path)
+    _, pkl_load, pkl_peak = time_load(joblib.load, pkl_path)
+    restored, artifact_load, artifact_peak = time_load(load_artifact, artifact_path)
+
+    print(f"{name}:")
+    print(f"  disk   pickle {pkl_bytes:>10,} B   artifact {artifact_bytes:>10,} B   ({pkl_bytes / artifact_bytes:.1f}x)")
+    print(f"  load   pickle {pkl_load * 1000:>10.2f} ms  artifact {artifact_load * 1000:>10.2f} ms")
+    print(f"  alloc  pickle {pkl_peak:>10,} B   artifact {artifact_peak:>10,} B")
+
+    failures = []
+    if artifact_bytes > max_bytes:
+        failures.append(f"{name}: artifact is {artifact_bytes} B, budget is {max_bytes} B")
+    if pkl_bytes / artifact_bytes < MIN_SIZE_RATIO[name]:
+        failures.append(f"{name}: artifact is only {pkl_bytes / artifact_bytes:.1f}x smaller than the pickle")
+    if not np.allclose(forecast(model), forecast(restored), rtol=1e-6):
+        failures.append(f"{name}: restored model forecasts differ from the original")
+    return failures
+
+
+def main() -> int:
+    covid = CovidForecastModel()
+    covid.run_pipeline(synthetic_daily_hospitalized())
+
+    dengue = DengueForecastingSystem(df=synthetic_weekly_dengue())
+    dengue.train_ensemble()
+
+    failures = []
+    with tempfile.TemporaryDirectory() as workdir:
+        failures += compare(
+            "covid_forecaster", covid, save_covid_artifact, load_covid_artifact, COVID_MAX_BYTES,
+            lambda m: [f["predicted_cases"] for f in m.get_forecast(steps=8)["forecasts"]], workdir,
+        )
+        failures += compare(
+            "dengue_forecaster", dengue, save_dengue_artifact, load_dengue_artifact, DENGUE_MAX_BYTES,
+            lambda m: m.forecast(weeks=8)["cases_predicted"].to_numpy(), workdir,
+        )
+
+    for failure in failures:
+        print("FAIL", failure)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
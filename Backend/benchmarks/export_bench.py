@@ -0,0 +1,144 @@
+"""Memory and throughput of the streaming table exports.
+
+Run from the Backend directory:
+    python benchmarks/export_bench.py --rows 100000,1000000 --max-growth 1.5
+
+For each size, fills a throwaway dengue.db with synthetic forecasts (the
+composite-key table) and drains stream_export() as NDJSON and as CSV,
+recording rows/s and the tracemalloc peak. For comparison it also
+measures the pattern the trend endpoint uses: fetchall() into a list of
+dicts. Paging with --page-rows and following the cursors must reproduce
+the single-stream export byte for byte.
+
+The exit status is non-zero if the streaming peak at the largest size is
+more than --max-growth times that at the smallest, or if paging differs.
+"""
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import table_export
+from table_export import stream_export
+
+
+def fill_forecasts(conn: sqlite3.Connection, rows: int, horizon: int = 28) -> None:
+    first = date(2000, 1, 1)
+
+    def generate():
+        for i in range(rows):
+            made, ahead = divmod(i, horizon)
+            forecast_date = first + timedelta(days=made)
+            cases = 100 + (i * 7919) % 400
+            yield (forecast_date.isoformat(), (forecast_date + timedelta(days=ahead + 1)).isoformat(),
+                   cases, cases * 0.8, cases * 1.2)
+
+    conn.execute("""
+        CREATE TABLE forecasts (forecast_date TEXT, prediction_date TEXT, cases_predicted REAL,
+                                lower_ci REAL, upper_ci REAL, PRIMARY KEY (forecast_date, prediction_date))
+    """)
+    conn.executemany("INSERT INTO forecasts VALUES (?, ?, ?, ?, ?)", generate())
+    conn.commit()
+
+
+def drain(fmt: str, after=None, limit=None):
+    """(sha256 of the body, bytes, next cursor)"""
+    headers, body = stream_export("forecasts", fmt, after, limit)
+    digest, size = hashlib.sha256(), 0
+    for data in body:
+        digest.update(data)
+        size += len(data)
+    return digest, size, headers.get("X-Next-Cursor")
+
+
+def traced(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak / 2 ** 20
+
+
+def materialized() -> int:
+    conn = sqlite3.connect("db/dengue.db")
+    cursor = conn.execute("SELECT * FROM forecasts ORDER BY forecast_date, prediction_date")
+    names = [description[0] for description in cursor.description]
+    rows = [dict(zip(names, row)) for row in cursor.fetchall()]
+    conn.close()
+    return len(rows)
+
+
+def paged_matches(fmt: str, page_rows: int) -> bool:
+    """Concatenated pages (CSV headers after the first dropped) equal the single stream"""
+    whole = drain(fmt)[0].hexdigest()
+    digest, cursor, first = hashlib.sha256(), None, True
+    while True:
+        headers, body = stream_export("forecasts", fmt, cursor, page_rows)
+        for k, data in enumerate(body):
+            if fmt == "csv" and k == 0 and not first:
+                continue
+            digest.update(data)
+        first = False
+        cursor = headers.get("X-Next-Cursor")
+        if cursor is None:
+            return digest.hexdigest() == whole
+
+
+def measure(rows: int, page_rows: int) -> dict:
+    os.chdir(tempfile.mkdtemp(prefix="export-bench-"))
+    os.makedirs("db")
+    conn = sqlite3.connect("db/dengue.db")
+    fill_forecasts(conn, rows)
+    conn.close()
+
+    result = {"rows": rows}
+    for fmt in table_export.EXPORT_FORMATS:
+        (_, size, _), elapsed, peak = traced(lambda: drain(fmt))
+        result[fmt] = {"rows_per_s": round(rows / elapsed), "mb": round(size / 2 ** 20, 1), "peak_mb": round(peak, 2)}
+    _, elapsed, peak = traced(materialized)
+    result["fetchall"] = {"rows_per_s": round(rows / elapsed), "peak_mb": round(peak, 2)}
+    result["paging_ok"] = all(paged_matches(fmt, page_rows) for fmt in table_export.EXPORT_FORMATS)
+    return result
+
+
+def main(args) -> int:
+    levels = [int(rows) for rows in args.rows.split(",")]
+    print(f"chunks of {table_export.EXPORT_CHUNK_ROWS} rows")
+    print(f"  {'rows':>9} {'ndjson rows/s':>14} {'peak MB':>8} {'csv rows/s':>11} {'peak MB':>8} "
+          f"{'fetchall peak MB':>17} {'paging':>7}")
+    results = []
+    for rows in levels:
+        row = measure(rows, args.page_rows)
+        results.append(row)
+        print(f"  {rows:>9} {row['ndjson']['rows_per_s']:>14} {row['ndjson']['peak_mb']:>8.2f} "
+              f"{row['csv']['rows_per_s']:>11} {row['csv']['peak_mb']:>8.2f} "
+              f"{row['fetchall']['peak_mb']:>17.2f} {'ok' if row['paging_ok'] else 'DIFF':>7}")
+
+    failures = []
+    for fmt in table_export.EXPORT_FORMATS:
+        growth = results[-1][fmt]["peak_mb"] / results[0][fmt]["peak_mb"]
+        if growth > args.max_growth:
+            failures.append(f"{fmt} peak memory grew {growth:.2f}x")
+    if not all(row["paging_ok"] for row in results):
+        failures.append("paged export differs from the single stream")
+    print("PASS" if not failures else f"FAIL ({'; '.join(failures)})")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", default="100000,1000000", help="comma-separated table sizes")
+    parser.add_argument("--page-rows", type=int, default=25000, help="page size for the cursor check")
+    parser.add_argument("--max-growth", type=float, default=1.5,
+                        help="allowed ratio of streaming peak memory, largest size over smallest")
+    sys.exit(main(parser.parse_args()))
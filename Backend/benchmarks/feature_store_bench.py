@@ -0,0 +1,151 @@
+"""Memory and speed of the dengue feature store against the pandas feature frame it replaced.
+
+Run from the Backend directory:
+    python benchmarks/feature_store_bench.py --weeks 260,26000 --min-memory-ratio 3
+
+For each history length (synthetic.dengue_data in seeded chunks; 26000
+weeks is 100x the 260 the API trains on), times:
+
+    legacy      the shift/rolling/dropna frame prepare_data used to build
+                (reproduced here), and the bytes it kept
+    store       FeatureStore over the same data; the bytes reported are
+                what a prepared DengueForecastingSystem keeps (its store
+                plus the raw forecast tail in self.df)
+    train       DengueForecastingSystem.train_ensemble (reference profile)
+    forecast    DengueForecastingSystem.forecast(weeks=4)
+
+The store keeps about a third of the legacy bytes per row: 32 B of
+float32 features, an 8 B target, an 8 B date and a 1 B row mask, against
+~153 B of raw, lag, calendar and rolling-mean columns. The store must
+reproduce the legacy features (as float32) and keep the same rows. The
+exit status is non-zero if it does not, if it keeps more than
+1/--min-memory-ratio of the legacy frame's bytes, or if it builds slower
+than the legacy frame at the largest size.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import synthetic
+from feature_store import FeatureStore
+from forecasting import FEATURE_COLS, DengueForecastingSystem
+
+
+def history(weeks: int, seed: int, chunk: int = 5200) -> pd.DataFrame:
+    """synthetic.dengue_data beyond the ~250 years its 2015 start allows: seeded chunks, redated from 1700"""
+    frames = [synthetic.dengue_data(min(chunk, weeks - start), seed + k)
+              for k, start in enumerate(range(0, weeks, chunk))]
+    df = pd.concat(frames, ignore_index=True)
+    df["date"] = pd.date_range("1700-01-03", periods=weeks, freq="W").strftime("%Y-%m-%d")
+    return df
+
+
+def legacy_features(df: pd.DataFrame) -> pd.DataFrame:
+    """The frame prepare_data kept before the feature store"""
+    df = df.copy()
+    df['date'] = pd.to_datetime(df['date'])
+    df = df.sort_values('date').set_index('date')
+    for lag in [1, 2, 3, 4]:
+        df[f'cases_lag{lag}'] = df['reported_cases'].shift(lag)
+        df[f'rainfall_lag{lag}'] = df['rainfall_mm'].shift(lag)
+    df['month'] = df.index.month
+    df['week_of_year'] = df.index.isocalendar().week
+    df['is_monsoon'] = df.index.month.isin([6, 7, 8, 9]).astype(int)
+    for window in [4, 8, 12]:
+        df[f'cases_ma_{window}'] = df['reported_cases'].rolling(window).mean()
+        df[f'rainfall_ma_{window}'] = df['rainfall_mm'].rolling(window).mean()
+    return df.dropna()
+
+
+def store_features(df: pd.DataFrame) -> FeatureStore:
+    frame = df.copy()
+    frame['date'] = pd.to_datetime(frame['date'])
+    frame = frame.sort_values('date').set_index('date')
+    return FeatureStore(frame.index.values, frame['reported_cases'].to_numpy(dtype=np.float64),
+                        frame['rainfall_mm'].to_numpy(dtype=np.float64), FEATURE_COLS)
+
+
+def timed(fn, repeats: int):
+    """(median ms, tracemalloc peak MB of one more run, its result)"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    tracemalloc.start()
+    result = fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(timings), peak / 2 ** 20, result
+
+
+def measure(weeks: int, repeats: int, seed: int) -> dict:
+    df = history(weeks, seed)
+    legacy_ms, legacy_peak, legacy = timed(lambda: legacy_features(df), repeats)
+    store_ms, store_peak, store = timed(lambda: store_features(df), repeats)
+
+    expected = legacy[FEATURE_COLS].to_numpy(dtype=np.float64).astype(np.float32)
+    matches = (np.array_equal(store.dates, legacy.index.values)
+               and np.allclose(store.X, expected, rtol=1e-6, atol=1e-4)
+               and np.array_equal(store.y, legacy['reported_cases'].to_numpy(dtype=np.float64)))
+
+    system = DengueForecastingSystem(df=df)
+    legacy_bytes = int(legacy.memory_usage(deep=True).sum())
+    kept_bytes = system.features.nbytes + int(system.df.memory_usage(deep=True).sum())
+    start = time.perf_counter()
+    system.train_ensemble("reference", 0)
+    train_s = time.perf_counter() - start
+    forecast_ms = timed(lambda: system.forecast(weeks=4), repeats)[0]
+
+    return {
+        "weeks": weeks,
+        "legacy_ms": round(legacy_ms, 2), "store_ms": round(store_ms, 2),
+        "legacy_peak_mb": round(legacy_peak, 2), "store_peak_mb": round(store_peak, 2),
+        "legacy_kept_mb": round(legacy_bytes / 2 ** 20, 3), "store_kept_mb": round(kept_bytes / 2 ** 20, 3),
+        "memory_ratio": round(legacy_bytes / kept_bytes, 2),
+        "train_s": round(train_s, 2), "forecast_ms": round(forecast_ms, 2),
+        "matches": matches,
+    }
+
+
+def main(args) -> int:
+    levels = [int(weeks) for weeks in args.weeks.split(",")]
+    print(f"  {'weeks':>6} {'legacy ms':>10} {'store ms':>9} {'legacy MB':>10} {'store MB':>9} {'ratio':>6} "
+          f"{'peak MB (legacy/store)':>23} {'train s':>8} {'forecast ms':>12} {'match':>6}")
+    rows = []
+    for weeks in levels:
+        row = measure(weeks, args.repeats, args.seed)
+        rows.append(row)
+        peaks = f"{row['legacy_peak_mb']:.2f}/{row['store_peak_mb']:.2f}"
+        print(f"  {weeks:>6} {row['legacy_ms']:>10.2f} {row['store_ms']:>9.2f} {row['legacy_kept_mb']:>10.3f} "
+              f"{row['store_kept_mb']:>9.3f} {row['memory_ratio']:>6.2f} {peaks:>23} {row['train_s']:>8.2f} {row['forecast_ms']:>12.2f} "
+              f"{'ok' if row['matches'] else 'DIFF':>6}")
+
+    failures = []
+    if not all(row["matches"] for row in rows):
+        failures.append("store features differ from the legacy frame")
+    for row in rows:
+        if row["memory_ratio"] < args.min_memory_ratio:
+            failures.append(f"store keeps 1/{row['memory_ratio']:.2f} of the legacy bytes at {row['weeks']} weeks")
+    if rows[-1]["store_ms"] > rows[-1]["legacy_ms"]:
+        failures.append(f"store builds slower than the legacy frame at {rows[-1]['weeks']} weeks")
+    print("PASS" if not failures else f"FAIL ({'; '.join(failures)})")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--weeks", default="260,26000", help="comma-separated history lengths")
+    parser.add_argument("--repeats", type=int, default=7)
+    parser.add_argument("--min-memory-ratio", type=float, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,175 @@
+"""Replayable local stand-in for the external HTTP APIs.
+
+Serves recorded (or synthetic) JSON payloads by request path, with
+configurable latency and failure injection, so the upstream clients can be
+tested and benchmarked offline.
+
+Serve the fixtures in benchmarks/fixtures (synthetic data if none recorded):
+    python benchmarks/fixture_server.py --port 8900 --latency-ms 150
+    NATIONAL_API_URL=http://127.0.0.1:8900/v1/covid19 \
+    GROQ_API_URL=http://127.0.0.1:8900/openai/v1/chat/completions uvicorn main:app
+
+Record a real response once (uses NATIONAL_API_KEY from the environment):
+    python benchmarks/fixture_server.py --record "https://api.api-ninjas.com/v1/covid19?country=India"
+"""
+
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import numpy as np
+import pandas as pd
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+NATIONAL_PATH = "/v1/covid19"
+GROQ_PATH = "/openai/v1/chat/completions"
+
+
+def synthetic_national_payload(days: int = 1100, seed: int = 7) -> list:
+    """api-ninjas /v1/covid19 shaped response with a few epidemic waves"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(days)
+    waves = sum(
+        peak * np.exp(-((t - center) ** 2) / (2 * width ** 2))
+        for peak, center, width in [(90000, 240, 45), (380000, 470, 30), (300000, 740, 20)]
+    )
+    new = np.maximum(0, waves + rng.normal(0, 2000, days)).astype(int)
+    total = np.cumsum(new)
+    dates = pd.date_range("2020-01-22", periods=days, freq="D").strftime("%Y-%m-%d")
+    cases = {d: {"total": int(tot), "new": int(n)} for d, tot, n in zip(dates, total, new)}
+    return [{
+        "country": "India",
+        "region": "",
+        "cases": cases,
+        "active_cases": int(new[-14:].sum()),
+        "recovered": int(total[-1] * 0.98),
+        "deaths": int(total[-1] * 0.012),
+    }]
+
+
+def groq_completion(body: bytes) -> dict:
+    """OpenAI-style chat completion in the format routes/recommendations.py parses"""
+    content = (
+        "1. Move stable patients to step-down wards to free ICU beds.\n"
+        "2. Request ventilators and oxygen from neighbouring districts.\n"
+        "3. Recall off-duty nurses and postpone elective procedures.\n"
+        "Explanation: Demand is forecast to exceed critical resources within a week, "
+        "so capacity has to be freed and supplemented before admissions peak."
+    )
+    model = json.loads(body or b"{}").get("model", "llama3-8b-8192")
+    return {
+        "object": "chat.completion",
+        "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+    }
+
+
+def fixture_file(path: str) -> str:
+    return os.path.join(FIXTURES_DIR, path.strip("/").replace("/", "__") + ".json")
+
+
+def load_fixtures(fixtures_dir: str = FIXTURES_DIR) -> Dict[str, object]:
+    """Recorded payloads by request path, with synthetic national data and a canned Groq reply as defaults"""
+    fixtures = {NATIONAL_PATH: synthetic_national_payload(), GROQ_PATH: groq_completion}
+    if os.path.isdir(fixtures_dir):
+        for name in os.listdir(fixtures_dir):
+            if name.endswith(".json"):
+                with open(os.path.join(fixtures_dir, name)) as f:
+                    fixtures["/" + name[:-5].replace("__", "/")] = json.load(f)
+    return fixtures
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real APIs
+
+    def _respond(self) -> None:
+        server = self.server
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        server.requests += 1
+
+        delay = server.latency + random.uniform(0, server.jitter)
+        if delay:
+            time.sleep(delay)
+
+        path = urlparse(self.path).path
+        if random.random() < server.fail_rate:
+            status, payload = 503, {"error": "injected failure"}
+        elif path in server.fixtures:
+            fixture = server.fixtures[path]
+            status, payload = 200, fixture(body) if callable(fixture) else fixture
+        else:
+            status, payload = 404, {"error": f"no fixture for {path}"}
+
+        encoded = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    do_GET = _respond
+    do_POST = _respond
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fixture_server(fixtures: Optional[Dict[str, object]] = None, port: int = 0,
+                         latency_ms: float = 0, jitter_ms: float = 0, fail_rate: float = 0.0) -> ThreadingHTTPServer:
+    """Start the server in a daemon thread; base URL is http://127.0.0.1:<server.server_port>
+
+    A fixture is either a JSON-serialisable payload or a callable taking the
+    raw request body and returning one.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), FixtureHandler)
+    server.daemon_threads = True
+    server.fixtures = fixtures if fixtures is not None else load_fixtures()
+    server.latency = latency_ms / 1000
+    server.jitter = jitter_ms / 1000
+    server.fail_rate = fail_rate
+    server.requests = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def record(url: str) -> str:
+    import requests
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    response = requests.get(url, headers={"X-Api-Key": os.getenv("NATIONAL_API_KEY") or ""}, timeout=30)
+    response.raise_for_status()
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    path = fixture_file(urlparse(url).path)
+    with open(path, "w") as f:
+        json.dump(response.json(), f)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--record", metavar="URL")
+    args = parser.parse_args()
+
+    if args.record:
+        print("recorded", record(args.record))
+    else:
+        server = start_fixture_server(port=args.port, latency_ms=args.latency_ms,
+                                      jitter_ms=args.jitter_ms, fail_rate=args.fail_rate)
+        print(f"serving {sorted(server.fixtures)} on http://127.0.0.1:{server.server_port}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            server.shutdown()
@@ -0,0 +1,237 @@
+"""HTTP load test of the whole API against local stand-ins for api-ninjas and Groq.
+
+Run from the Backend directory:
+    python benchmarks/load_test.py --levels 1,8,32,64 --duration 20 --upstream-latency-ms 150
+
+Seeds throwaway databases and the Bangalore CSV in a temp directory with
+benchmarks/synthetic.py data, and starts benchmarks/fixture_server.py for
+the external APIs. It then runs `uvicorn main:app` there as a separate
+process, pointed at the fixture server through NATIONAL_API_URL and
+GROQ_API_URL.
+
+Virtual users replay page views in the proportions of PAGES. Each view
+issues that page's requests concurrently, as the React components do. At
+each concurrency level, the report gives per-endpoint throughput,
+p50/p95/p99 latency and error rate. The SSE stream the dashboards also
+open is covered by overload_alerts_swarm.py.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import httpx
+import numpy as np
+import pandas as pd
+
+from benchmarks import synthetic
+from benchmarks.fixture_server import GROQ_PATH, NATIONAL_PATH, start_fixture_server
+
+# Page -> (share of page views, requests it fires together)
+PAGES = {
+    "DashboardCovid": (30, [("GET", "/api/dashboard/covid")]),
+    "DashboardDengue": (30, [("GET", "/api/dashboard/dengue")]),
+    "NationalOverview": (12, [("GET", "/api/national/summary"), ("GET", "/api/national/plots")]),
+    "DistrictOverview": (12, [("GET", "/api/district/bangalore/plots"), ("GET", "/api/district/bangalore/summary")]),
+    "Resources": (12, [("GET", "/api/resources/hospital-resources/latest"),
+                       ("GET", "/api/resources/hospital-resources/trend")]),
+    "Recommendation_bot": (4, [("POST", "/api/llm/recommendation")]),
+}
+
+
+def dates_ending(end: datetime, periods: int, freq: str):
+    """Shift a synthetic series so that it ends today"""
+    return pd.date_range(end=end, periods=periods, freq=freq).strftime("%Y-%m-%d")
+
+
+def seed_workdir(workdir: str, seed: int = 42) -> None:
+    """Databases, CSV and directories main.py expects, filled with synthetic data"""
+    for name in ("db", "data", "static", "cache"):
+        os.makedirs(os.path.join(workdir, name), exist_ok=True)
+    today = datetime.today()
+
+    synthetic.bangalore_csv(730, seed).to_csv(os.path.join(workdir, "data", "df_bangalore_urban.csv"), index=False)
+
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        from database import init_db
+        from database_covid import init_db_covid
+        init_db()
+        init_db_covid()
+    finally:
+        os.chdir(cwd)
+
+    conn = sqlite3.connect(os.path.join(workdir, "db", "dengue.db"))
+    try:
+        dengue = synthetic.dengue_data(260, seed)
+        dengue["date"] = dates_ending(today, len(dengue), "W")
+        dengue.to_sql("dengue_data", conn, if_exists="append", index=False)
+        resources = synthetic.hospital_resource_timeseries(90, 20, seed)
+        resources["date"] = dates_ending(today, len(resources), "D")
+        resources.to_sql("hospital_resource_timeseries", conn, if_exists="append", index=False)
+        next_sunday = today + timedelta(days=(6 - today.weekday()) % 7 or 7)
+        conn.execute("INSERT INTO forecasts VALUES (?, ?, ?, ?, ?)",
+                     (today.strftime("%Y-%m-%d"), next_sunday.strftime("%Y-%m-%d"), 500.0, 425.0, 575.0))
+        conn.commit()
+    finally:
+        conn.close()
+
+    conn = sqlite3.connect(os.path.join(workdir, "db", "covid_data.db"))
+    try:
+        cases = synthetic.bangalore_cases(730, seed)
+        cases["date"] = dates_ending(today, len(cases), "D")
+        cases.to_sql("bangalore_cases", conn, if_exists="append", index=False)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def start_server(workdir: str, port: int, workers: int, upstream: str) -> subprocess.Popen:
+    env = dict(os.environ,
+               PYTHONPATH=BACKEND_DIR + os.pathsep + os.environ.get("PYTHONPATH", ""),
+               NATIONAL_API_URL=f"{upstream}{NATIONAL_PATH}?country=India",
+               NATIONAL_API_KEY="load-test",
+               GROQ_API_URL=f"{upstream}{GROQ_PATH}",
+               GROQ_API_KEY="load-test")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=workdir, env=env)
+
+
+async def wait_until_ready(client: httpx.AsyncClient, process: subprocess.Popen, timeout: float = 300) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with status {process.returncode}")
+        try:
+            if (await client.get("/openapi.json")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.5)
+    raise RuntimeError("server did not start in time")
+
+
+async def request(client: httpx.AsyncClient, method: str, path: str, samples) -> None:
+    start = time.perf_counter()
+    try:
+        response = await client.request(method, path, json={} if method == "POST" else None)
+        ok = response.status_code < 400
+    except httpx.HTTPError:
+        ok = False
+    samples[f"{method} {path}"].append((time.perf_counter() - start, ok))
+
+
+async def virtual_user(client, rng, deadline: float, think_s: float, samples) -> None:
+    names = list(PAGES)
+    weights = np.array([PAGES[name][0] for name in names], dtype=float)
+    weights /= weights.sum()
+    while time.perf_counter() < deadline:
+        _, requests = PAGES[names[rng.choice(len(names), p=weights)]]
+        await asyncio.gather(*(request(client, method, path, samples) for method, path in requests))
+        if think_s:
+            await asyncio.sleep(rng.exponential(think_s))
+
+
+def summarise(samples, elapsed: float):
+    rows = {}
+    for endpoint, values in sorted(samples.items()):
+        latencies = np.array([latency for latency, _ in values]) * 1000
+        errors = sum(not ok for _, ok in values)
+        rows[endpoint] = {
+            "requests": len(values),
+            "rps": round(len(values) / elapsed, 2),
+            "p50_ms": round(float(np.percentile(latencies, 50)), 1),
+            "p95_ms": round(float(np.percentile(latencies, 95)), 1),
+            "p99_ms": round(float(np.percentile(latencies, 99)), 1),
+            "error_rate": round(errors / len(values), 4),
+        }
+    return rows
+
+
+async def run_levels(base_url: str, levels, duration: float, think_s: float, seed: int, process):
+    limits = httpx.Limits(max_connections=max(levels) * 2, max_keepalive_connections=max(levels) * 2)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        await wait_until_ready(client, process)
+        # One pass over every endpoint first, so model loading and chart caches are warm
+        warm = defaultdict(list)
+        for _, requests in PAGES.values():
+            await asyncio.gather(*(request(client, method, path, warm) for method, path in requests))
+
+        report = []
+        for concurrency in levels:
+            samples = defaultdict(list)
+            deadline = time.perf_counter() + duration
+            start = time.perf_counter()
+            await asyncio.gather(*(virtual_user(client, np.random.default_rng(seed + i), deadline, think_s, samples)
+                                   for i in range(concurrency)))
+            elapsed = time.perf_counter() - start
+            rows = summarise(samples, elapsed)
+            total = sum(row["requests"] for row in rows.values())
+            print(f"\nconcurrency {concurrency}: {total / elapsed:.1f} req/s over {elapsed:.1f}s")
+            print(f"  {'endpoint':<50} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+            for endpoint, row in rows.items():
+                print(f"  {endpoint:<50} {row['rps']:>7.1f} {row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} "
+                      f"{row['p99_ms']:>8.1f} {row['error_rate']:>7.1%}")
+            report.append({"concurrency": concurrency, "seconds": round(elapsed, 2),
+                           "rps": round(total / elapsed, 2), "endpoints": rows})
+        return report
+
+
+def main(args) -> int:
+    levels = [int(level) for level in args.levels.split(",")]
+    upstream = start_fixture_server(latency_ms=args.upstream_latency_ms, jitter_ms=args.upstream_jitter_ms,
+                                    fail_rate=args.upstream_fail_rate)
+    upstream_url = f"http://127.0.0.1:{upstream.server_port}"
+
+    workdir = tempfile.mkdtemp(prefix="load-test-")
+    seed_workdir(workdir, args.seed)
+    process = start_server(workdir, args.port, args.workers, upstream_url)
+    try:
+        report = asyncio.run(run_levels(f"http://127.0.0.1:{args.port}", levels, args.duration,
+                                        args.think_ms / 1000, args.seed, process))
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+        upstream.shutdown()
+
+    print(f"\nupstream requests served: {upstream.requests}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+                "workers": args.workers,
+                "upstream_latency_ms": args.upstream_latency_ms,
+                "upstream_fail_rate": args.upstream_fail_rate,
+                "levels": report,
+            }, f, indent=2)
+        print(f"wrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--levels", default="1,8,32,64", help="comma-separated virtual user counts")
+    parser.add_argument("--duration", type=float, default=20, help="seconds per concurrency level")
+    parser.add_argument("--think-ms", type=float, default=0, help="mean pause between a user's page views")
+    parser.add_argument("--upstream-latency-ms", type=float, default=150)
+    parser.add_argument("--upstream-jitter-ms", type=float, default=50)
+    parser.add_argument("--upstream-fail-rate", type=float, default=0.0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the report as JSON here")
+    sys.exit(main(parser.parse_args()))
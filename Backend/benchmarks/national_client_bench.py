@@ -0,0 +1,72 @@
+"""Offline benchmark of the national COVID client against the fixture server.
+
+Run from the Backend directory:
+    python benchmarks/national_client_bench.py --latency-ms 200
+
+Compares a bare requests.get + parse per call (the old route behaviour) with
+the shared client's cold, fresh and stale-while-revalidate paths, then checks
+that a new client falls back to the disk snapshot when upstream fails.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import requests
+
+from benchmarks.fixture_server import NATIONAL_PATH, start_fixture_server
+from national_client import NationalDataClient, parse_payload
+
+
+def timed(fn, repeats: int):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return np.percentile(timings, 50) * 1000, np.percentile(timings, 99) * 1000
+
+
+def report(label, p50, p99):
+    print(f"  {label:<32} p50 {p50:>9.3f} ms   p99 {p99:>9.3f} ms")
+
+
+def main(latency_ms: float, repeats: int) -> int:
+    server = start_fixture_server(latency_ms=latency_ms)
+    url = f"http://127.0.0.1:{server.server_port}{NATIONAL_PATH}"
+
+    with tempfile.TemporaryDirectory() as workdir:
+        snapshot_path = os.path.join(workdir, "national_snapshot.json")
+
+        print(f"upstream latency {latency_ms} ms")
+        report("bare requests.get + parse", *timed(lambda: parse_payload(requests.get(url).json()), repeats))
+
+        client = NationalDataClient(url=url, ttl=60, max_stale=3600, snapshot_path=snapshot_path)
+        report("client cold (fetch + parse)", *timed(lambda: client.get(), 1))
+        report("client fresh hit", *timed(lambda: client.get(), repeats))
+
+        client.ttl = 0  # everything is now stale
+        report("client stale hit (SWR)", *timed(lambda: client.get(), repeats))
+        time.sleep(latency_ms / 1000 + 0.5)
+        print(f"  stats {client.stats}")
+
+        server.fail_rate = 1.0
+        fallback_client = NationalDataClient(url=url, snapshot_path=snapshot_path)
+        snapshot = fallback_client.get()
+        print(f"  upstream down -> served from {snapshot.source}, {len(snapshot.df)} rows")
+
+    server.shutdown()
+    return 0 if snapshot.source == "disk" else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency-ms", type=float, default=200)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+    sys.exit(main(args.latency_ms, args.repeats))
@@ -0,0 +1,86 @@
+"""p50/p99 latency of /api/national/plots under concurrent load.
+
+Run from the Backend directory:
+    python benchmarks/national_plots_latency.py --concurrency 1 4 8 --requests 32
+
+The upstream API call is replaced by a synthetic multi-year series so only
+the rendering path is measured.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import numpy as np
+import pandas as pd
+from fastapi import FastAPI
+
+import chart_renderer
+from routes import national
+
+
+def synthetic_india_series(days: int = 1100, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    new = np.abs(rng.normal(20000, 8000, days)).astype(int)
+    return pd.DataFrame({
+        "Date": pd.date_range("2020-01-22", periods=days, freq="D"),
+        "Total Cases": np.cumsum(new),
+        "New Cases": new,
+    })
+
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) * 1000
+
+
+async def run_level(client: httpx.AsyncClient, concurrency: int, total: int):
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.get("/api/national/plots")
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+    return latencies, elapsed
+
+
+async def main(levels, total):
+    df = synthetic_india_series()
+    national.fetch_india_covid_data = lambda: df
+
+    app = FastAPI()
+    app.include_router(national.router, prefix="/api")
+
+    await chart_renderer.start()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            await client.get("/api/national/plots")  # first-request warm up
+            print(f"workers={chart_renderer.CHART_WORKERS}")
+            print(f"{'concurrency':>11} {'req/s':>8} {'p50 ms':>9} {'p99 ms':>9} {'mean ms':>9}")
+            for concurrency in levels:
+                latencies, elapsed = await run_level(client, concurrency, total)
+                print(f"{concurrency:>11} {total / elapsed:>8.2f} {percentile(latencies, 50):>9.1f} "
+                      f"{percentile(latencies, 99):>9.1f} {statistics.mean(latencies) * 1000:>9.1f}")
+    finally:
+        chart_renderer.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--requests", type=int, default=32)
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency, args.requests))
@@ -0,0 +1,286 @@
+"""Ingest-to-alert latency over an outbreak season replayed at accelerated time.
+
+Run from the Backend directory:
+    python benchmarks/outbreak_simulator.py --days 120 --day-seconds 2 --retrain-every 7 --slo-s 5
+
+Seeds throwaway databases with --history-days of synthetic data, then
+replays each following day of the season as --day-seconds of wall time,
+through the same code the API runs:
+
+    ingest          that day's bangalore_cases and hospital_resource_timeseries
+                    rows (and dengue_data on Sundays), with their triggers
+    retrain_dengue  dengue.retrain_forecaster, every --retrain-every days
+    retrain_covid   district.train_forecaster, on the same schedule
+    forecast        dengue.forecast_and_store
+    alert_wait      forecast written -> the overload watcher starts recomputing
+    overload        compute_overload / predict_overload and publishing to the bus
+    recommendation  call_llm against the fixture server, when the risk changed
+
+End-to-end latency runs from the start of a day's ingest to the published
+risk, plus the recommendation when one is made. The report gives each
+stage's distribution, how often days overran --day-seconds, and how
+stale the model behind each alert was. The exit status is non-zero if p95
+end-to-end latency misses --slo-s.
+
+The API's "today" is replaced by the simulated date in routes.dengue and
+routes.overload, which is what moves the forecast week along.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from benchmarks import synthetic
+from benchmarks.fixture_server import GROQ_PATH, start_fixture_server
+
+STAGES = ["ingest", "retrain_dengue", "retrain_covid", "forecast", "alert_wait", "overload", "recommendation"]
+
+
+class SimClock:
+    def __init__(self, today: datetime):
+        self.today = today
+
+    def datetime_class(self):
+        """A datetime whose today()/now() fall on the simulated date, at the real time of day"""
+        clock = self
+
+        class SimDatetime(datetime):
+            @classmethod
+            def today(cls):
+                return cls.combine(clock.today.date(), datetime.now().time())
+
+            @classmethod
+            def now(cls, tz=None):
+                return cls.combine(clock.today.date(), datetime.now(tz).time())
+
+        return SimDatetime
+
+
+def season_data(history_days: int, season_days: int, start: datetime, seed: int):
+    """Full synthetic series, dated so that the season starts at `start`"""
+    days = history_days + season_days
+    first = start - timedelta(days=history_days)
+    cases = synthetic.bangalore_cases(days, seed)
+    cases["date"] = [(first + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days)]
+    resources = synthetic.hospital_resource_timeseries(days, 20, seed)
+    resources["date"] = cases["date"].values
+
+    # Weekly dengue rows dated on the Sundays covering the same span
+    first_sunday = first + timedelta(days=(6 - first.weekday()) % 7)
+    weeks = (days - (first_sunday - first).days + 6) // 7
+    dengue = synthetic.dengue_data(weeks, seed)
+    dengue["date"] = [(first_sunday + timedelta(weeks=i)).strftime("%Y-%m-%d") for i in range(weeks)]
+    return cases, resources, dengue
+
+
+def seed_history(workdir: str, cases, resources, dengue, start: datetime) -> None:
+    for name in ("db", "data", "static", "cache"):
+        os.makedirs(os.path.join(workdir, name), exist_ok=True)
+    from database import init_db
+    from database_covid import init_db_covid
+    init_db()
+    init_db_covid()
+
+    before = start.strftime("%Y-%m-%d")
+    conn = sqlite3.connect("db/dengue.db")
+    try:
+        dengue[dengue["date"] < before].to_sql("dengue_data", conn, if_exists="append", index=False)
+        resources[resources["date"] < before].to_sql("hospital_resource_timeseries", conn, if_exists="append", index=False)
+        conn.commit()
+    finally:
+        conn.close()
+    conn = sqlite3.connect("db/covid_data.db")
+    try:
+        cases[cases["date"] < before].to_sql("bangalore_cases", conn, if_exists="append", index=False)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def ingest_day(day: str, cases, resources, dengue) -> None:
+    """One day's rows, written through separate connections like an external loader"""
+    conn = sqlite3.connect("db/covid_data.db")
+    try:
+        cases[cases["date"] == day].to_sql("bangalore_cases", conn, if_exists="append", index=False)
+        conn.commit()
+    finally:
+        conn.close()
+    conn = sqlite3.connect("db/dengue.db")
+    try:
+        resources[resources["date"] == day].to_sql("hospital_resource_timeseries", conn, if_exists="append", index=False)
+        dengue[dengue["date"] == day].to_sql("dengue_data", conn, if_exists="append", index=False)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def percentiles(values):
+    values = np.asarray(values) * 1000
+    return {"n": len(values), "p50_ms": round(float(np.percentile(values, 50)), 1),
+            "p95_ms": round(float(np.percentile(values, 95)), 1),
+            "p99_ms": round(float(np.percentile(values, 99)), 1), "max_ms": round(float(values.max()), 1)}
+
+
+async def simulate(args) -> dict:
+    workdir = tempfile.mkdtemp(prefix="outbreak-sim-")
+    os.chdir(workdir)
+    upstream = start_fixture_server(latency_ms=args.llm_latency_ms, jitter_ms=args.llm_latency_ms / 4)
+    os.environ["GROQ_API_URL"] = f"http://127.0.0.1:{upstream.server_port}{GROQ_PATH}"
+    os.environ.setdefault("GROQ_API_KEY", "simulator")
+
+    start = datetime(2024, 6, 1)
+    cases, resources, dengue_rows = season_data(args.history_days, args.days, start, args.seed)
+    seed_history(workdir, cases, resources, dengue_rows, start)
+
+    from database import DATABASE_PATH
+    from events import bus, notify_change
+    from routes import dengue, district, overload
+    from routes.recommendations import call_llm
+
+    clock = SimClock(start - timedelta(days=1))
+    dengue.datetime = overload.datetime = clock.datetime_class()
+
+    # Time every recompute the watcher triggers, and whether it published
+    refreshes, refreshed = [], asyncio.Event()
+    topic = bus.topic(overload.alert_topic("hospital"))
+
+    async def timed_refresh(changed):
+        began, version = time.perf_counter(), topic.version
+        await overload.refresh_alerts(changed)
+        refreshes.append((began, time.perf_counter(), set(changed), topic.version != version))
+        refreshed.set()
+
+    overload.alert_watcher.on_change = timed_refresh
+
+    async def wait_for_refresh(after: float, table: str):
+        while True:
+            for began, ended, changed, published in reversed(refreshes):
+                if began >= after and table in changed:
+                    return began, ended, published
+            refreshed.clear()
+            await asyncio.wait_for(refreshed.wait(), timeout=60)
+
+    def forecast():
+        conn = sqlite3.connect(DATABASE_PATH)
+        try:
+            return dengue.forecast_and_store(conn)
+        finally:
+            conn.close()
+
+    # Initial models, trained on the history only
+    await asyncio.to_thread(dengue.retrain_forecaster)
+    await asyncio.to_thread(district.train_forecaster)
+    await overload.start_alerts()
+
+    stages, end_to_end, staleness = defaultdict(list), [], []
+    overruns, last_retrain = 0, 0
+    for day_index in range(args.days):
+        day_start = time.perf_counter()
+        clock.today = start + timedelta(days=day_index)
+        day = clock.today.strftime("%Y-%m-%d")
+
+        began = time.perf_counter()
+        await asyncio.to_thread(ingest_day, day, cases, resources, dengue_rows)
+        notify_change("hospital_resource_timeseries")
+        stages["ingest"].append(time.perf_counter() - began)
+
+        if day_index % args.retrain_every == 0:
+            began = time.perf_counter()
+            await asyncio.to_thread(dengue.retrain_forecaster)
+            stages["retrain_dengue"].append(time.perf_counter() - began)
+            began = time.perf_counter()
+            await asyncio.to_thread(district.train_forecaster)
+            stages["retrain_covid"].append(time.perf_counter() - began)
+            last_retrain = day_index
+
+        began = time.perf_counter()
+        await asyncio.to_thread(forecast)
+        forecast_done = time.perf_counter()
+        stages["forecast"].append(forecast_done - began)
+
+        refresh_began, refresh_ended, published = await wait_for_refresh(began, "forecasts")
+        stages["alert_wait"].append(max(0.0, refresh_began - forecast_done))
+        stages["overload"].append(refresh_ended - refresh_began)
+        alert_ready = refresh_ended
+
+        if published or args.llm_every_day:
+            risk = (topic.message or {}).get("risk", "unknown")
+            began = time.perf_counter()
+            await asyncio.to_thread(call_llm, f"Current hospital overload risk: {risk}")
+            alert_ready = time.perf_counter()
+            stages["recommendation"].append(alert_ready - began)
+
+        end_to_end.append(alert_ready - day_start)
+        staleness.append(day_index - last_retrain)
+
+        elapsed = time.perf_counter() - day_start
+        if elapsed > args.day_seconds:
+            overruns += 1
+        else:
+            await asyncio.sleep(args.day_seconds - elapsed)
+
+    await overload.stop_alerts()
+    upstream.shutdown()
+
+    return {
+        "days": args.days,
+        "day_seconds": args.day_seconds,
+        "retrain_every": args.retrain_every,
+        "stages": {stage: percentiles(stages[stage]) for stage in STAGES if stages[stage]},
+        "end_to_end": percentiles(end_to_end),
+        "within_slo": round(float(np.mean(np.array(end_to_end) <= args.slo_s)), 4),
+        "overrun_days": overruns,
+        "model_staleness_days": {"mean": round(float(np.mean(staleness)), 2), "max": int(max(staleness))},
+        "alerts_published": sum(published for *_, published in refreshes),
+    }
+
+
+def main(args) -> int:
+    report = asyncio.run(simulate(args))
+
+    print(f"{report['days']} simulated days at {args.day_seconds}s each, retrain every {args.retrain_every} days")
+    print(f"  {'stage':<16} {'n':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for stage, row in list(report["stages"].items()) + [("end_to_end", report["end_to_end"])]:
+        print(f"  {stage:<16} {row['n']:>5} {row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} "
+              f"{row['p99_ms']:>9.1f} {row['max_ms']:>9.1f}")
+    print(f"  within {args.slo_s}s SLO: {report['within_slo']:.1%}, overrun days: {report['overrun_days']}, "
+          f"alerts published: {report['alerts_published']}")
+    print(f"  model staleness: mean {report['model_staleness_days']['mean']} days, "
+          f"max {report['model_staleness_days']['max']} days")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"wrote {args.output}")
+
+    ok = report["end_to_end"]["p95_ms"] <= args.slo_s * 1000
+    print("PASS" if ok else f"FAIL (p95 end-to-end over {args.slo_s}s)")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=120, help="season length in simulated days")
+    parser.add_argument("--history-days", type=int, default=730, help="data seeded before the season")
+    parser.add_argument("--day-seconds", type=float, default=2.0, help="wall-clock seconds per simulated day")
+    parser.add_argument("--retrain-every", type=int, default=7, help="simulated days between retrains")
+    parser.add_argument("--llm-latency-ms", type=float, default=800)
+    parser.add_argument("--llm-every-day", action="store_true", help="ask for recommendations daily, not only on changes")
+    parser.add_argument("--slo-s", type=float, default=5.0, help="target p95 ingest-to-alert seconds")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the report as JSON here")
+    args = parser.parse_args()
+    if args.output:
+        args.output = os.path.abspath(args.output)
+    sys.exit(main(args))
@@ -0,0 +1,146 @@
+"""Fan-out load test of the pushed overload alerts (/api/overload/stream).
+
+Run from the Backend directory:
+    python benchmarks/overload_alerts_swarm.py --clients 2000 --writes 20
+
+Starts the overload router on a local uvicorn server against throwaway
+databases in a temp directory and opens --clients concurrent SSE
+connections from one process. It then writes resource snapshots that flip
+the risk between Low and High and reports, for each write, how long it took
+to reach every client. Writes go through a separate connection, like an
+external loader, and are picked up by the data_version poll; with --notify
+the watcher is also woken directly, as the write routes do.
+"""
+
+import argparse
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import numpy as np
+import uvicorn
+from fastapi import FastAPI
+
+RESOURCE_COLUMNS = [
+    "total_beds", "available_beds", "occupied_beds",
+    "icu_beds", "available_icu_beds", "occupied_icu_beds",
+    "total_ventilators", "available_ventilators", "used_ventilators",
+    "total_oxygen_cylinders", "available_oxygen_cylinders", "used_oxygen_cylinders",
+    "total_doctors", "available_doctors",
+    "total_nurses", "available_nurses",
+    "total_icu_nurses", "available_icu_nurses",
+    "staff_reduction_factors",
+]
+
+
+def write_resources(conn: sqlite3.Connection, day: int, plenty: bool) -> None:
+    available = 100000 if plenty else 0
+    values = [available] * (len(RESOURCE_COLUMNS) - 1) + [1.0]
+    conn.execute(
+        f"INSERT OR REPLACE INTO hospital_resource_timeseries (date, {', '.join(RESOURCE_COLUMNS)}) "
+        f"VALUES (?, {', '.join('?' * len(RESOURCE_COLUMNS))})",
+        [(datetime(2030, 1, 1) + timedelta(days=day)).strftime("%Y-%m-%d")] + values,
+    )
+    conn.commit()
+
+
+def seed(conn: sqlite3.Connection) -> None:
+    today = datetime.today()
+    next_sunday = today + timedelta(days=(6 - today.weekday()) % 7 or 7)
+    conn.execute("INSERT INTO forecasts VALUES (?, ?, ?, ?, ?)",
+                 (today.strftime("%Y-%m-%d"), next_sunday.strftime("%Y-%m-%d"), 500.0, 425.0, 575.0))
+    write_resources(conn, 0, plenty=True)
+
+
+async def sse_client(client: httpx.AsyncClient, received: dict, subscribed: list, ready: asyncio.Event,
+                     clients: int, last_version: int):
+    async with client.stream("GET", "/api/overload/stream") as response:
+        async for line in response.aiter_lines():
+            if line.startswith("id: "):
+                version = int(line[4:])
+                received.setdefault(version, []).append(time.perf_counter())
+                if version == 1:
+                    # Version 1 is the risk computed at startup
+                    subscribed[0] += 1
+                    if subscribed[0] == clients:
+                        ready.set()
+                if version >= last_version:
+                    return
+
+
+async def main(clients: int, writes: int, interval: float, notify: bool, port: int) -> None:
+    workdir = tempfile.mkdtemp(prefix="overload-swarm-")
+    os.chdir(workdir)
+    os.makedirs("db")
+
+    from database import init_db
+    from events import notify_change
+    from routes import overload
+
+    init_db()
+    writer = sqlite3.connect("db/dengue.db")
+    seed(writer)
+
+    app = FastAPI()
+    app.include_router(overload.router, prefix="/api")
+    app.add_event_handler("startup", overload.start_alerts)
+    app.add_event_handler("shutdown", overload.stop_alerts)
+
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning",
+                            backlog=clients + 128, timeout_keep_alive=60)
+    server = uvicorn.Server(config)
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    # Every write flips the risk, so write i publishes version i + 2
+    received, subscribed, ready = {}, [0], asyncio.Event()
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=None) as client:
+        connect_start = time.perf_counter()
+        swarm = [asyncio.create_task(sse_client(client, received, subscribed, ready, clients, writes + 1))
+                 for _ in range(clients)]
+        await asyncio.wait_for(ready.wait(), timeout=120)
+        print(f"{clients} clients subscribed in {time.perf_counter() - connect_start:.2f}s")
+
+        written_at = {}
+        for i in range(writes):
+            await asyncio.sleep(interval)
+            written_at[i + 2] = time.perf_counter()
+            await asyncio.to_thread(write_resources, writer, i + 1, i % 2 == 1)
+            if notify:
+                notify_change("hospital_resource_timeseries")
+
+        await asyncio.wait_for(asyncio.gather(*swarm), timeout=60)
+
+    server.should_exit = True
+    await server_task
+    writer.close()
+
+    print(f"{'write':>5} {'delivered':>10} {'p50 ms':>9} {'p99 ms':>9} {'last ms':>9}")
+    all_latencies = []
+    for version, start in written_at.items():
+        latencies = (np.array(received.get(version, [])) - start) * 1000
+        all_latencies.extend(latencies)
+        print(f"{version - 1:>5} {len(latencies):>10} {np.percentile(latencies, 50):>9.1f} "
+              f"{np.percentile(latencies, 99):>9.1f} {latencies.max():>9.1f}")
+    print(f"overall p50 {np.percentile(all_latencies, 50):.1f} ms, p99 {np.percentile(all_latencies, 99):.1f} ms "
+          f"({'notify' if notify else 'data_version poll'})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=2000)
+    parser.add_argument("--writes", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.5, help="seconds between writes")
+    parser.add_argument("--notify", action="store_true", help="wake the watcher directly after each write")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    asyncio.run(main(args.clients, args.writes, args.interval, args.notify, args.port))
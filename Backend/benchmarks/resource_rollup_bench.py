@@ -0,0 +1,136 @@
+"""Long-range utilization queries against growing hospital_resource_timeseries history.
+
+Run from the Backend directory:
+    python benchmarks/resource_rollup_bench.py --years 1,5,20 --snapshots-per-day 24 --budget-ms 20
+
+For each history length, fills a throwaway dengue.db with synthetic
+snapshots through the rollup triggers, compacts it to the default
+retention window, then times:
+
+    ingest      one more snapshot, including the rollup triggers
+    full_range  read_utilization over the whole history at ~200 points
+    last_year   the last 365 days at weekly resolution
+    raw_scan    the same full range aggregated from raw rows, as the trend
+                endpoint would without rollups (before compaction)
+
+The exit status is non-zero if the full-range query's median exceeds
+--budget-ms at any history length.
+"""
+
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import resource_rollup
+from resource_rollup import compact, read_utilization
+
+COLUMNS = [
+    ("total_beds", "available_beds", "occupied_beds"),
+    ("icu_beds", "available_icu_beds", "occupied_icu_beds"),
+    ("total_ventilators", "available_ventilators", "used_ventilators"),
+    ("total_oxygen_cylinders", "available_oxygen_cylinders", "used_oxygen_cylinders"),
+]
+STAFF = [("total_doctors", "available_doctors"), ("total_nurses", "available_nurses"),
+         ("total_icu_nurses", "available_icu_nurses")]
+
+
+def snapshots(start: datetime, count: int, per_day: int, rng):
+    """Rows for hospital_resource_timeseries, per_day evenly spaced snapshots a day"""
+    step = timedelta(days=1) / per_day
+    load = np.clip(0.6 + 0.3 * np.sin(np.arange(count) / (per_day * 58)) + rng.normal(0, 0.05, count), 0.05, 1)
+    for i in range(count):
+        stamp = start + i * step
+        row = {"date": stamp.strftime("%Y-%m-%d %H:%M:%S") if per_day > 1 else stamp.strftime("%Y-%m-%d")}
+        for (total, available, used), capacity in zip(COLUMNS, (4000, 400, 200, 1200)):
+            in_use = int(capacity * load[i])
+            row[total], row[available], row[used] = capacity, capacity - in_use, in_use
+        for (total, available), staff in zip(STAFF, (320, 1000, 200)):
+            row[total], row[available] = staff, int(staff * (1 - load[i] * 0.5))
+        row["staff_reduction_factors"] = 0.1
+        yield row
+
+
+def insert(conn, rows) -> None:
+    rows = list(rows)
+    names = list(rows[0])
+    conn.executemany(f"INSERT OR REPLACE INTO hospital_resource_timeseries ({', '.join(names)}) "
+                     f"VALUES ({', '.join('?' * len(names))})", [tuple(row.values()) for row in rows])
+    conn.commit()
+
+
+def timed(fn, repeats: int):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def measure(years: int, per_day: int, repeats: int, seed: int) -> dict:
+    workdir = tempfile.mkdtemp(prefix="resource-rollup-")
+    os.chdir(workdir)
+    os.makedirs("db")
+    from database import init_db
+    init_db()
+    conn = sqlite3.connect("db/dengue.db")
+    rng = np.random.default_rng(seed)
+
+    today = date.today()
+    first = datetime.combine(today - timedelta(days=365 * years), datetime.min.time())
+    count = 365 * years * per_day
+    build_start = time.perf_counter()
+    insert(conn, snapshots(first, count, per_day, rng))
+    build_s = time.perf_counter() - build_start
+
+    start, end = first.date().isoformat(), today.isoformat()
+    raw_scan_ms = timed(lambda: conn.execute(
+        f"SELECT strftime('%Y-%m', date), AVG({resource_rollup.utilization_sql('beds')}) "
+        "FROM hospital_resource_timeseries WHERE date >= ? GROUP BY 1", (start,)).fetchall(), repeats)
+
+    compacted = compact(conn)
+    resolution = (today - first.date()).days / 200
+    full_range_ms = timed(lambda: read_utilization(conn, start, end, resolution), repeats)
+    last_year_ms = timed(lambda: read_utilization(conn, (today - timedelta(days=365)).isoformat(), end, 7), repeats)
+    next_stamp = datetime.combine(today, datetime.min.time()) + timedelta(hours=23, minutes=59)
+    ingest_ms = timed(lambda: insert(conn, snapshots(next_stamp, 1, per_day, rng)), repeats)
+    conn.close()
+
+    return {"years": years, "rows": count, "build_s": round(build_s, 2), "compacted_rows": compacted,
+            "ingest_ms": round(ingest_ms, 3), "full_range_ms": round(full_range_ms, 3),
+            "last_year_ms": round(last_year_ms, 3), "raw_scan_ms": round(raw_scan_ms, 3)}
+
+
+def main(args) -> int:
+    levels = [int(years) for years in args.years.split(",")]
+    print(f"{args.snapshots_per_day} snapshots/day, raw retention {resource_rollup.RESOURCE_RAW_RETENTION_DAYS} days")
+    print(f"  {'years':>5} {'rows':>9} {'compacted':>9} {'ingest ms':>10} {'full ms':>9} {'last yr ms':>11} {'raw scan ms':>12}")
+    rows = []
+    for years in levels:
+        row = measure(years, args.snapshots_per_day, args.repeats, args.seed)
+        rows.append(row)
+        print(f"  {row['years']:>5} {row['rows']:>9} {row['compacted_rows']:>9} {row['ingest_ms']:>10.3f} "
+              f"{row['full_range_ms']:>9.3f} {row['last_year_ms']:>11.3f} {row['raw_scan_ms']:>12.3f}")
+
+    slow = [row["years"] for row in rows if row["full_range_ms"] > args.budget_ms]
+    print("PASS" if not slow else f"FAIL (full-range query over {args.budget_ms} ms at {slow} years)")
+    return 1 if slow else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", default="1,5,20", help="comma-separated history lengths")
+    parser.add_argument("--snapshots-per-day", type=int, default=24)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--budget-ms", type=float, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,98 @@
+"""Nearest-spare-capacity queries over synthetic hospitals.
+
+Run from the Backend directory:
+    python benchmarks/spatial_index_bench.py --hospitals 10000 --queries 5000
+
+Builds the index over random hospitals spread across India, most of them
+with no spare units of a given resource. It then times "k nearest with
+>= N units" queries against a vectorised linear scan, checks the results
+match, and times capacity updates. Exits non-zero if the p99 query time is
+over --budget-ms.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from spatial_index import RESOURCE_NAMES, HospitalIndex, to_unit_vectors
+
+
+def synthetic_hospitals(n: int, seed: int = 11):
+    rng = np.random.default_rng(seed)
+    latitude = rng.uniform(8.0, 30.0, n)
+    longitude = rng.uniform(70.0, 90.0, n)
+    capacity = rng.integers(1, 30, (n, len(RESOURCE_NAMES))).astype(float)
+    capacity[rng.random(capacity.shape) < 0.8] = 0  # most hospitals have nothing spare
+    return latitude, longitude, capacity
+
+
+def linear_scan(points, capacity, point, resource, min_units, k):
+    distance = np.linalg.norm(points - point, axis=1)
+    distance[capacity[:, resource] < min_units] = np.inf
+    nearest = np.argpartition(distance, k)[:k] if len(distance) > k else np.arange(len(distance))
+    nearest = nearest[np.argsort(distance[nearest])]
+    return [int(i) for i in nearest if np.isfinite(distance[i])]
+
+
+def percentiles(timings):
+    return np.percentile(timings, 50) * 1000, np.percentile(timings, 99) * 1000
+
+
+def main(n: int, queries: int, k: int, budget_ms: float, seed: int) -> int:
+    latitude, longitude, capacity = synthetic_hospitals(n, seed)
+    points = to_unit_vectors(latitude, longitude)
+
+    index = HospitalIndex()
+    start = time.perf_counter()
+    index.build([(i, f"Hospital {i}", latitude[i], longitude[i], capacity[i]) for i in range(n)])
+    print(f"built index over {n} hospitals in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    rng = np.random.default_rng(seed + 1)
+    tree_times, scan_times, mismatches = [], [], 0
+    for _ in range(queries):
+        lat, lon = rng.uniform(8.0, 30.0), rng.uniform(70.0, 90.0)
+        resource = int(rng.integers(len(RESOURCE_NAMES)))
+        min_units = int(rng.integers(1, 25))
+
+        start = time.perf_counter()
+        found = index.nearest(lat, lon, RESOURCE_NAMES[resource], min_units, k)
+        tree_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        expected = linear_scan(points, capacity, to_unit_vectors(lat, lon), resource, min_units, k)
+        scan_times.append(time.perf_counter() - start)
+
+        mismatches += [h["hospital_id"] for h in found] != expected
+
+    updates = rng.integers(0, n, 10000)
+    start = time.perf_counter()
+    for hospital_id in updates.tolist():
+        index.set_capacity(hospital_id, {"icu_beds": float(rng.integers(0, 30))})
+    update_us = (time.perf_counter() - start) / len(updates) * 1e6
+
+    tree_p50, tree_p99 = percentiles(tree_times)
+    scan_p50, scan_p99 = percentiles(scan_times)
+    print(f"  kd-tree query (k={k})   p50 {tree_p50:.3f} ms   p99 {tree_p99:.3f} ms")
+    print(f"  linear scan             p50 {scan_p50:.3f} ms   p99 {scan_p99:.3f} ms")
+    print(f"  capacity update         {update_us:.1f} us")
+    print(f"  result mismatches       {mismatches}/{queries}")
+
+    ok = mismatches == 0 and tree_p99 <= budget_ms
+    print("PASS" if ok else f"FAIL (p99 budget {budget_ms} ms)")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hospitals", type=int, default=10000)
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("-k", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+    sys.exit(main(args.hospitals, args.queries, args.k, args.budget_ms, args.seed))
@@ -0,0 +1,161 @@
+"""Startup cost of the API: `import main` time and time to the first 200.
+
+Run from the Backend directory:
+    python benchmarks/startup_bench.py --runs 5 --import-budget-s 1.5 --first-200-budget-s 3
+
+Seeds a throwaway working directory the same way as load_test.py, then:
+
+    import      `python -c "import main"` in a fresh interpreter, minus the
+                interpreter's own startup. The run also fails if any of
+                HEAVY_MODULES was imported, since those must load lazily.
+    first_200   from spawning `uvicorn main:app` to the first 200 from
+                --path, with the dengue artifact already on disk (an
+                untimed first run trains and saves it).
+
+The exit status is non-zero if either median is over its budget.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Must not be imported by `import main`
+HEAVY_MODULES = ["pandas", "sklearn", "statsmodels", "scipy", "matplotlib", "seaborn", "joblib", "requests"]
+IMPORT_BUDGET_S = 1.5
+
+
+def server_env(prewarm: bool) -> dict:
+    return dict(os.environ,
+                PYTHONPATH=BACKEND_DIR + os.pathsep + os.environ.get("PYTHONPATH", ""),
+                PREWARM_ENABLED="1" if prewarm else "0")
+
+
+def time_python(workdir: str, code: str) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], cwd=workdir, env=server_env(False), check=True)
+    return time.perf_counter() - start
+
+
+def imported_heavy_modules(workdir: str) -> list:
+    """Top-level packages from HEAVY_MODULES that `import main` pulls in"""
+    code = f"import main, sys; print(' '.join(sorted(set(m.split('.')[0] for m in sys.modules) & {set(HEAVY_MODULES)!r})))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=workdir, env=server_env(False),
+                            check=True, capture_output=True, text=True)
+    return result.stdout.split()
+
+
+def get_status(url: str) -> int:
+    try:
+        with urllib.request.urlopen(url, timeout=30) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except (urllib.error.URLError, ConnectionError, TimeoutError):
+        return 0
+
+
+def time_to_200(workdir: str, port: int, path: str, prewarm: bool, timeout: float = 300) -> float:
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=workdir, env=server_env(prewarm))
+    try:
+        while time.perf_counter() - start < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"server exited with status {process.returncode}")
+            if get_status(f"http://127.0.0.1:{port}{path}") == 200:
+                return time.perf_counter() - start
+            time.sleep(0.02)
+        raise RuntimeError(f"no 200 from {path} within {timeout}s")
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def prime(workdir: str, port: int) -> None:
+    """Run the server once until the dengue model is trained and its artifact saved"""
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=workdir, env=server_env(False))
+    try:
+        deadline = time.perf_counter() + 300
+        while get_status(f"http://127.0.0.1:{port}/api/dengue/predict") != 200:
+            if process.poll() is not None or time.perf_counter() > deadline:
+                raise RuntimeError("dengue model was not trained")
+            time.sleep(0.2)
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def main(args) -> int:
+    # Imported here: the synthetic data needs pandas, which tests/test_startup.py does not
+    from benchmarks.load_test import seed_workdir
+
+    workdir = tempfile.mkdtemp(prefix="startup-bench-")
+    seed_workdir(workdir, args.seed)
+    prime(workdir, args.port)
+
+    heavy = imported_heavy_modules(workdir)
+    interpreter = statistics.median(time_python(workdir, "pass") for _ in range(args.runs))
+    imports = [time_python(workdir, "import main") - interpreter for _ in range(args.runs)]
+    first_200 = [time_to_200(workdir, args.port, args.path, args.prewarm) for _ in range(args.runs)]
+
+    report = {
+        "runs": args.runs,
+        "path": args.path,
+        "prewarm": args.prewarm,
+        "interpreter_s": round(interpreter, 4),
+        "import_s": {"median": round(statistics.median(imports), 4), "max": round(max(imports), 4)},
+        "first_200_s": {"median": round(statistics.median(first_200), 4), "max": round(max(first_200), 4)},
+        "heavy_modules_at_import": heavy,
+    }
+    print(f"startup over {args.runs} runs (interpreter alone {interpreter * 1000:.0f} ms)")
+    print(f"  import main      median {report['import_s']['median'] * 1000:>8.0f} ms  "
+          f"max {report['import_s']['max'] * 1000:>8.0f} ms  budget {args.import_budget_s * 1000:.0f} ms")
+    print(f"  first 200        median {report['first_200_s']['median'] * 1000:>8.0f} ms  "
+          f"max {report['first_200_s']['max'] * 1000:>8.0f} ms  budget {args.first_200_budget_s * 1000:.0f} ms")
+    print(f"  heavy modules loaded by import main: {', '.join(heavy) or 'none'}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"wrote {args.output}")
+
+    failures = []
+    if heavy:
+        failures.append(f"eager imports of {', '.join(heavy)}")
+    if report["import_s"]["median"] > args.import_budget_s:
+        failures.append(f"import over {args.import_budget_s}s")
+    if report["first_200_s"]["median"] > args.first_200_budget_s:
+        failures.append(f"first 200 over {args.first_200_budget_s}s")
+    print("PASS" if not failures else f"FAIL ({'; '.join(failures)})")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-budget-s", type=float, default=IMPORT_BUDGET_S)
+    parser.add_argument("--first-200-budget-s", type=float, default=3.0)
+    parser.add_argument("--path", default="/api/district/bangalore/summary", help="endpoint polled for the first 200")
+    parser.add_argument("--prewarm", action="store_true", help="leave background pre-warming on while timing")
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the report as JSON here")
+    args = parser.parse_args()
+    if args.output:
+        args.output = os.path.abspath(args.output)
+    sys.exit(main(args))
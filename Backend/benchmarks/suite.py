@@ -0,0 +1,234 @@
+"""Microbenchmarks of the forecasting, overload and plotting code paths.
+
+Run from the Backend directory:
+    python benchmarks/suite.py --output benchmarks/results/HEAD.json
+    python benchmarks/suite.py --compare benchmarks/results/main.json
+
+Every case runs on seeded synthetic data (benchmarks/synthetic.py) at
+several sizes. The median and minimum of --repeats runs are written as
+JSON with the git commit, so runs on two commits can be compared. With
+--compare, the exit status is non-zero if any case's median is more than
+--tolerance times the baseline's.
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import synthetic
+from charts import render_chart, warm_up
+from forecasting import DengueForecastingSystem
+from forecasting_covid import CovidForecastModel
+from overload_risk import predict_overload
+
+SIZES = {
+    "dengue_weeks": [104, 260, 520],
+    "covid_days": [180, 365, 730],
+    "hospitals": [10, 100, 1000],
+    "plot_days": [90, 365, 1100],
+}
+QUICK_SIZES = {name: sizes[:1] for name, sizes in SIZES.items()}
+
+
+def time_case(fn, repeats: int, setup=None):
+    """(median, min) seconds of fn(setup()) over `repeats` runs; setup is not timed"""
+    timings = []
+    for _ in range(repeats):
+        arg = setup() if setup else None
+        start = time.perf_counter()
+        fn(arg) if setup else fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), min(timings)
+
+
+def dengue_cases(sizes, seed, wanted):
+    names = ["DengueForecastingSystem.prepare_data", "DengueForecastingSystem.train_ensemble",
+             "DengueForecastingSystem.forecast", "plot:dengue_forecast"]
+    if not any(wanted(name) for name in names):
+        return
+    for weeks in sizes["dengue_weeks"]:
+        df = synthetic.dengue_data(weeks, seed)
+        if wanted("DengueForecastingSystem.prepare_data"):
+            yield "DengueForecastingSystem.prepare_data", weeks, lambda: DengueForecastingSystem(df=df), None
+        if wanted("DengueForecastingSystem.train_ensemble"):
+            yield "DengueForecastingSystem.train_ensemble", weeks, \
+                lambda system: system.train_ensemble(), lambda: DengueForecastingSystem(df=df)
+        if not (wanted("DengueForecastingSystem.forecast") or wanted("plot:dengue_forecast")):
+            continue
+        trained = DengueForecastingSystem(df=df)
+        trained.train_ensemble()
+        if wanted("DengueForecastingSystem.forecast"):
+            yield "DengueForecastingSystem.forecast", weeks, lambda: trained.forecast(weeks=4), None
+        if wanted("plot:dengue_forecast"):
+            yield "plot:dengue_forecast", weeks, \
+                lambda: render_chart("dengue_forecast", trained.forecast_plot_data()), None
+
+
+def covid_cases(sizes, seed, wanted):
+    names = ["CovidForecastModel.find_best_arima_params", "CovidForecastModel.run_pipeline",
+             "CovidForecastModel.get_forecast", "plot:covid_forecast"]
+    if not any(wanted(name) for name in names):
+        return
+    for days in sizes["covid_days"]:
+        df = synthetic.bangalore_cases(days, seed)[["date", "hospitalized"]]
+        if wanted("CovidForecastModel.find_best_arima_params"):
+            model = CovidForecastModel()
+            weekly = model.aggregate_to_weekly(df)
+            train_series = weekly[:int(len(weekly) * 0.8)].set_index("Week")["Weekly_Hospitalized"]
+            yield "CovidForecastModel.find_best_arima_params", days, \
+                lambda: model.find_best_arima_params(train_series), None
+        if wanted("CovidForecastModel.run_pipeline"):
+            yield "CovidForecastModel.run_pipeline", days, lambda: CovidForecastModel().run_pipeline(df), None
+        if not (wanted("CovidForecastModel.get_forecast") or wanted("plot:covid_forecast")):
+            continue
+        trained = CovidForecastModel()
+        trained.run_pipeline(df)
+        if wanted("CovidForecastModel.get_forecast"):
+            yield "CovidForecastModel.get_forecast", days, lambda: trained.get_forecast(steps=12), None
+        if wanted("plot:covid_forecast"):
+            yield "plot:covid_forecast", days, \
+                lambda: render_chart("covid_forecast", trained.covid_forecast_plot_data()), None
+
+
+def overload_cases(sizes, seed, wanted):
+    if not wanted("predict_overload"):
+        return
+    for hospitals in sizes["hospitals"]:
+        latest = synthetic.hospital_resources(days=7, hospitals=hospitals, seed=seed).groupby("hospital_id").last()
+        available = [{
+            "icu_beds": row.available_icu_beds, "ventilators": row.available_ventilators,
+            "oxygen_cylinders": row.available_oxygen_cylinders, "doctors": row.available_doctors,
+            "nurses": row.available_nurses,
+        } for row in latest.itertuples()]
+        predicted = np.random.default_rng(seed).gamma(2.0, 40.0, hospitals)
+
+        def run(available=available, predicted=predicted):
+            for resources, cases in zip(available, predicted):
+                predict_overload([{"week": "2024-01-07", "predicted": cases}], resources)
+        yield "predict_overload", hospitals, run, None
+
+
+PLOT_CHARTS = ["bangalore_trend_line", "bangalore_hospitalized_bar", "bangalore_stacked_area",
+               "national_new_cases_bar", "national_total_vs_new", "national_total_cases_line",
+               "national_new_cases_line"]
+
+
+def plot_cases(sizes, seed, wanted):
+    charts = [chart_id for chart_id in PLOT_CHARTS if wanted(f"plot:{chart_id}")]
+    if not charts:
+        return
+    for days in sizes["plot_days"]:
+        bangalore = synthetic.bangalore_csv(days, seed)
+        national = synthetic.national_series(days, seed)
+        series = {"dates": bangalore["Date.Announced"], "hospitalized": bangalore["Hospitalized"],
+                  "recovered": bangalore["Recovered"], "deceased": bangalore["Deceased"]}
+        last_30 = national.tail(30)
+        data = {
+            "bangalore_trend_line": series,
+            "bangalore_hospitalized_bar": {"dates": series["dates"], "hospitalized": series["hospitalized"]},
+            "bangalore_stacked_area": series,
+            "national_new_cases_bar": {"dates": last_30["Date"].values, "new_cases": last_30["New Cases"].values},
+            "national_total_vs_new": {"dates": national["Date"].values, "total_cases": national["Total Cases"].values,
+                                      "new_cases": national["New Cases"].values},
+            "national_total_cases_line": {"dates": national["Date"].values,
+                                          "total_cases": national["Total Cases"].values},
+            "national_new_cases_line": {"dates": national["Date"].values, "new_cases": national["New Cases"].values},
+        }
+        for chart_id in charts:
+            yield f"plot:{chart_id}", days, lambda chart_id=chart_id, chart_data=data[chart_id]: \
+                render_chart(chart_id, chart_data), None
+
+
+CASE_GROUPS = [dengue_cases, covid_cases, overload_cases, plot_cases]
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(sizes, repeats: int, seed: int, only=None):
+    warm_up()
+    results = []
+
+    # Groups check names before building data or fitting models for a case
+    def wanted(name: str) -> bool:
+        return not only or fnmatch.fnmatch(name, only)
+
+    for group in CASE_GROUPS:
+        for name, size, fn, setup in group(sizes, seed, wanted):
+            median, fastest = time_case(fn, repeats, setup)
+            results.append({"name": name, "size": size, "repeats": repeats,
+                            "median_s": round(median, 6), "min_s": round(fastest, 6)})
+            print(f"  {name:<45} {size:>6}  median {median * 1000:>10.2f} ms  min {fastest * 1000:>10.2f} ms")
+    return results
+
+
+def compare(results, baseline_path: str, tolerance: float) -> int:
+    with open(baseline_path) as f:
+        baseline = {(r["name"], r["size"]): r for r in json.load(f)["results"]}
+    regressions = 0
+    print(f"\ncompared with {baseline_path} (tolerance {tolerance}x)")
+    for r in results:
+        before = baseline.get((r["name"], r["size"]))
+        if before is None or before["median_s"] <= 0:
+            continue
+        ratio = r["median_s"] / before["median_s"]
+        flag = "REGRESSION" if ratio > tolerance else ""
+        regressions += ratio > tolerance
+        print(f"  {r['name']:<45} {r['size']:>6}  {ratio:>6.2f}x  {flag}")
+    return regressions
+
+
+def main(args) -> int:
+    sizes = QUICK_SIZES if args.quick else SIZES
+    print(f"benchmark suite, seed {args.seed}, {args.repeats} repeats")
+    results = run_suite(sizes, args.repeats, args.seed, args.only)
+
+    report = {
+        "commit": git_commit(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "versions": {"numpy": np.__version__, "pandas": pd.__version__},
+        "seed": args.seed,
+        "results": results,
+    }
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"wrote {args.output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        print("PASS" if not regressions else f"FAIL ({regressions} regressions)")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.25)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", help="glob on case names, e.g. 'plot:*'")
+    parser.add_argument("--quick", action="store_true", help="smallest size of each case only")
+    sys.exit(main(parser.parse_args()))
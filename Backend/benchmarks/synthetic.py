@@ -0,0 +1,116 @@
+"""Seeded synthetic stand-ins for the datasets that are not checked in.
+
+Every generator takes a size and a seed and returns the same frame for the
+same arguments, so benchmark runs on different commits see identical data.
+Column names match the tables (or CSV) each one replaces.
+"""
+
+import numpy as np
+import pandas as pd
+
+RESOURCE_COLUMNS = [
+    "total_beds", "available_beds", "occupied_beds",
+    "icu_beds", "available_icu_beds", "occupied_icu_beds",
+    "total_ventilators", "available_ventilators", "used_ventilators",
+    "total_oxygen_cylinders", "available_oxygen_cylinders", "used_oxygen_cylinders",
+    "total_doctors", "available_doctors", "total_nurses", "available_nurses",
+    "total_icu_nurses", "available_icu_nurses",
+]
+
+
+def dengue_data(weeks: int = 260, seed: int = 42) -> pd.DataFrame:
+    """dengue_data: weekly cases that follow monsoon rainfall with a few weeks' lag"""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2015-01-04", periods=weeks, freq="W")
+    season = np.sin(2 * np.pi * (dates.dayofyear.to_numpy() - 152) / 365.25)
+    monsoon = dates.month.isin([6, 7, 8, 9])
+    rainfall = np.where(monsoon, 150 + 60 * np.maximum(season, 0), 25) + rng.gamma(2, 12, weeks)
+    lagged = np.concatenate([np.full(3, rainfall[:3].mean()), rainfall[:-3]])
+    cases = 35 + 0.5 * lagged + 15 * np.maximum(season, 0) + rng.normal(0, 8, weeks)
+    return pd.DataFrame({
+        "date": dates.strftime("%Y-%m-%d"),
+        "reported_cases": np.maximum(cases, 0).astype(int),
+        "rainfall_mm": rainfall.round(1),
+    })
+
+
+def bangalore_cases(days: int = 365, seed: int = 42) -> pd.DataFrame:
+    """bangalore_cases: daily hospitalized/recovered/deceased over two epidemic waves"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(days)
+    waves = (700 * np.exp(-((t - days * 0.3) ** 2) / (2 * (days / 12) ** 2))
+             + 1100 * np.exp(-((t - days * 0.7) ** 2) / (2 * (days / 16) ** 2)))
+    hospitalized = np.maximum(0, waves + rng.normal(0, 25, days)).astype(int)
+    recovered = np.maximum(0, np.roll(hospitalized, 14) * 0.95 + rng.normal(0, 10, days)).astype(int)
+    deceased = rng.binomial(np.roll(hospitalized, 10), 0.012)
+    return pd.DataFrame({
+        "date": pd.date_range("2020-03-01", periods=days, freq="D").strftime("%Y-%m-%d"),
+        "hospitalized": hospitalized,
+        "recovered": recovered,
+        "deceased": deceased,
+    })
+
+
+def bangalore_csv(days: int = 365, seed: int = 42) -> pd.DataFrame:
+    """The cleaned Bangalore CSV columns used by the district plots"""
+    df = bangalore_cases(days, seed)
+    return pd.DataFrame({
+        "Date.Announced": pd.to_datetime(df["date"]),
+        "Hospitalized": df["hospitalized"],
+        "Recovered": df["recovered"],
+        "Deceased": df["deceased"],
+    })
+
+
+def hospital_resources(days: int = 90, hospitals: int = 20, seed: int = 42) -> pd.DataFrame:
+    """Per-hospital daily resource reports (hospital_id, date, hospital_resource_timeseries columns)"""
+    rng = np.random.default_rng(seed)
+    n = days * hospitals
+    size = np.repeat(rng.integers(50, 800, hospitals), days)
+    load = np.tile(0.55 + 0.35 * np.sin(np.linspace(0, 3 * np.pi, days)), hospitals)
+    load = np.clip(load + rng.normal(0, 0.05, n), 0.05, 1.0)
+
+    frame = {
+        "hospital_id": np.repeat(np.arange(1, hospitals + 1), days),
+        "date": np.tile(pd.date_range("2024-01-01", periods=days, freq="D").strftime("%Y-%m-%d"), hospitals),
+    }
+    for total, available, used, per_bed in [
+        ("total_beds", "available_beds", "occupied_beds", 1.0),
+        ("icu_beds", "available_icu_beds", "occupied_icu_beds", 0.1),
+        ("total_ventilators", "available_ventilators", "used_ventilators", 0.05),
+        ("total_oxygen_cylinders", "available_oxygen_cylinders", "used_oxygen_cylinders", 0.3),
+    ]:
+        capacity = np.maximum(1, (size * per_bed).astype(int))
+        in_use = np.minimum(capacity, (capacity * load).astype(int))
+        frame[total], frame[available], frame[used] = capacity, capacity - in_use, in_use
+    for total, available, per_bed in [("total_doctors", "available_doctors", 0.08),
+                                      ("total_nurses", "available_nurses", 0.25),
+                                      ("total_icu_nurses", "available_icu_nurses", 0.05)]:
+        staff = np.maximum(1, (size * per_bed).astype(int))
+        frame[total], frame[available] = staff, rng.binomial(staff, 0.85)
+    frame["staff_reduction_factors"] = rng.uniform(0.0, 0.2, n).round(3)
+    return pd.DataFrame(frame)
+
+
+def hospital_resource_timeseries(days: int = 90, hospitals: int = 20, seed: int = 42) -> pd.DataFrame:
+    """hospital_resource_timeseries: the regional daily totals of hospital_resources"""
+    df = hospital_resources(days, hospitals, seed)
+    totals = df.groupby("date", sort=True)[RESOURCE_COLUMNS].sum().reset_index()
+    totals["staff_reduction_factors"] = df.groupby("date", sort=True)["staff_reduction_factors"].mean().values
+    return totals
+
+
+def national_series(days: int = 1100, seed: int = 7) -> pd.DataFrame:
+    """The parsed api-ninjas India series (Date, Total Cases, New Cases)"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(days)
+    waves = sum(
+        peak * np.exp(-((t - center) ** 2) / (2 * width ** 2))
+        for peak, center, width in [(90000, days * 0.22, 45), (380000, days * 0.43, 30), (300000, days * 0.67, 20)]
+    )
+    new = np.maximum(0, waves + rng.normal(0, 2000, days)).astype(int)
+    return pd.DataFrame({
+        "Date": pd.date_range("2020-01-22", periods=days, freq="D"),
+        "Total Cases": np.cumsum(new),
+        "New Cases": new,
+    })
@@ -0,0 +1,121 @@
+"""Training time and backtest accuracy of the dengue ensemble per training profile.
+
+Run from the Backend directory:
+    python benchmarks/training_profiles.py --weeks 260,1040,5200 --budget-s 2
+
+For each history length (synthetic.dengue_data), trains:
+
+    <profile>           every profile in TRAINING_PROFILES, without a budget
+    <profile>@budget    the same under --budget-s
+    <profile>+warm      profiles with warm_trees, updated from the unbudgeted
+                        fit on all but the last --new-weeks weeks
+
+and reports fit seconds, tree counts and MAE/RMSE on the held-out 20%.
+Each fitted ensemble is also saved as an artifact and reloaded, and must
+forecast like the sklearn models it was flattened from.
+
+The exit status is non-zero if a budgeted fit overruns --budget-s by more
+than --overrun, if a profile's MAE is more than --max-mae-ratio times the
+reference profile's, or if an artifact forecasts differently.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from benchmarks import synthetic
+from forecasting import TRAINING_PROFILES, DengueForecastingSystem
+from model_artifacts import load_dengue_artifact, save_dengue_artifact
+
+
+def fit(df, profile: str, budget_s: float = 0, warm_from=None) -> DengueForecastingSystem:
+    system = DengueForecastingSystem(df=df)
+    system.train_ensemble(profile, budget_s, warm_from)
+    return system
+
+
+def artifact_matches(system: DengueForecastingSystem) -> bool:
+    path = os.path.join(tempfile.mkdtemp(prefix="training-profiles-"), "dengue")
+    save_dengue_artifact(system, path)
+    loaded = load_dengue_artifact(path)
+    expected = system.forecast(weeks=4)["cases_predicted"].to_numpy()
+    return np.allclose(loaded.forecast(weeks=4)["cases_predicted"].to_numpy(), expected, rtol=1e-9)
+
+
+def row(label: str, weeks: int, system: DengueForecastingSystem) -> dict:
+    training, metrics = system.training, system.metrics["ensemble"]
+    return {
+        "run": label,
+        "weeks": weeks,
+        "seconds": round(training["seconds"], 3),
+        "complete": training["complete"],
+        "rf_trees": training["rf_trees"],
+        "boost_stages": training["boost_stages"],
+        "mae": round(float(metrics["mae"]), 3),
+        "rmse": round(float(metrics["rmse"]), 3),
+        "artifact_ok": artifact_matches(system),
+    }
+
+
+def measure(weeks: int, args) -> list:
+    df = synthetic.dengue_data(weeks, args.seed)
+    rows = []
+    for profile, settings in TRAINING_PROFILES.items():
+        rows.append(row(profile, weeks, fit(df, profile)))
+        rows.append(row(f"{profile}@budget", weeks, fit(df, profile, args.budget_s)))
+        if settings["warm_trees"]:
+            previous = fit(df.iloc[:-args.new_weeks], profile)
+            rows.append(row(f"{profile}+warm", weeks, fit(df, profile, warm_from=previous)))
+    return rows
+
+
+def main(args) -> int:
+    levels = [int(weeks) for weeks in args.weeks.split(",")]
+    rows = [result for weeks in levels for result in measure(weeks, args)]
+
+    print(f"  {'run':<18} {'weeks':>6} {'seconds':>8} {'trees':>6} {'stages':>7} {'MAE':>8} {'RMSE':>8} {'artifact':>9}")
+    for result in rows:
+        print(f"  {result['run']:<18} {result['weeks']:>6} {result['seconds']:>8.3f} {result['rf_trees']:>6} "
+              f"{result['boost_stages']:>7} {result['mae']:>8.3f} {result['rmse']:>8.3f} "
+              f"{'ok' if result['artifact_ok'] else 'DIFF':>9}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"budget_s": args.budget_s, "runs": rows}, f, indent=2)
+        print(f"wrote {args.output}")
+
+    failures = []
+    for result in rows:
+        if result["run"].endswith("@budget") and result["seconds"] > args.budget_s * args.overrun:
+            failures.append(f"{result['run']} took {result['seconds']}s at {result['weeks']} weeks")
+        if not result["artifact_ok"]:
+            failures.append(f"{result['run']} artifact forecasts differently at {result['weeks']} weeks")
+    reference = {result["weeks"]: result["mae"] for result in rows if result["run"] == "reference"}
+    for result in rows:
+        if result["run"] in TRAINING_PROFILES and result["mae"] > reference[result["weeks"]] * args.max_mae_ratio:
+            failures.append(f"{result['run']} MAE {result['mae']} vs reference {reference[result['weeks']]} "
+                            f"at {result['weeks']} weeks")
+    print("PASS" if not failures else f"FAIL ({'; '.join(failures)})")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--weeks", default="260,1040,5200", help="comma-separated history lengths")
+    parser.add_argument("--budget-s", type=float, default=2.0)
+    parser.add_argument("--overrun", type=float, default=1.5,
+                        help="allowed ratio of budgeted fit time to --budget-s (a round can finish late)")
+    parser.add_argument("--max-mae-ratio", type=float, default=1.1)
+    parser.add_argument("--new-weeks", type=int, default=4, help="weeks of new data for the warm-start update")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the report as JSON here")
+    args = parser.parse_args()
+    if args.output:
+        args.output = os.path.abspath(args.output)
+    sys.exit(main(args))
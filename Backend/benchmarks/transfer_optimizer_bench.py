@@ -0,0 +1,92 @@
+"""Regional transfer planning with thousands of synthetic hospitals.
+
+Run from the Backend directory:
+    python benchmarks/transfer_optimizer_bench.py --hospitals 3000 --days 3
+
+Day 1 is solved cold. On each following day, availability and predicted
+cases drift a little, and the plan is solved both cold and warm-started
+from the previous day's plan. The report covers solve time, unit-km cost,
+unmet units and how many transfers carried over. Exits non-zero if a cold
+solve takes longer than --budget-s.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from transfer_optimizer import TRANSFER_RESOURCES, plan_transfers
+
+
+def synthetic_region(n: int, seed: int = 5):
+    """Hospitals across roughly Karnataka, with a few hotspots of high predicted load"""
+    rng = np.random.default_rng(seed)
+    latitude = rng.uniform(11.5, 18.5, n)
+    longitude = rng.uniform(74.0, 78.5, n)
+    predicted = rng.gamma(2.0, 20.0, n)
+    hotspots = rng.choice(n, n // 20, replace=False)
+    predicted[hotspots] *= 8
+    available = {resource: rng.poisson(6, n).astype(float) for resource in TRANSFER_RESOURCES}
+    return np.arange(1, n + 1), latitude, longitude, available, predicted, rng
+
+
+def drift(available, predicted, rng, fraction: float = 0.05):
+    """Next day's data: a few percent of hospitals change"""
+    n = len(predicted)
+    changed = rng.choice(n, max(1, int(n * fraction)), replace=False)
+    predicted = predicted.copy()
+    predicted[changed] *= rng.uniform(0.7, 1.4, len(changed))
+    available = {resource: values.copy() for resource, values in available.items()}
+    for values in available.values():
+        values[changed] = np.maximum(0, values[changed] + rng.integers(-2, 3, len(changed)))
+    return available, predicted
+
+
+def summary(label, plan):
+    units = sum(t["units"] for t in plan["transfers"])
+    print(f"  {label:<12} {plan['solve_seconds']:>7.3f} s  {len(plan['transfers']):>6} transfers  "
+          f"{units:>7} units  {plan['total_unit_km']:>12.0f} unit-km  unmet {sum(plan['unmet'].values()):>6}")
+
+
+def carried_over(previous, plan):
+    before = {(t["resource"], t["from"], t["to"]) for t in previous["transfers"]}
+    return sum((t["resource"], t["from"], t["to"]) in before for t in plan["transfers"])
+
+
+def main(n: int, days: int, budget_s: float, seed: int) -> int:
+    ids, latitude, longitude, available, predicted, rng = synthetic_region(n, seed)
+    print(f"{n} hospitals, resources: {', '.join(TRANSFER_RESOURCES)}")
+
+    print("day 1")
+    plan = plan_transfers(ids, latitude, longitude, available, predicted)
+    summary("cold", plan)
+    worst_cold = plan["solve_seconds"]
+
+    for day in range(2, days + 1):
+        available, predicted = drift(available, predicted, rng)
+        print(f"day {day}")
+        cold = plan_transfers(ids, latitude, longitude, available, predicted)
+        warm = plan_transfers(ids, latitude, longitude, available, predicted, previous=plan)
+        summary("cold", cold)
+        summary("warm", warm)
+        print(f"  carried over: cold {carried_over(plan, cold)}, warm {carried_over(plan, warm)} "
+              f"of {len(plan['transfers'])} transfers")
+        worst_cold = max(worst_cold, cold["solve_seconds"])
+        plan = warm
+
+    ok = worst_cold <= budget_s
+    print("PASS" if ok else f"FAIL (cold solve over {budget_s} s)")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hospitals", type=int, default=3000)
+    parser.add_argument("--days", type=int, default=3)
+    parser.add_argument("--budget-s", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+    sys.exit(main(args.hospitals, args.days, args.budget_s, args.seed))
@@ -0,0 +1,146 @@
+"""Per-worker memory and model propagation across `uvicorn --workers N`.
+
+Run from the Backend directory (Linux, reads /proc):
+    python benchmarks/worker_memory.py --workers 1,2,4,8 --max-growth 1.25
+
+For each worker count, starts the API in a throwaway working directory
+seeded like load_test.py and waits until every worker serves a dengue
+model (/api/dengue/model reports a version). Only one worker should have
+trained it. It then records each worker's RSS and PSS, where PSS splits
+shared pages (the memory-mapped artifact, the interpreter) between the
+processes that map them. Finally it POSTs /api/dengue/refresh and times
+how long the other workers take to serve the new version.
+
+The exit status is non-zero if mean per-worker PSS at the largest count is
+more than --max-growth times that at the smallest, or if the workers
+trained more than once.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.load_test import seed_workdir
+
+
+def get_json(url: str, method: str = "GET"):
+    request = urllib.request.Request(url, method=method)
+    try:
+        # A new connection per request, so the requests spread over the workers
+        with urllib.request.urlopen(request, timeout=300) as response:
+            return json.load(response)
+    except (urllib.error.URLError, ConnectionError, TimeoutError, ValueError):
+        return None
+
+
+def memory_kb(pid: int) -> dict:
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss"):
+                values[key.lower()] = int(rest.split()[0])
+    return values
+
+
+def wait_for_versions(base_url: str, workers: int, newer_than: int = 0, timeout: float = 300) -> dict:
+    """pid -> version, once every worker serves a version above newer_than"""
+    seen = {}
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        model = get_json(f"{base_url}/api/dengue/model")
+        if model and model["version"] is not None and model["version"] > newer_than:
+            seen[model["pid"]] = model["version"]
+            if len(seen) == workers:
+                return seen
+        else:
+            time.sleep(0.05)
+    raise RuntimeError(f"only {len(seen)} of {workers} workers served a version above {newer_than}")
+
+
+def measure(workers: int, port: int, seed: int) -> dict:
+    workdir = tempfile.mkdtemp(prefix="worker-memory-")
+    seed_workdir(workdir, seed)
+    env = dict(os.environ, PYTHONPATH=BACKEND_DIR + os.pathsep + os.environ.get("PYTHONPATH", ""),
+               PREWARM_ENABLED="0", CHART_WORKERS="1")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=workdir, env=env)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        versions = wait_for_versions(base_url, workers)
+        trained_version = max(versions.values())
+        # Each worker forecasts once, so all of them have touched the model
+        for _ in range(workers * 4):
+            get_json(f"{base_url}/api/dengue/predict")
+
+        memory = [memory_kb(pid) for pid in versions]
+
+        start = time.perf_counter()
+        refreshed = get_json(f"{base_url}/api/dengue/refresh", method="POST")
+        trained = time.perf_counter()
+        wait_for_versions(base_url, workers, newer_than=trained_version)
+        propagated = time.perf_counter()
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+    return {
+        "workers": workers,
+        "startup_trainings": trained_version,
+        "rss_mb": round(statistics.mean(m["rss"] for m in memory) / 1024, 1),
+        "pss_mb": round(statistics.mean(m["pss"] for m in memory) / 1024, 1),
+        "refresh_s": round(trained - start, 3),
+        "propagation_s": round(propagated - trained, 3),
+        "refreshed_version": refreshed and refreshed.get("version"),
+    }
+
+
+def main(args) -> int:
+    levels = [int(level) for level in args.workers.split(",")]
+    rows = [measure(workers, args.port, args.seed) for workers in levels]
+
+    print(f"  {'workers':>7} {'trainings':>9} {'RSS MB':>8} {'PSS MB':>8} {'refresh s':>10} {'propagate s':>12}")
+    for row in rows:
+        print(f"  {row['workers']:>7} {row['startup_trainings']:>9} {row['rss_mb']:>8.1f} {row['pss_mb']:>8.1f} "
+              f"{row['refresh_s']:>10.3f} {row['propagation_s']:>12.3f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"levels": rows}, f, indent=2)
+        print(f"wrote {args.output}")
+
+    failures = []
+    growth = rows[-1]["pss_mb"] / rows[0]["pss_mb"]
+    if growth > args.max_growth:
+        failures.append(f"per-worker PSS grew {growth:.2f}x")
+    retrained = [row["workers"] for row in rows if row["startup_trainings"] != 1]
+    if retrained:
+        failures.append(f"more than one startup training with {retrained} workers")
+    print("PASS" if not failures else f"FAIL ({'; '.join(failures)})")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", default="1,2,4,8", help="comma-separated worker counts")
+    parser.add_argument("--max-growth", type=float, default=1.25,
+                        help="allowed ratio of per-worker PSS, largest count over smallest")
+    parser.add_argument("--port", type=int, default=8768)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the report as JSON here")
+    args = parser.parse_args()
+    if args.output:
+        args.output = os.path.abspath(args.output)
+    sys.exit(main(args))
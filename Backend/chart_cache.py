@@ -0,0 +1,167 @@
+"""Rendered-chart cache keyed by (chart id, data version, parameters).
+
+Rendered images are kept in memory up to CHART_CACHE_MAX_BYTES; entries
+evicted from memory spill to CHART_CACHE_DIR on disk. The cache key doubles
+as the HTTP ETag of the raw image endpoints, so a client holding the current
+image gets a 304 without anything being rendered or read.
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from fastapi import HTTPException, Request, Response
+
+import chart_renderer
+
+CHART_CACHE_MAX_BYTES = int(os.getenv("CHART_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+CHART_CACHE_DISK_MAX_BYTES = int(os.getenv("CHART_CACHE_DISK_MAX_BYTES", 512 * 1024 * 1024))
+CHART_CACHE_DIR = os.getenv("CHART_CACHE_DIR", "cache/charts")
+CHART_MAX_AGE = int(os.getenv("CHART_MAX_AGE", 60))
+
+MEDIA_TYPES = {
+    "png": "image/png",
+    "svg": "image/svg+xml",
+    "webp": "image/webp",
+}
+
+
+def data_version(data: Dict) -> str:
+    """Content hash of the arrays a chart is drawn from"""
+    digest = hashlib.blake2b(digest_size=16)
+    for name in sorted(data):
+        value = data[name]
+        digest.update(name.encode())
+        if value is None:
+            digest.update(b"\0none")
+            continue
+        array = np.ascontiguousarray(np.asarray(value))
+        digest.update(array.dtype.str.encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def cache_key(chart_id: str, version: str, params: Optional[Dict] = None) -> str:
+    raw = json.dumps([chart_id, version, params or {}], sort_keys=True)
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+class ChartCache:
+    def __init__(self, max_bytes: int, disk_dir: str, disk_max_bytes: int):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.bin")
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._disk_path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _spill(self, spilled: Dict[str, bytes]) -> None:
+        os.makedirs(self.disk_dir, exist_ok=True)
+        for key, body in spilled.items():
+            tmp_path = f"{self._disk_path(key)}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(body)
+            os.replace(tmp_path, self._disk_path(key))
+
+        # Trim the disk layer, oldest files first
+        files = [os.path.join(self.disk_dir, name) for name in os.listdir(self.disk_dir) if name.endswith(".bin")]
+        files.sort(key=os.path.getmtime)
+        total = sum(os.path.getsize(path) for path in files)
+        for path in files:
+            if total <= self.disk_max_bytes:
+                break
+            total -= os.path.getsize(path)
+            os.remove(path)
+
+    def _put(self, key: str, body: bytes) -> None:
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return
+        self._entries[key] = body
+        self._bytes += len(body)
+
+        spilled = {}
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            old_key, old_body = self._entries.popitem(last=False)
+            self._bytes -= len(old_body)
+            spilled[old_key] = old_body
+            self.stats["evictions"] += 1
+        if spilled:
+            asyncio.get_running_loop().run_in_executor(None, self._spill, spilled)
+
+    async def get_or_render(self, chart_id: str, data: Dict, key: str, fmt: str = "png") -> bytes:
+        body = self._entries.get(key)
+        if body is not None:
+            self._entries.move_to_end(key)
+            self.stats["memory_hits"] += 1
+            return body
+
+        body = await asyncio.to_thread(self._read_disk, key)
+        if body is not None:
+            self.stats["disk_hits"] += 1
+            self._put(key, body)
+            return body
+
+        # Concurrent requests for the same chart share a single render
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        self.stats["misses"] += 1
+        pending = asyncio.ensure_future(chart_renderer.render(chart_id, data, fmt))
+        self._inflight[key] = pending
+        try:
+            body = await pending
+        finally:
+            self._inflight.pop(key, None)
+        self._put(key, body)
+        return body
+
+
+chart_cache = ChartCache(CHART_CACHE_MAX_BYTES, CHART_CACHE_DIR, CHART_CACHE_DISK_MAX_BYTES)
+
+
+async def get_chart(chart_id: str, data: Dict, params: Optional[Dict] = None, fmt: str = "png") -> Tuple[str, bytes]:
+    """Return (etag, image bytes), rendering only if this data version is new"""
+    key = cache_key(chart_id, data_version(data), dict(params or {}, fmt=fmt))
+    return key, await chart_cache.get_or_render(chart_id, data, key, fmt)
+
+
+async def get_charts_base64(requests: Dict[str, Tuple[str, Dict]]) -> Dict[str, str]:
+    """Cached counterpart of chart_renderer.render_many"""
+    keys = list(requests)
+    results = await asyncio.gather(*(get_chart(*requests[key]) for key in keys))
+    return {key: base64.b64encode(body).decode("utf-8") for key, (_, body) in zip(keys, results)}
+
+
+async def image_response(request: Request, chart_id: str, data: Dict,
+                         params: Optional[Dict] = None, fmt: str = "png") -> Response:
+    """Raw image response with ETag/Cache-Control, or 304 if the client is current"""
+    if fmt not in MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unsupported image format: {fmt}")
+
+    etag = '"' + cache_key(chart_id, data_version(data), dict(params or {}, fmt=fmt)) + '"'
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={CHART_MAX_AGE}, must-revalidate"}
+
+    if_none_match = [tag.strip().removeprefix("W/") for tag in request.headers.get("if-none-match", "").split(",")]
+    if etag in if_none_match or "*" in if_none_match:
+        return Response(status_code=304, headers=headers)
+
+    _, body = await get_chart(chart_id, data, params, fmt)
+    return Response(content=body, media_type=MEDIA_TYPES[fmt], headers=headers)
@@ -0,0 +1,79 @@
+"""Process-pool rendering service for the plot endpoints.
+
+Matplotlib is slow and holds the GIL, so charts are rendered in a pool of
+worker processes that import and warm up matplotlib once. Route handlers
+await the results, and multi-figure endpoints render all figures at once.
+"""
+
+import asyncio
+import base64
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Tuple
+
+from metrics import span
+
+CHART_WORKERS = int(os.getenv("CHART_WORKERS", min(4, os.cpu_count() or 1)))
+
+_pool = None
+
+
+def _init_worker() -> None:
+    import charts
+    charts.warm_up()
+
+
+def _warm_task() -> int:
+    return os.getpid()
+
+
+def _render(chart_id: str, data: Dict, fmt: str) -> bytes:
+    # charts (and matplotlib) are only imported inside the workers
+    import charts
+    return charts.render_chart(chart_id, data, fmt)
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn, not fork: the server process has threads running
+        _pool = ProcessPoolExecutor(
+            max_workers=CHART_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+    return _pool
+
+
+async def start() -> None:
+    """Start every worker now instead of on the first plot request"""
+    loop = asyncio.get_running_loop()
+    pool = get_pool()
+    await asyncio.gather(*(loop.run_in_executor(pool, _warm_task) for _ in range(CHART_WORKERS)))
+
+
+def shutdown() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def render(chart_id: str, data: Dict, fmt: str = "png") -> bytes:
+    """Render one registered chart in the pool and return the image bytes"""
+    loop = asyncio.get_running_loop()
+    with span(f"plot:{chart_id}"):
+        return await loop.run_in_executor(get_pool(), _render, chart_id, data, fmt)
+
+
+async def render_base64(chart_id: str, data: Dict) -> str:
+    image = await render(chart_id, data)
+    return base64.b64encode(image).decode("utf-8")
+
+
+async def render_many(requests: Dict[str, Tuple[str, Dict]]) -> Dict[str, str]:
+    """Render several charts in parallel; returns base64 PNGs by key"""
+    keys = list(requests)
+    images = await asyncio.gather(*(render_base64(*requests[key]) for key in keys))
+    return dict(zip(keys, images))
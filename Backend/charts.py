@@ -0,0 +1,186 @@
+"""Figure builders for every plot endpoint.
+
+Builders take plain data (arrays, lists) and return a matplotlib Figure, so
+they can run inline or inside a chart_renderer worker process. Each one is
+registered under a chart id with the savefig options its endpoint uses.
+"""
+
+import io
+from typing import Callable, Dict, Tuple
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import matplotlib.ticker as ticker
+import pandas as pd
+
+CHARTS: Dict[str, Tuple[Callable, Dict]] = {}
+
+
+def chart(chart_id: str, **savefig_kwargs):
+    """Register a figure builder under a chart id"""
+    def register(builder):
+        CHARTS[chart_id] = (builder, savefig_kwargs)
+        return builder
+    return register
+
+
+def render_chart(chart_id: str, data: Dict, fmt: str = "png") -> bytes:
+    """Build a registered chart and return the encoded image bytes"""
+    builder, savefig_kwargs = CHARTS[chart_id]
+    fig = builder(**data)
+    try:
+        buf = io.BytesIO()
+        fig.savefig(buf, format=fmt, **savefig_kwargs)
+        return buf.getvalue()
+    finally:
+        plt.close(fig)
+
+
+def warm_up() -> None:
+    """Import plotting backends and draw once so first real renders are fast"""
+    import seaborn  # noqa: F401
+
+    fig, ax = plt.subplots(figsize=(2, 2))
+    ax.plot([0, 1], [0, 1])
+    fig.savefig(io.BytesIO(), format="png")
+    plt.close(fig)
+
+
+# Forecast charts (DengueForecastingSystem / CovidForecastModel)
+
+@chart("dengue_forecast")
+def dengue_forecast(dates, predictions, lower_ci=None, upper_ci=None):
+    fig, ax = plt.subplots(figsize=(10, 6), dpi=120)
+
+    if dates is not None:
+        dates = pd.to_datetime(dates)
+        ax.plot(dates, predictions, 'r--', label='Forecast', linewidth=2)
+
+        # Plot confidence intervals if available
+        if lower_ci is not None and upper_ci is not None:
+            ax.fill_between(dates, lower_ci, upper_ci, color='red', alpha=0.2, label='Confidence Interval')
+
+    ax.set_title('Dengue Case Forecast')
+    ax.set_xlabel('Date')
+    ax.set_ylabel('Reported Cases')
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    return fig
+
+
+@chart("covid_forecast")
+def covid_forecast(dates, predicted_cases):
+    fig, ax = plt.subplots(figsize=(10, 6), dpi=120)
+    ax.plot(pd.to_datetime(dates), predicted_cases, 'r--', label='Forecast', linewidth=2)
+    ax.set_title('COVID-19 Case Forecast')
+    ax.set_xlabel('Date')
+    ax.set_ylabel('Predicted Cases')
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    return fig
+
+
+# Bangalore district charts (routes/district.py)
+
+@chart("bangalore_trend_line", bbox_inches="tight")
+def bangalore_trend_line(dates, hospitalized, recovered, deceased):
+    fig, ax = plt.subplots(figsize=(12, 6))
+    ax.plot(dates, hospitalized, label='Hospitalized')
+    ax.plot(dates, recovered, label='Recovered')
+    ax.plot(dates, deceased, label='Deceased')
+    ax.set_title("COVID Case Trends in Bangalore")
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Count")
+    ax.legend()
+    ax.grid(True)
+    fig.tight_layout()
+    return fig
+
+
+@chart("bangalore_hospitalized_bar", bbox_inches="tight")
+def bangalore_hospitalized_bar(dates, hospitalized):
+    fig, ax = plt.subplots(figsize=(12, 6))
+    ax.bar(dates, hospitalized, color='skyblue')
+    ax.set_title("Daily Hospitalized Cases")
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Hospitalized")
+    ax.grid(True)
+    fig.tight_layout()
+    return fig
+
+
+@chart("bangalore_stacked_area", bbox_inches="tight")
+def bangalore_stacked_area(dates, hospitalized, recovered, deceased):
+    fig, ax = plt.subplots(figsize=(12, 6))
+    ax.stackplot(dates, hospitalized, recovered, deceased,
+                 labels=['Hospitalized', 'Recovered', 'Deceased'], colors=['orange', 'green', 'red'])
+    ax.set_title("Stacked Area: COVID Trends")
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Count")
+    ax.legend(loc='upper left')
+    ax.grid(True)
+    fig.tight_layout()
+    return fig
+
+
+# National charts (routes/national.py)
+
+@chart("national_new_cases_bar", bbox_inches="tight")
+def national_new_cases_bar(dates, new_cases):
+    fig, ax = plt.subplots(figsize=(14, 6))
+    ax.bar(dates, new_cases, color='steelblue')
+    ax.set_title("Daily New COVID-19 Cases (Last 30 Days)")
+    ax.set_xlabel("Date")
+    ax.set_ylabel("New Cases")
+    ax.tick_params(axis='x', rotation=45)
+    fig.tight_layout()
+    return fig
+
+
+@chart("national_total_vs_new", bbox_inches="tight")
+def national_total_vs_new(dates, total_cases, new_cases):
+    fig, ax = plt.subplots(figsize=(14, 6))
+    ax.plot(dates, total_cases, color="orange")
+    ax.set_ylabel("Total Cases", color="orange")
+    axb = ax.twinx()
+    axb.plot(dates, new_cases, color="steelblue", alpha=0.6)
+    axb.set_ylabel("New Cases", color="steelblue")
+    fig.suptitle("COVID-19 Total vs New Cases in India Over Time")
+    fig.tight_layout()
+    return fig
+
+
+@chart("national_total_cases_line", bbox_inches="tight")
+def national_total_cases_line(dates, total_cases):
+    import seaborn as sns
+
+    fig, ax = plt.subplots(figsize=(14, 6))
+    df = pd.DataFrame({"Date": dates, "Total Cases": total_cases})
+    sns.lineplot(data=df, x="Date", y="Total Cases", color="orange", ax=ax)
+    ax.set_title("Total COVID-19 Cases in India Over Time")
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Total Cases")
+    ax.tick_params(axis='x', rotation=45)
+    ax.grid(True)
+    ax.yaxis.set_major_formatter(ticker.FuncFormatter(lambda x, _: f'{x*1e-6:.0f}M'))
+    fig.tight_layout()
+    return fig
+
+
+@chart("national_new_cases_line", bbox_inches="tight")
+def national_new_cases_line(dates, new_cases):
+    import seaborn as sns
+
+    fig, ax = plt.subplots(figsize=(14, 6))
+    df = pd.DataFrame({"Date": dates, "New Cases": new_cases})
+    sns.lineplot(data=df, x="Date", y="New Cases", color="steelblue", ax=ax)
+    ax.set_title("Daily New COVID-19 Cases in India Over Time")
+    ax.set_xlabel("Date")
+    ax.set_ylabel("New Cases")
+    ax.tick_params(axis='x', rotation=45)
+    ax.grid(True)
+    fig.tight_layout()
+    return fig
@@ -1,12 +1,18 @@
 import sqlite3
 from contextlib import contextmanager
 from fastapi import HTTPException
+from metrics import span
+from events import install_change_counters
+from latest_snapshot import install_latest
+from resource_rollup import install_resource_rollup
+from forecast_accuracy import install_forecast_accuracy
 
 DATABASE_PATH = "db/dengue.db"
 
 
 def get_db():
-    conn = sqlite3.connect(DATABASE_PATH,check_same_thread=False)
+    with span("db_connect"):
+        conn = sqlite3.connect(DATABASE_PATH,check_same_thread=False)
     try:
         yield conn
     finally:
@@ -59,5 +65,15 @@ def init_db():
         )
         """)
         conn.commit()
+
+        install_latest(conn, "dengue")
+        install_latest(conn, "hospital")
+        install_change_counters(conn, ["hospital_resource_timeseries", "forecasts"])
+        install_resource_rollup(conn)
+
+        from model_registry import install_model_versions
+        install_model_versions(conn)
+        # Stamps each forecast batch with the dengue model version, so after model_versions
+        install_forecast_accuracy(conn, "dengue")
     finally:
         conn.close()
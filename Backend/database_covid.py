@@ -1,11 +1,15 @@
 import sqlite3
 from contextlib import contextmanager
 from fastapi import HTTPException
+from metrics import span
+from latest_snapshot import install_latest
+from weekly_rollup import install_weekly_rollup
 
 DATABASE_PATH = "db/covid_data.db"
 
 def get_db_covid():
-    conn = sqlite3.connect(DATABASE_PATH,check_same_thread=False)
+    with span("db_connect"):
+        conn = sqlite3.connect(DATABASE_PATH,check_same_thread=False)
     try:
         yield conn
     finally:
@@ -21,6 +25,11 @@ def init_db_covid():
             predicted_cases INTEGER
         )
         """)
+        # Confidence bounds written by CovidForecastModel.save_predictions_to_db
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(forecast_covid)")]
+        for column in ("lower_ci", "upper_ci"):
+            if column not in columns:
+                conn.execute(f"ALTER TABLE forecast_covid ADD COLUMN {column} REAL")
         conn.execute("""
         CREATE TABLE IF NOT EXISTS bangalore_cases (
             date TIMESTAMP PRIMARY KEY,
@@ -40,6 +49,26 @@ def init_db_covid():
             email TEXT
             )
         """)
+        # Geocoded from location at signup (see geocoding.py)
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(user)")]
+        for column in ("latitude", "longitude"):
+            if column not in columns:
+                conn.execute(f"ALTER TABLE user ADD COLUMN {column} REAL")
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS hospital_capacity (
+            hospital_id INTEGER PRIMARY KEY,
+            updated_at TEXT,
+            available_beds INTEGER,
+            available_icu_beds INTEGER,
+            available_ventilators INTEGER,
+            available_oxygen_cylinders INTEGER,
+            available_doctors INTEGER,
+            available_nurses INTEGER
+        )
+        """)
         conn.commit()
+
+        install_latest(conn, "bangalore")
+        install_weekly_rollup(conn, "bangalore")
     finally:
         conn.close()
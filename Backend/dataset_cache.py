@@ -0,0 +1,253 @@
+"""Columnar, memory-mapped cache of the CSV and SQLite datasets.
+
+On first use, or when its source changes, each registered dataset is
+converted to one uncompressed .npy file per column under DATASET_CACHE_DIR
+(dates already parsed, rows already sorted). Reads then return read-only
+memory-mapped column views instead of re-parsing the CSV or pulling the
+whole table through pd.read_sql.
+
+A cached dataset is invalidated by the source's mtime/size. For SQLite
+sources, PRAGMA data_version on a long-lived connection is checked first,
+so an unchanged database is confirmed without touching the filesystem.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import threading
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+DATASET_CACHE_DIR = os.getenv("DATASET_CACHE_DIR", "cache/datasets")
+META_FILE = "meta.json"
+CACHE_FORMAT_VERSION = 1
+
+
+class CsvSource:
+    def __init__(self, path: str, parse_dates: Optional[List[str]] = None, sort_by: Optional[str] = None):
+        self.path = path
+        self.parse_dates = parse_dates or []
+        self.sort_by = sort_by
+
+    def signature(self) -> Dict:
+        stat = os.stat(self.path)
+        return {"path": self.path, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+    def unchanged(self) -> bool:
+        # No cheap change counter for plain files; fall back to stat
+        return False
+
+    def read(self) -> pd.DataFrame:
+        import pandas as pd
+
+        df = pd.read_csv(self.path, parse_dates=self.parse_dates)
+        if self.sort_by:
+            df = df.sort_values(self.sort_by, kind="stable").reset_index(drop=True)
+        return df
+
+
+class SqliteSource:
+    def __init__(self, db_path: str, table: str, order_by: Optional[str] = None,
+                 parse_dates: Optional[List[str]] = None):
+        self.db_path = db_path
+        self.table = table
+        self.order_by = order_by
+        self.parse_dates = parse_dates or []
+        self._watch = None
+        self._data_version = None
+
+    def signature(self) -> Dict:
+        signature = {"db": self.db_path, "table": self.table}
+        for suffix in ("", "-wal"):
+            path = self.db_path + suffix
+            if os.path.exists(path):
+                stat = os.stat(path)
+                signature[f"mtime_ns{suffix}"] = stat.st_mtime_ns
+                signature[f"size{suffix}"] = stat.st_size
+        return signature
+
+    def _current_data_version(self) -> int:
+        if self._watch is None:
+            self._watch = sqlite3.connect(self.db_path, check_same_thread=False)
+        return self._watch.execute("PRAGMA data_version").fetchone()[0]
+
+    def unchanged(self) -> bool:
+        """True if no connection has committed to the database since the last check"""
+        version = self._current_data_version()
+        unchanged = version == self._data_version
+        self._data_version = version
+        return unchanged
+
+    def read(self) -> pd.DataFrame:
+        import pandas as pd
+
+        query = f"SELECT * FROM {self.table}"
+        if self.order_by:
+            query += f" ORDER BY {self.order_by}"
+        conn = sqlite3.connect(self.db_path)
+        try:
+            df = pd.read_sql(query, conn)
+        finally:
+            conn.close()
+        for column in self.parse_dates:
+            df[column] = pd.to_datetime(df[column])
+        return df
+
+
+class Dataset:
+    """Read-only, memory-mapped columns of one cached dataset"""
+
+    def __init__(self, name: str, columns: Dict[str, np.ndarray], signature: Dict):
+        self.name = name
+        self.columns = columns
+        self.signature = signature
+        self.version = hashlib.sha1(json.dumps(signature, sort_keys=True).encode()).hexdigest()[:16]
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        # Plain ndarray view of the memmap: zero-copy and cheap to pickle
+        return np.asarray(self.columns[column])
+
+    def frame(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Copy (some of) the columns into a regular, writable DataFrame"""
+        import pandas as pd
+
+        names = columns or list(self.columns)
+        return pd.DataFrame({name: np.array(self.columns[name]) for name in names})
+
+
+def _to_column_array(series: pd.Series) -> np.ndarray:
+    import pandas as pd
+
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.to_numpy(dtype="datetime64[ns]")
+    if series.dtype == object:
+        # Fixed-width unicode keeps the .npy loadable without pickle
+        return series.fillna("").astype(str).to_numpy(dtype=str)
+    return series.to_numpy()
+
+
+class DatasetCache:
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self.sources: Dict[str, object] = {}
+        self._loaded: Dict[str, Dataset] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self.stats = {"hits": 0, "reopens": 0, "rebuilds": 0}
+
+    def register(self, name: str, source) -> None:
+        self.sources[name] = source
+        self._locks[name] = threading.Lock()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.cache_dir, name)
+
+    def _open(self, name: str) -> Optional[Dataset]:
+        meta_path = os.path.join(self._path(name), META_FILE)
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get("format_version") != CACHE_FORMAT_VERSION:
+            return None
+        columns = {
+            column: np.load(os.path.join(self._path(name), file_name), mmap_mode="r", allow_pickle=False)
+            for column, file_name in meta["columns"]
+        }
+        return Dataset(name, columns, meta["signature"])
+
+    def _build(self, name: str, signature: Dict) -> Dataset:
+        df = self.sources[name].read()
+
+        path = self._path(name)
+        tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+
+        # Column names (e.g. "Date.Announced") are not used as file names
+        columns = []
+        for i, column in enumerate(df.columns):
+            file_name = f"col_{i}.npy"
+            np.save(os.path.join(tmp_path, file_name), _to_column_array(df[column]), allow_pickle=False)
+            columns.append([column, file_name])
+
+        with open(os.path.join(tmp_path, META_FILE), "w") as f:
+            json.dump({
+                "format_version": CACHE_FORMAT_VERSION,
+                "signature": signature,
+                "columns": columns,
+                "rows": len(df),
+            }, f)
+
+        old_path = f"{tmp_path}.old"
+        if os.path.exists(path):
+            os.replace(path, old_path)
+        os.replace(tmp_path, path)
+        shutil.rmtree(old_path, ignore_errors=True)
+        return self._open(name)
+
+    def get(self, name: str) -> Dataset:
+        source = self.sources[name]
+        with self._locks[name]:
+            dataset = self._loaded.get(name)
+            # Checked before reading the signature so a commit racing the
+            # rebuild below is still seen on the next call
+            unchanged = source.unchanged()
+            if dataset is not None and unchanged:
+                self.stats["hits"] += 1
+                return dataset
+
+            signature = source.signature()
+            if dataset is not None and dataset.signature == signature:
+                self.stats["hits"] += 1
+                return dataset
+
+            dataset = self._open(name)
+            if dataset is not None and dataset.signature == signature:
+                self.stats["reopens"] += 1
+            else:
+                self.stats["rebuilds"] += 1
+                dataset = self._build(name, signature)
+            self._loaded[name] = dataset
+            return dataset
+
+
+dataset_cache = DatasetCache(DATASET_CACHE_DIR)
+dataset_cache.register(
+    "bangalore_csv",
+    CsvSource("data/df_bangalore_urban.csv", parse_dates=["Date.Announced"], sort_by="Date.Announced"),
+)
+dataset_cache.register(
+    "bangalore_cases",
+    SqliteSource("db/covid_data.db", "bangalore_cases", order_by="date", parse_dates=["date"]),
+)
+dataset_cache.register(
+    "dengue_data",
+    SqliteSource("db/dengue.db", "dengue_data", order_by="date", parse_dates=["date"]),
+)
+dataset_cache.register(
+    "hospital_resource_timeseries",
+    SqliteSource("db/dengue.db", "hospital_resource_timeseries", order_by="date"),
+)
+dataset_cache.register(
+    "forecasts",
+    SqliteSource("db/dengue.db", "forecasts", order_by="forecast_date, prediction_date"),
+)
+
+
+def load_dataset(name: str) -> Dataset:
+    return dataset_cache.get(name)
+
+
+def load_frame(name: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    return dataset_cache.get(name).frame(columns)
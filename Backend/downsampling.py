@@ -0,0 +1,154 @@
+"""Server-side downsampling for the chart-data (series) endpoints.
+
+Each series is reduced with Largest-Triangle-Three-Buckets into a pyramid
+of levels (n, n/2, n/4, ...) once per data version. A query for a date
+range and point budget picks the most detailed level that fits the budget
+and slices it with a binary search, so it costs O(points returned).
+"""
+
+import json
+from collections import OrderedDict
+from datetime import date, datetime, time
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from fastapi import HTTPException, Response
+
+MIN_LEVEL_POINTS = 64
+MAX_PYRAMIDS = 32
+SERIES_FORMATS = ("json", "f32")
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices of the points LTTB keeps when reducing (x, y) to n_out points"""
+    n = len(x)
+    if n_out >= n or n <= 2:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1])[:n_out]
+
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    # n - 2 inner points split into n_out - 2 buckets
+    edges = (np.arange(n_out - 1) * (n - 2) / (n_out - 2)).astype(np.int64) + 1
+    edges[-1] = n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # Average of the next bucket (the last point for the final bucket)
+        next_start = end
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        indices[i + 1] = a
+
+    return indices
+
+
+class SeriesPyramid:
+    """LTTB levels of one series, finest first; x is epoch seconds"""
+
+    def __init__(self, x: np.ndarray, y: np.ndarray):
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        self.levels = [(x, y)]
+
+        # Each level is built from the one before it, so the total is O(n)
+        budget = len(x) // 2
+        while budget >= MIN_LEVEL_POINTS:
+            prev_x, prev_y = self.levels[-1]
+            keep = lttb_indices(prev_x, prev_y, budget)
+            self.levels.append((prev_x[keep], prev_y[keep]))
+            budget //= 2
+
+    def query(self, start: float, end: float, max_points: int) -> Tuple[np.ndarray, np.ndarray]:
+        for level_x, level_y in self.levels:
+            lo = np.searchsorted(level_x, start, side="left")
+            hi = np.searchsorted(level_x, end, side="right")
+            if hi - lo <= max_points:
+                return level_x[lo:hi], level_y[lo:hi]
+
+        # Budget is below the coarsest level: reduce that slice directly
+        keep = lttb_indices(level_x[lo:hi], level_y[lo:hi], max_points)
+        return level_x[lo:hi][keep], level_y[lo:hi][keep]
+
+
+_pyramids: "OrderedDict[Tuple[str, str], Tuple[str, SeriesPyramid]]" = OrderedDict()
+
+
+def get_pyramid(dataset: str, version: str, name: str, dates, values) -> SeriesPyramid:
+    """Pyramid for a series, rebuilt only when its data version changes"""
+    key = (dataset, name)
+    cached = _pyramids.get(key)
+    if cached is not None and cached[0] == version:
+        _pyramids.move_to_end(key)
+        return cached[1]
+
+    x = np.asarray(dates, dtype="datetime64[ns]").astype(np.int64) / 1e9
+    pyramid = SeriesPyramid(x, values)
+    _pyramids[key] = (version, pyramid)
+    _pyramids.move_to_end(key)
+    while len(_pyramids) > MAX_PYRAMIDS:
+        _pyramids.popitem(last=False)
+    return pyramid
+
+
+def _epoch_seconds(value: Optional[date], default: float, end_of_day: bool = False) -> float:
+    if value is None:
+        return default
+    moment = datetime.combine(value, time.max if end_of_day else time.min)
+    return (np.datetime64(moment, "ns").astype(np.int64)) / 1e9
+
+
+def series_response(dataset: str, version: str, series: Dict[str, Tuple[np.ndarray, np.ndarray]],
+                    names: Optional[str], points: int, start: Optional[date], end: Optional[date],
+                    fmt: str = "json") -> Response:
+    """Downsampled series as JSON, or one series as packed float32 pairs"""
+    if fmt not in SERIES_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported series format: {fmt}")
+    if points < 3:
+        raise HTTPException(status_code=400, detail="points must be at least 3")
+
+    selected = names.split(",") if names else list(series)
+    unknown = [name for name in selected if name not in series]
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Unknown series: {', '.join(unknown)}")
+    if fmt == "f32" and len(selected) != 1:
+        raise HTTPException(status_code=400, detail="f32 format returns exactly one series")
+
+    start_s = _epoch_seconds(start, -np.inf)
+    end_s = _epoch_seconds(end, np.inf, end_of_day=True)
+
+    results = {}
+    for name in selected:
+        pyramid = get_pyramid(dataset, version, name, *series[name])
+        results[name] = pyramid.query(start_s, end_s, points)
+
+    headers = {"X-Data-Version": version}
+    if fmt == "f32":
+        # Interleaved (seconds since X-Series-Origin, value) float32 pairs
+        x, y = results[selected[0]]
+        origin = float(int(x[0])) if len(x) else 0.0
+        packed = np.empty((len(x), 2), dtype="<f4")
+        packed[:, 0] = x - origin
+        packed[:, 1] = y
+        headers.update({"X-Series-Origin": str(int(origin)), "X-Series-Points": str(len(x))})
+        return Response(content=packed.tobytes(), media_type="application/octet-stream", headers=headers)
+
+    payload = {
+        "version": version,
+        "series": {
+            name: {"x": (x * 1000).astype(np.int64).tolist(), "y": y.tolist()}
+            for name, (x, y) in results.items()
+        },
+    }
+    return Response(content=json.dumps(payload), media_type="application/json", headers=headers)
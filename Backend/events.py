@@ -0,0 +1,209 @@
+"""In-process event bus and SQLite change feed.
+
+Topics hold only their latest message plus a version counter. Publishing
+wakes every waiting subscriber through one shared future, and the message is
+encoded once, so fan-out to thousands of SSE/WebSocket connections costs one
+wake-up per connection. A slow subscriber skips straight to the newest
+version instead of queueing a backlog.
+
+ChangeWatcher turns database writes into events. Routes that write call
+notify_change() for an immediate wake-up. Writes from any other connection
+or process are picked up by polling PRAGMA data_version, then reading the
+per-table counters kept by the triggers from install_change_counters().
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Set
+
+CHANGE_POLL_INTERVAL = float(os.getenv("CHANGE_POLL_INTERVAL", 0.5))
+
+
+class Topic:
+    """Latest-value channel: subscribers wait for a version newer than the one they saw"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.version = 0
+        self.message: Optional[Dict] = None
+        self.encoded: Optional[str] = None
+        self.sse_frame: Optional[str] = None
+        self._changed: Optional[asyncio.Future] = None
+
+    def publish(self, message: Dict) -> int:
+        """Must run on the event loop thread"""
+        self.version += 1
+        self.message = message
+        self.encoded = json.dumps(message, default=str)
+        self.sse_frame = f"id: {self.version}\nevent: {self.name.split(':')[0]}\ndata: {self.encoded}\n\n"
+        if self._changed is not None and not self._changed.done():
+            self._changed.set_result(None)
+        self._changed = None
+        return self.version
+
+    async def wait(self, after_version: int, timeout: Optional[float] = None) -> bool:
+        """True once version > after_version; False on timeout"""
+        if self.version > after_version:
+            return True
+        if self._changed is None:
+            self._changed = asyncio.get_running_loop().create_future()
+        try:
+            # Shielded: one subscriber timing out must not cancel the shared future
+            await asyncio.wait_for(asyncio.shield(self._changed), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return self.version > after_version
+
+
+class EventBus:
+    def __init__(self):
+        self.topics: Dict[str, Topic] = {}
+        self.subscribers: Dict[str, int] = {}
+
+    def topic(self, name: str) -> Topic:
+        if name not in self.topics:
+            self.topics[name] = Topic(name)
+            self.subscribers[name] = 0
+        return self.topics[name]
+
+    async def subscribe(self, name: str, after_version: int = 0, heartbeat: Optional[float] = None):
+        """Yields the topic's message for each new version, or None as a heartbeat"""
+        topic = self.topic(name)
+        self.subscribers[name] += 1
+        try:
+            version = after_version
+            while True:
+                if await topic.wait(version, heartbeat):
+                    version = topic.version
+                    yield topic
+                else:
+                    yield None
+        finally:
+            self.subscribers[name] -= 1
+
+
+bus = EventBus()
+
+
+def install_change_counters(conn: sqlite3.Connection, tables: Iterable[str]) -> None:
+    """Count writes per table in change_counters, maintained by triggers"""
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS change_counters (
+        table_name TEXT PRIMARY KEY,
+        version INTEGER
+    )
+    """)
+    # One transaction for every trigger, committed (and synced) once
+    conn.executescript("BEGIN;" + "".join(f"""
+            DROP TRIGGER IF EXISTS changes_{table}_{action.lower()};
+            CREATE TRIGGER changes_{table}_{action.lower()} AFTER {action} ON {table}
+            BEGIN
+                INSERT INTO change_counters (table_name, version) VALUES ('{table}', 1)
+                ON CONFLICT (table_name) DO UPDATE SET version = version + 1;
+            END;
+            """ for table in tables for action in ("INSERT", "UPDATE", "DELETE")))
+    conn.commit()
+
+
+class ChangeWatcher:
+    """Calls on_change(changed_tables) after writes to the watched tables of one database"""
+
+    def __init__(self, db_path: str, tables: Iterable[str],
+                 on_change: Callable[[Set[str]], Awaitable[None]], interval: float = CHANGE_POLL_INTERVAL):
+        self.db_path = db_path
+        self.tables = set(tables)
+        self.on_change = on_change
+        self.interval = interval
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._data_version = None
+        self._counters: Dict[str, int] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"polls": 0, "notifications": 0, "changes": 0}
+
+    def notify(self) -> None:
+        """Wake the watcher now; safe to call from any thread"""
+        self.stats["notifications"] += 1
+        if self._loop is not None and self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def _read_counters(self) -> Dict[str, int]:
+        rows = self._conn.execute("SELECT table_name, version FROM change_counters").fetchall()
+        return {table: version for table, version in rows if table in self.tables}
+
+    def changed_tables(self) -> Set[str]:
+        """Tables written since the last call, or set() without touching the counters"""
+        self.stats["polls"] += 1
+        # data_version changes only when another connection commits
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._data_version:
+            return set()
+        self._data_version = version
+
+        counters = self._read_counters()
+        changed = {table for table, count in counters.items() if self._counters.get(table) != count}
+        self._counters = counters
+        return changed
+
+    async def start(self) -> None:
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self.changed_tables()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+            changed = self.changed_tables()
+            if changed:
+                self.stats["changes"] += 1
+                try:
+                    await self.on_change(changed)
+                except Exception:
+                    # Keep watching; the next change retries the recomputation
+                    pass
+
+
+_watchers: Dict[str, ChangeWatcher] = {}
+_watchers_lock = threading.Lock()
+
+
+def register_watcher(name: str, watcher: ChangeWatcher) -> ChangeWatcher:
+    with _watchers_lock:
+        _watchers[name] = watcher
+    return watcher
+
+
+def registered_watchers() -> Dict[str, ChangeWatcher]:
+    with _watchers_lock:
+        return dict(_watchers)
+
+
+def notify_change(table: str) -> None:
+    """Tell the watchers of `table` that it was just written"""
+    for watcher in list(_watchers.values()):
+        if table in watcher.tables:
+            watcher.notify()
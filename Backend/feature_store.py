@@ -0,0 +1,96 @@
+"""Compact feature matrix for DengueForecastingSystem.
+
+The ensemble reads only FEATURE_COLS, so that is all FeatureStore keeps:
+one C-contiguous float32 matrix (the dtype sklearn's trees split on
+anyway), the float64 target and the datetime64 index of the usable rows.
+Lags are offset slices and rolling means are differences of a cumulative
+sum, so building it is a handful of vectorized passes over two arrays.
+
+Rows are usable under the same rule prepare_data applied with dropna():
+the first WARMUP_ROWS rows (the widest window it computed, 12 weeks) and
+any row whose 12-week window holds a missing value are dropped.
+"""
+
+from typing import List
+
+import numpy as np
+
+# column -> (kind, source series, lag or window)
+FEATURES = {
+    "cases_lag1": ("lag", "cases", 1),
+    "cases_lag2": ("lag", "cases", 2),
+    "rainfall_lag2": ("lag", "rainfall", 2),
+    "rainfall_lag3": ("lag", "rainfall", 3),
+    "month": ("month", None, 0),
+    "is_monsoon": ("monsoon", None, 0),
+    "cases_ma_4": ("mean", "cases", 4),
+    "rainfall_ma_4": ("mean", "rainfall", 4),
+}
+WARMUP_ROWS = 11
+MONSOON_MONTHS = (6, 7, 8, 9)
+
+
+def usable_rows(cases: np.ndarray, rainfall: np.ndarray) -> np.ndarray:
+    """Boolean mask of rows with WARMUP_ROWS complete weeks before them"""
+    missing = np.isnan(cases) | np.isnan(rainfall)
+    seen = np.concatenate([[0], np.cumsum(missing)])
+    end = np.arange(1, len(cases) + 1)
+    start = np.maximum(end - (WARMUP_ROWS + 1), 0)
+    rows = seen[end] - seen[start] == 0
+    rows[:WARMUP_ROWS] = False
+    return rows
+
+
+def _lag(values: np.ndarray, lag: int) -> np.ndarray:
+    out = np.full(len(values), np.nan)
+    out[lag:] = values[:len(values) - lag]
+    return out
+
+
+def _rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    total = np.concatenate([[0.0], np.cumsum(np.nan_to_num(values))])
+    out = np.full(len(values), np.nan)
+    out[window - 1:] = (total[window:] - total[:-window]) / window
+    return out
+
+
+class FeatureStore:
+    """Selected features of the usable rows, as X (float32), y and dates"""
+
+    def __init__(self, dates: np.ndarray, cases: np.ndarray, rainfall: np.ndarray, columns: List[str]):
+        cases = np.asarray(cases, dtype=np.float64)
+        rainfall = np.asarray(rainfall, dtype=np.float64)
+        dates = np.asarray(dates, dtype="datetime64[ns]")
+        self.rows = usable_rows(cases, rainfall)
+        self.columns = list(columns)
+
+        series = {"cases": cases, "rainfall": rainfall}
+        month = dates.astype("datetime64[M]").astype(np.int64) % 12 + 1
+        self.X = np.empty((int(self.rows.sum()), len(self.columns)), dtype=np.float32)
+        for j, column in enumerate(self.columns):
+            kind, source, size = FEATURES[column]
+            if kind == "lag":
+                values = _lag(series[source], size)
+            elif kind == "mean":
+                values = _rolling_mean(series[source], size)
+            elif kind == "month":
+                values = month
+            else:
+                values = np.isin(month, MONSOON_MONTHS)
+            self.X[:, j] = values[self.rows]
+        self.y = cases[self.rows]
+        self.dates = dates[self.rows]
+
+    def __len__(self) -> int:
+        return len(self.y)
+
+    def split_index(self, test_size: float = 0.2) -> int:
+        """First test row of the time-based train/test split"""
+        return int(len(self) * (1 - test_size))
+
+    @property
+    def nbytes(self) -> int:
+        return self.X.nbytes + self.y.nbytes + self.dates.nbytes + self.rows.nbytes
+
+    def column(self, name: str) -> np.ndarray:
+        return self.X[:, self.columns.index(name)]
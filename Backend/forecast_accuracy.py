@@ -0,0 +1,329 @@
+"""Incrementally maintained accuracy ledger for stored forecasts.
+
+Three tables, kept current by triggers in the database that holds both the
+forecasts and the actuals:
+
+    forecast_batches   the model version that issued each forecast batch,
+                       stamped when the batch's first row is inserted
+    forecast_errors    one row per scored forecast: issued date, target
+                       date, horizon in days, version, predicted and actual
+    forecast_accuracy  error sums per (week of the target, horizon, version)
+
+When an actual arrives (or is corrected), only the forecasts for that date
+are scored, through an index on date(target), and only that week's
+sums are recomputed. A rolling metric over any window is then a sum over a
+few dozen ready rows instead of a join of the full histories.
+
+Forecast dates are matched and stored as date(...), so a row written
+as '2026-11-15 00:00:00' is scored against the actual for '2026-11-15'.
+
+Deleting forecast rows leaves the ledger alone, so compact_forecasts() can
+drop batches once every target they predicted has been scored.
+
+Check the ledger against a full re-scoring:
+    python forecast_accuracy.py
+"""
+
+import math
+import os
+import sqlite3
+import sys
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+FORECAST_RETENTION_DAYS = int(os.getenv("FORECAST_RETENTION_DAYS", 90))  # 0 keeps every forecast row
+FORECAST_COMPACT_INTERVAL = float(os.getenv("FORECAST_COMPACT_INTERVAL", 6 * 3600))
+
+ACCURACY_SPECS = {
+    "dengue": {"db": "db/dengue.db", "model": "dengue",
+               "forecasts": "forecasts", "issued": "forecast_date", "target": "prediction_date",
+               "predicted": "cases_predicted", "lower": "lower_ci", "upper": "upper_ci",
+               "actuals": "dengue_data", "date_column": "date", "value_column": "reported_cases"},
+}
+
+# Sunday closing the week, like weekly_rollup.py
+_WEEK = "date({d}, 'weekday 0')"
+
+
+def _score_sql(series: str, spec, where: str) -> str:
+    """Score the forecasts matching `where` (over f = forecasts, a = actuals) into forecast_errors"""
+    return f"""
+        INSERT OR REPLACE INTO forecast_errors
+            (series, issued, target, horizon, model_version, predicted, actual, lower, upper)
+        SELECT '{series}', date(f.{spec['issued']}), date(f.{spec['target']}),
+               CAST(round(julianday(date(f.{spec['target']})) - julianday(date(f.{spec['issued']}))) AS INTEGER),
+               COALESCE(b.model_version, 0), f.{spec['predicted']}, a.{spec['value_column']},
+               f.{spec['lower']}, f.{spec['upper']}
+        FROM {spec['forecasts']} f
+        JOIN {spec['actuals']} a ON a.{spec['date_column']} = date(f.{spec['target']})
+        LEFT JOIN forecast_batches b ON b.series = '{series}' AND b.issued = date(f.{spec['issued']})
+        WHERE a.{spec['value_column']} IS NOT NULL AND f.{spec['predicted']} IS NOT NULL AND {where};"""
+
+
+_ACCURACY_COLUMNS = """(series, week, horizon, model_version, n, sum_abs_err, sum_sq_err, sum_err, sum_ape, ape_n,
+     covered, covered_n)"""
+
+# Error sums over a group of forecast_errors rows, in _ACCURACY_COLUMNS order after model_version
+_SUMS = """COUNT(*), SUM(abs(predicted - actual)), SUM((predicted - actual) * (predicted - actual)),
+       SUM(predicted - actual),
+       COALESCE(SUM(CASE WHEN actual > 0 THEN abs(predicted - actual) / actual END), 0),
+       COUNT(CASE WHEN actual > 0 THEN 1 END),
+       COUNT(CASE WHEN actual BETWEEN lower AND upper THEN 1 END),
+       COUNT(CASE WHEN lower IS NOT NULL AND upper IS NOT NULL THEN 1 END)"""
+
+
+def _set_actual_sql(series: str, date_expr: str, value_expr: str) -> str:
+    return f"""
+        DELETE FROM forecast_errors WHERE series = '{series}' AND target = {date_expr} AND {value_expr} IS NULL;
+        UPDATE forecast_errors SET actual = {value_expr} WHERE series = '{series}' AND target = {date_expr};"""
+
+
+def _recompute_week_sql(series: str, date_expr: str) -> str:
+    """Re-sum the week containing date_expr from its scored forecasts"""
+    week = _WEEK.format(d=date_expr)
+    return f"""
+        DELETE FROM forecast_accuracy WHERE series = '{series}' AND week = {week};
+        INSERT INTO forecast_accuracy {_ACCURACY_COLUMNS}
+        SELECT '{series}', {week}, horizon, model_version, {_SUMS}
+        FROM forecast_errors
+        WHERE series = '{series}' AND target >= date({week}, '-6 days') AND target < date({week}, '+1 day')
+        GROUP BY horizon, model_version;"""
+
+
+def install_forecast_accuracy(conn: sqlite3.Connection, series: str) -> None:
+    """Create the ledger tables and triggers for one series, then backfill it"""
+    spec = ACCURACY_SPECS[series]
+    forecasts, issued, target = spec["forecasts"], spec["issued"], spec["target"]
+    actuals, date_column, value_column = spec["actuals"], spec["date_column"], spec["value_column"]
+
+    conn.executescript(f"""
+    BEGIN;  -- committed with the backfill below
+    CREATE TABLE IF NOT EXISTS forecast_batches (
+        series TEXT,
+        issued TEXT,
+        model_version INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (series, issued)
+    );
+    CREATE TABLE IF NOT EXISTS forecast_errors (
+        series TEXT,
+        issued TEXT,
+        target TEXT,
+        horizon INTEGER,
+        model_version INTEGER,
+        predicted REAL,
+        actual REAL,
+        lower REAL,
+        upper REAL,
+        PRIMARY KEY (series, issued, target)
+    );
+    CREATE INDEX IF NOT EXISTS forecast_errors_target ON forecast_errors (series, target);
+    CREATE TABLE IF NOT EXISTS forecast_accuracy (
+        series TEXT,
+        week TEXT,
+        horizon INTEGER,
+        model_version INTEGER,
+        n INTEGER,
+        sum_abs_err REAL,
+        sum_sq_err REAL,
+        sum_err REAL,
+        sum_ape REAL,
+        ape_n INTEGER,
+        covered INTEGER,
+        covered_n INTEGER,
+        PRIMARY KEY (series, week, horizon, model_version)
+    );
+    DROP INDEX IF EXISTS {forecasts}_{target};
+    CREATE INDEX IF NOT EXISTS {forecasts}_{target}_day ON {forecasts} (date({target}));
+
+    DROP TRIGGER IF EXISTS accuracy_{series}_forecast_insert;
+    DROP TRIGGER IF EXISTS accuracy_{series}_forecast_update;
+    DROP TRIGGER IF EXISTS accuracy_{series}_actual_insert;
+    DROP TRIGGER IF EXISTS accuracy_{series}_actual_update;
+    DROP TRIGGER IF EXISTS accuracy_{series}_actual_delete;
+
+    -- A forecast for a date that already has its actual (a backfill) is scored at once
+    CREATE TRIGGER accuracy_{series}_forecast_insert AFTER INSERT ON {forecasts}
+    BEGIN
+        INSERT OR IGNORE INTO forecast_batches (series, issued, model_version)
+        VALUES ('{series}', date(NEW.{issued}),
+                COALESCE((SELECT version FROM model_versions WHERE name = '{spec['model']}'), 0));
+        {_score_sql(series, spec, f"f.rowid = NEW.rowid")}
+        {_recompute_week_sql(series, f"NEW.{target}")}
+    END;
+
+    CREATE TRIGGER accuracy_{series}_forecast_update AFTER UPDATE ON {forecasts}
+    BEGIN
+        DELETE FROM forecast_errors
+        WHERE series = '{series}' AND issued = date(OLD.{issued}) AND target = date(OLD.{target});
+        {_score_sql(series, spec, f"f.rowid = NEW.rowid")}
+        {_recompute_week_sql(series, f"OLD.{target}")}
+        {_recompute_week_sql(series, f"NEW.{target}")}
+    END;
+
+    -- Scores of compacted forecasts are updated in place. Rescoring on insert
+    -- as well covers INSERT OR REPLACE of a corrected actual.
+    CREATE TRIGGER accuracy_{series}_actual_insert AFTER INSERT ON {actuals}
+    BEGIN
+        {_set_actual_sql(series, f"NEW.{date_column}", f"NEW.{value_column}")}
+        {_score_sql(series, spec, f"date(f.{target}) = NEW.{date_column}")}
+        {_recompute_week_sql(series, f"NEW.{date_column}")}
+    END;
+
+    CREATE TRIGGER accuracy_{series}_actual_update AFTER UPDATE OF {date_column}, {value_column} ON {actuals}
+    BEGIN
+        DELETE FROM forecast_errors
+        WHERE series = '{series}' AND target = OLD.{date_column} AND OLD.{date_column} != NEW.{date_column};
+        {_set_actual_sql(series, f"NEW.{date_column}", f"NEW.{value_column}")}
+        {_score_sql(series, spec, f"date(f.{target}) = NEW.{date_column}")}
+        {_recompute_week_sql(series, f"OLD.{date_column}")}
+        {_recompute_week_sql(series, f"NEW.{date_column}")}
+    END;
+
+    CREATE TRIGGER accuracy_{series}_actual_delete AFTER DELETE ON {actuals}
+    BEGIN
+        DELETE FROM forecast_errors WHERE series = '{series}' AND target = OLD.{date_column};
+        {_recompute_week_sql(series, f"OLD.{date_column}")}
+    END;
+    """)
+
+    # Backfill (or repair): batches issued before the ledger existed are version 0
+    conn.execute(f"""
+        INSERT OR IGNORE INTO forecast_batches (series, issued, model_version)
+        SELECT DISTINCT '{series}', date({issued}), 0 FROM {forecasts}
+    """)
+    conn.execute(_score_sql(series, spec, "true"))
+    conn.execute("DELETE FROM forecast_accuracy WHERE series = ?", (series,))
+    conn.execute(f"""
+        INSERT INTO forecast_accuracy {_ACCURACY_COLUMNS}
+        SELECT series, {_WEEK.format(d="target")}, horizon, model_version, {_SUMS}
+        FROM forecast_errors WHERE series = ? GROUP BY 2, horizon, model_version
+    """, (series,))
+    conn.commit()
+
+
+def compact_forecasts(conn: sqlite3.Connection, series: str, retention_days: int = FORECAST_RETENTION_DAYS,
+                      today: Optional[date] = None) -> int:
+    """Delete forecast rows issued before the retention window whose target already has an actual
+
+    Their scores stay in the ledger; rows still waiting for an actual are kept.
+    """
+    if retention_days <= 0:
+        return 0
+    spec = ACCURACY_SPECS[series]
+    cutoff = ((today or date.today()) - timedelta(days=retention_days)).isoformat()
+    deleted = conn.execute(f"""
+        DELETE FROM {spec['forecasts']}
+        WHERE date({spec['issued']}) < ?
+          AND date({spec['target']}) <= (SELECT MAX({spec['date_column']}) FROM {spec['actuals']})
+    """, (cutoff,)).rowcount
+    conn.commit()
+    return deleted
+
+
+def read_accuracy(conn: sqlite3.Connection, series: str, window_days: int = 91,
+                  end: Optional[str] = None) -> Dict:
+    """Rolling error metrics over the weeks ending within window_days of `end` (default: the last scored week)
+
+    Grouped by horizon and model version, plus an overall row per version.
+    """
+    if end is None:
+        end = conn.execute("SELECT MAX(week) FROM forecast_accuracy WHERE series = ?", (series,)).fetchone()[0]
+    if end is None:
+        return {"series": series, "window_days": window_days, "start": None, "end": None,
+                "overall": [], "by_horizon": []}
+    end = conn.execute(f"SELECT {_WEEK.format(d='?')}", (end,)).fetchone()[0]
+    start = (date.fromisoformat(end) - timedelta(days=window_days - 1)).isoformat()
+
+    def metrics(row) -> Dict:
+        n, abs_err, sq_err, err, ape, ape_n, covered, covered_n = row
+        return {
+            "n": n,
+            "mae": abs_err / n,
+            "rmse": math.sqrt(sq_err / n),
+            "bias": err / n,
+            "mape": 100 * ape / ape_n if ape_n else None,
+            "coverage": covered / covered_n if covered_n else None,
+        }
+
+    sums = ("SUM(n), SUM(sum_abs_err), SUM(sum_sq_err), SUM(sum_err), SUM(sum_ape), SUM(ape_n), "
+            "SUM(covered), SUM(covered_n)")
+    where = "WHERE series = ? AND week >= ? AND week <= ?"
+    by_horizon = [
+        {"horizon_days": horizon, "model_version": version, **metrics(row)}
+        for horizon, version, *row in conn.execute(f"""
+            SELECT horizon, model_version, {sums} FROM forecast_accuracy {where}
+            GROUP BY horizon, model_version ORDER BY model_version, horizon
+        """, (series, start, end))
+    ]
+    overall = [
+        {"model_version": version, **metrics(row)}
+        for version, *row in conn.execute(f"""
+            SELECT model_version, {sums} FROM forecast_accuracy {where}
+            GROUP BY model_version ORDER BY model_version
+        """, (series, start, end))
+    ]
+    return {"series": series, "window_days": window_days, "start": start, "end": end,
+            "overall": overall, "by_horizon": by_horizon}
+
+
+def check_consistency(conn: sqlite3.Connection, series: str) -> List[str]:
+    """Scored forecasts or weekly sums that differ from a full re-scoring; empty if consistent"""
+    spec = ACCURACY_SPECS[series]
+    problems = []
+    expected = {
+        (issued, target): (predicted, actual)
+        for issued, target, predicted, actual in conn.execute(f"""
+            SELECT date(f.{spec['issued']}), date(f.{spec['target']}), f.{spec['predicted']}, a.{spec['value_column']}
+            FROM {spec['forecasts']} f JOIN {spec['actuals']} a ON a.{spec['date_column']} = date(f.{spec['target']})
+            WHERE a.{spec['value_column']} IS NOT NULL AND f.{spec['predicted']} IS NOT NULL
+        """)
+    }
+    scored = {
+        (issued, target): (predicted, actual)
+        for issued, target, predicted, actual in conn.execute(
+            "SELECT issued, target, predicted, actual FROM forecast_errors WHERE series = ?", (series,))
+    }
+    # Compacted forecasts are gone from the table but stay scored
+    for key in sorted(expected):
+        if scored.get(key) != expected[key]:
+            problems.append(f"{series} issued {key[0]} for {key[1]}: ledger={scored.get(key)} expected={expected[key]}")
+
+    for issued, target, actual in conn.execute(f"""
+        SELECT e.issued, e.target, e.actual FROM forecast_errors e
+        LEFT JOIN {spec['actuals']} a ON a.{spec['date_column']} = e.target
+        WHERE e.series = ? AND (a.{spec['value_column']} IS NULL OR a.{spec['value_column']} != e.actual)
+    """, (series,)):
+        problems.append(f"{series} issued {issued} for {target}: scored against stale actual {actual}")
+
+    sums = {
+        (week, horizon, version): n
+        for week, horizon, version, n in conn.execute(f"""
+            SELECT {_WEEK.format(d='target')}, horizon, model_version, COUNT(*) FROM forecast_errors
+            WHERE series = ? GROUP BY 1, 2, 3
+        """, (series,))
+    }
+    stored = {
+        (week, horizon, version): n
+        for week, horizon, version, n in conn.execute(
+            "SELECT week, horizon, model_version, n FROM forecast_accuracy WHERE series = ?", (series,))
+    }
+    for key in sorted(set(sums) | set(stored)):
+        if sums.get(key) != stored.get(key):
+            problems.append(f"{series} week {key[0]} horizon {key[1]} v{key[2]}: n={stored.get(key)} "
+                            f"expected={sums.get(key)}")
+    return problems
+
+
+if __name__ == "__main__":
+    failed = False
+    for name, spec in ACCURACY_SPECS.items():
+        conn = sqlite3.connect(spec["db"])
+        try:
+            problems = check_consistency(conn, name)
+        finally:
+            conn.close()
+        for problem in problems:
+            print(problem)
+        print(f"{name}: {'OK' if not problems else f'{len(problems)} mismatches'}")
+        failed = failed or bool(problems)
+    sys.exit(1 if failed else 0)
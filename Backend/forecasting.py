@@ -1,18 +1,44 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+import os
+import time
 import warnings
-import io
 import base64
-from typing import Dict, Tuple
-from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-from statsmodels.tsa.arima.model import ARIMA
-import matplotlib.pyplot as plt
+from typing import Dict, Optional, Tuple
+
+from feature_store import FeatureStore
+from metrics import span
 
 warnings.filterwarnings('ignore')
 
+# Features used by the ensemble, in model input order
+FEATURE_COLS = [
+    'cases_lag1', 'cases_lag2', 'rainfall_lag2', 'rainfall_lag3',
+    'month', 'is_monsoon', 'cases_ma_4', 'rainfall_ma_4'
+]
+
+# How train_ensemble fits the RandomForest and the boosting model.
+#   rf_trees, rf_jobs   forest size and cores (-1: all)
+#   boosting            "gradient" (GradientBoostingRegressor) or "histogram"
+#                       (HistGradientBoostingRegressor)
+#   boost_stages        boosting stages / iterations
+#   step                trees or stages added per round under a time budget
+#   warm_trees          trees fitted on the new data when updating a previous
+#                       forest (0: always refit); the oldest are dropped past rf_trees
+# "reference" is the original fixed ensemble and stays the default, so
+# results reproduce; growing it in steps under a budget gives the same trees.
+TRAINING_PROFILES = {
+    "reference": {"rf_trees": 150, "rf_jobs": 1, "boosting": "gradient", "boost_stages": 100,
+                  "step": 25, "warm_trees": 0},
+    "fast": {"rf_trees": 150, "rf_jobs": -1, "boosting": "histogram", "boost_stages": 100,
+             "step": 25, "warm_trees": 50},
+}
+DENGUE_TRAINING_PROFILE = os.getenv("DENGUE_TRAINING_PROFILE", "reference")
+DENGUE_TRAIN_BUDGET_S = float(os.getenv("DENGUE_TRAIN_BUDGET_S", 0))  # 0: no time limit
+# Raw weeks kept after prepare_data: forecast() builds its lag features from them
+HISTORY_WEEKS = 8
+
 class DengueForecastingSystem:
     def __init__(self, data_path: str = None, df: pd.DataFrame = None):
         """Initialize with either file path or DataFrame"""
@@ -22,6 +48,7 @@ class DengueForecastingSystem:
         self.forecasts: Dict = {}
         self.metrics: Dict = {}
         self.figures: Dict = {}
+        self.training: Dict = {}
 
     def _load_data(self, data_path: str, df: pd.DataFrame) -> pd.DataFrame:
         """Load data from source"""
@@ -32,82 +59,144 @@ class DengueForecastingSystem:
         raise ValueError("Either data_path or df must be provided")
 
     def prepare_data(self) -> None:
-        """Clean and feature engineer the dataset"""
+        """Clean the dataset and build the feature matrix (see feature_store.py)"""
         # Convert and sort dates
         self.df['date'] = pd.to_datetime(self.df['date'])
-        self.df = self.df.sort_values('date').set_index('date')
-        
-        # Feature engineering
-        self._create_lag_features()
-        self._create_temporal_features()
-        self._create_rolling_features()
-        
-        # Drop NA and validate
-        self.df = self.df.dropna()
-        if len(self.df) < 52:
+        self.df = self.df.sort_values('date').set_index('date')[['reported_cases', 'rainfall_mm']]
+
+        self.features = FeatureStore(
+            self.df.index.values,
+            self.df['reported_cases'].to_numpy(dtype=np.float64),
+            self.df['rainfall_mm'].to_numpy(dtype=np.float64),
+            FEATURE_COLS,
+        )
+        # The store holds everything training needs; only the tail the forecast extends stays raw
+        self.df = self.df[self.features.rows].tail(HISTORY_WEEKS)
+        if len(self.features) < 52:
             raise ValueError("Insufficient data (need at least 1 year of weekly data)")
 
-    def _create_lag_features(self) -> None:
-        """Create lagged features"""
-        for lag in [1, 2, 3, 4]:
-            self.df[f'cases_lag{lag}'] = self.df['reported_cases'].shift(lag)
-            self.df[f'rainfall_lag{lag}'] = self.df['rainfall_mm'].shift(lag)
+    def train_test_split(self, test_size: float = 0.2) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Time-based split of data"""
+        split_idx = self.features.split_index(test_size)
+        frame = pd.DataFrame(self.features.X, columns=FEATURE_COLS,
+                             index=pd.DatetimeIndex(self.features.dates, name='date'))
+        frame['reported_cases'] = self.features.y
+        return frame.iloc[:split_idx], frame.iloc[split_idx:]
 
-    def _create_temporal_features(self) -> None:
-        """Extract temporal patterns"""
-        self.df['month'] = self.df.index.month
-        self.df['week_of_year'] = self.df.index.isocalendar().week
-        self.df['is_monsoon'] = self.df.index.month.isin([6, 7, 8, 9]).astype(int)
+    @span("dengue_train")
+    def train_ensemble(self, profile: Optional[str] = None, budget_s: Optional[float] = None,
+                       warm_from: Optional["DengueForecastingSystem"] = None) -> Dict:
+        """Train ensemble model with feature selection
 
-    def _create_rolling_features(self) -> None:
-        """Create rolling statistics"""
-        for window in [4, 8, 12]:
-            self.df[f'cases_ma_{window}'] = self.df['reported_cases'].rolling(window).mean()
-            self.df[f'rainfall_ma_{window}'] = self.df['rainfall_mm'].rolling(window).mean()
+        Under a wall-clock budget the forest and the boosting model grow by
+        the profile's step in turns, and whatever has been fitted when time
+        runs out is the ensemble (at least one step of each). With warm_from,
+        a profile with warm_trees adds trees fitted on this data to that
+        system's forest instead of growing a new one.
+        """
+        # Imported here so that serving from a saved artifact never loads sklearn
+        from sklearn.ensemble import RandomForestRegressor
+        from sklearn.linear_model import LinearRegression
+
+        profile = profile or DENGUE_TRAINING_PROFILE
+        settings = TRAINING_PROFILES[profile]
+        budget_s = DENGUE_TRAIN_BUDGET_S if budget_s is None else budget_s
+        start = time.perf_counter()
+
+        # Row views of the float32 feature matrix, no copies
+        split_idx = self.features.split_index()
+        X_train, y_train = self.features.X[:split_idx], self.features.y[:split_idx]
+        X_test = self.features.X[split_idx:]
+        actual = pd.Series(self.features.y[split_idx:], name='reported_cases',
+                           index=pd.DatetimeIndex(self.features.dates[split_idx:], name='date'))
+
+        warm = warm_from is not None and settings['warm_trees'] > 0 and 'ensemble' in warm_from.models \
+            and hasattr(warm_from.models['ensemble']['RandomForest'], 'estimators_')
+        # Grow in steps when there is a budget to check between them, or trees to add to
+        stepped = budget_s > 0 or warm
+        if warm:
+            forest = warm_from.models['ensemble']['RandomForest']
+            forest.set_params(warm_start=True, n_jobs=settings['rf_jobs'])
+            forest_target = len(forest.estimators_) + settings['warm_trees']
+        else:
+            forest = RandomForestRegressor(n_estimators=settings['rf_trees'], random_state=42,
+                                           n_jobs=settings['rf_jobs'], warm_start=stepped)
+            forest_target = settings['rf_trees']
+        boost = self._boosting_model(settings, warm_start=stepped)
 
-    def train_test_split(self, test_size: float = 0.2) -> Tuple[pd.DataFrame, pd.DataFrame]:
-        """Time-based split of data"""
-        split_idx = int(len(self.df) * (1 - test_size))
-        return self.df.iloc[:split_idx], self.df.iloc[split_idx:]
-
-    def train_ensemble(self) -> Dict:
-        """Train ensemble model with feature selection"""
-        feature_cols = [
-            'cases_lag1', 'cases_lag2', 'rainfall_lag2', 'rainfall_lag3',
-            'month', 'is_monsoon', 'cases_ma_4', 'rainfall_ma_4'
-        ]
-        
-        train, test = self.train_test_split()
-        X_train, y_train = train[feature_cols], train['reported_cases']
-        X_test = test[feature_cols]
-        
         models = {
-            'RandomForest': RandomForestRegressor(n_estimators=150, random_state=42),
-            'GradientBoost': GradientBoostingRegressor(n_estimators=100, random_state=42),
+            'RandomForest': forest,
+            'GradientBoost': boost,
             'LinearReg': LinearRegression()
         }
-        
+        # Least squares in float64: float32 input would be solved in float32
+        models['LinearReg'].fit(X_train.astype(np.float64), y_train)
+
+        complete = True
+        if stepped:
+            # warm_start keeps the trees fitted so far, so each round only fits the new ones
+            params = {'RandomForest': 'n_estimators',
+                      'GradientBoost': 'max_iter' if settings['boosting'] == 'histogram' else 'n_estimators'}
+            targets = {'RandomForest': forest_target, 'GradientBoost': settings['boost_stages']}
+            grown = {'RandomForest': len(forest.estimators_) if warm else 0, 'GradientBoost': 0}
+            while True:
+                pending = [key for key in grown if grown[key] < targets[key]]
+                # Every model gets its first step, however tight the budget
+                out_of_time = budget_s > 0 and time.perf_counter() - start > budget_s and all(grown.values())
+                if not pending or out_of_time:
+                    complete = not pending
+                    break
+                for key in pending:
+                    grown[key] = min(targets[key], grown[key] + settings['step'])
+                    models[key].set_params(**{params[key]: grown[key]})
+                    models[key].fit(X_train, y_train)
+            if warm and len(forest.estimators_) > settings['rf_trees']:
+                # Keep the newest trees, the ones fitted on the most recent data
+                forest.estimators_ = forest.estimators_[-settings['rf_trees']:]
+                forest.n_estimators = len(forest.estimators_)
+        else:
+            forest.fit(X_train, y_train)
+            boost.fit(X_train, y_train)
+
         # Train and predict
-        predictions = {}
-        for name, model in models.items():
-            model.fit(X_train, y_train)
-            predictions[name] = model.predict(X_test)
-        
+        predictions = {name: model.predict(X_test) for name, model in models.items()}
+
         # Ensemble average
         ensemble_pred = np.mean(list(predictions.values()), axis=0)
-        
+
         # Store results
         self.models['ensemble'] = models
         self.forecasts['ensemble'] = {
             'predictions': ensemble_pred,
-            'actual': test['reported_cases'],
-            'dates': test.index
+            'actual': actual,
+            'dates': actual.index
         }
-        
-        return self._evaluate_models(test['reported_cases'], ensemble_pred)
+        self.training = {
+            'profile': profile,
+            'budget_s': budget_s,
+            'seconds': time.perf_counter() - start,
+            'complete': complete,
+            'warm_start': warm,
+            'rf_trees': len(forest.estimators_),
+            'boost_stages': int(getattr(boost, 'n_iter_', None) or boost.n_estimators_),
+        }
+
+        return self._evaluate_models(actual, ensemble_pred)
+
+    @staticmethod
+    def _boosting_model(settings: Dict, warm_start: bool):
+        if settings['boosting'] == 'histogram':
+            from sklearn.ensemble import HistGradientBoostingRegressor
+            return HistGradientBoostingRegressor(max_iter=settings['boost_stages'], early_stopping=False,
+                                                 random_state=42, warm_start=warm_start)
+        from sklearn.ensemble import GradientBoostingRegressor
+        return GradientBoostingRegressor(n_estimators=settings['boost_stages'], random_state=42,
+                                         warm_start=warm_start)
 
     def _evaluate_models(self, actual: pd.Series, predicted: np.ndarray) -> Dict:
         """Calculate evaluation metrics"""
+        from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
         metrics = {
             'mae': mean_absolute_error(actual, predicted),
             'rmse': np.sqrt(mean_squared_error(actual, predicted)),
@@ -117,43 +206,40 @@ class DengueForecastingSystem:
         self.metrics['ensemble'] = metrics
         return metrics
 
+    @span("dengue_forecast")
     def forecast(self, weeks: int = 4) -> pd.DataFrame:
         """Generate future forecasts"""
-        last_data = self.df.tail(8)  # Use last 8 weeks for feature generation
-        
+        last_data = self.df.tail(HISTORY_WEEKS)  # Use last 8 weeks for feature generation
+        cases = last_data['reported_cases'].to_numpy(dtype=np.float64).tolist()
+        rainfall = last_data['rainfall_mm'].to_numpy(dtype=np.float64).tolist()
+        last_date = last_data.index[-1]
+
         forecasts = []
+        feature_array = np.empty((1, len(FEATURE_COLS)))
         for week in range(weeks):
             # Create feature vector for next week
+            month = (last_date + timedelta(weeks=week + 1)).month
             features = {
-                'cases_lag1': last_data['reported_cases'].iloc[-1],
-                'cases_lag2': last_data['reported_cases'].iloc[-2],
-                'rainfall_lag2': last_data['rainfall_mm'].iloc[-2],
-                'rainfall_lag3': last_data['rainfall_mm'].iloc[-3],
-                'month': (last_data.index[-1] + timedelta(weeks=1)).month,
-                'is_monsoon': int((last_data.index[-1] + timedelta(weeks=1)).month in [6,7,8,9]),
-                'cases_ma_4': last_data['reported_cases'].tail(4).mean(),
-                'rainfall_ma_4': last_data['rainfall_mm'].tail(4).mean()
+                'cases_lag1': cases[-1],
+                'cases_lag2': cases[-2],
+                'rainfall_lag2': rainfall[-2],
+                'rainfall_lag3': rainfall[-3],
+                'month': month,
+                'is_monsoon': int(month in [6, 7, 8, 9]),
+                'cases_ma_4': np.mean(cases[-4:]),
+                'rainfall_ma_4': np.mean(rainfall[-4:])
             }
-            
+
             # Ensemble prediction
-            feature_array = np.array([[features[col] for col in [
-                'cases_lag1', 'cases_lag2', 'rainfall_lag2', 'rainfall_lag3',
-                'month', 'is_monsoon', 'cases_ma_4', 'rainfall_ma_4'
-            ]]])
-            
+            feature_array[0] = [features[col] for col in FEATURE_COLS]
+
             preds = [model.predict(feature_array)[0] for model in self.models['ensemble'].values()]
             forecast_val = np.mean(preds)
             forecasts.append(forecast_val)
-            
-            # Update last_data for next iteration
-            new_row = {
-                'reported_cases': forecast_val,
-                'rainfall_mm': last_data['rainfall_mm'].mean()  # Using average rainfall
-            }
-            last_data = pd.concat([
-                    last_data,
-                    pd.DataFrame([new_row], index=[last_data.index[-1] + timedelta(weeks=1)])
-                ])
+
+            # Extend the history for the next iteration
+            cases.append(forecast_val)
+            rainfall.append(np.mean(rainfall))  # Using average rainfall
 
         # Create forecast DataFrame
         future_dates = pd.date_range(
@@ -172,53 +258,31 @@ class DengueForecastingSystem:
     
 
 
-    def get_forecast_plot(self, weeks: int = 12) -> str:
-        """Generate and return base64-encoded forecast plot with confidence intervals"""
-        plt.figure(figsize=(10, 6))
-
-
-        # Plot forecast (ensemble)
+    def forecast_plot_data(self) -> Dict:
+        """Data for the 'dengue_forecast' chart (see charts.py)"""
+        data = {'dates': None, 'predictions': None}
         if 'ensemble' in self.forecasts:
             forecast_data = self.forecasts['ensemble']
+            data['dates'] = pd.to_datetime(forecast_data['dates']).values
+            data['predictions'] = np.asarray(forecast_data['predictions'])
+            if 'lower_ci' in forecast_data and 'upper_ci' in forecast_data:
+                data['lower_ci'] = np.asarray(forecast_data['lower_ci'])
+                data['upper_ci'] = np.asarray(forecast_data['upper_ci'])
+        return data
 
-            # Ensure forecast has datetime index or list
-            forecast_dates = pd.to_datetime(forecast_data['dates'])
-            forecast_values = forecast_data['predictions']
+    @span("plot:dengue_forecast")
+    def get_forecast_plot(self, weeks: int = 12) -> str:
+        """Generate and return base64-encoded forecast plot with confidence intervals"""
+        from charts import render_chart
 
-            
+        image = render_chart('dengue_forecast', self.forecast_plot_data())
+        return base64.b64encode(image).decode('utf-8')
 
-            # Plot predictions
-            plt.plot(forecast_dates, forecast_values, 'r--', label='Forecast', linewidth=2)
 
-            # Plot confidence intervals if available
-            if 'lower_ci' in forecast_data and 'upper_ci' in forecast_data:
-                plt.fill_between(
-                    forecast_dates,
-                    forecast_data['lower_ci'],
-                    forecast_data['upper_ci'],
-                    color='red',
-                    alpha=0.2,
-                    label='Confidence Interval'
-                )
-
-        plt.title('Dengue Case Forecast')
-        plt.xlabel('Date')
-        plt.ylabel('Reported Cases')
-        plt.legend()
-        plt.grid(True, alpha=0.3)
-        plt.tight_layout()
-
-        # Encode image to base64
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png', dpi=120)
-        plt.close()
-        buf.seek(0)
-        return base64.b64encode(buf.read()).decode('utf-8')
-
-
-    def run_pipeline(self) -> Dict:
+    def run_pipeline(self, profile: Optional[str] = None, budget_s: Optional[float] = None,
+                     warm_from: Optional["DengueForecastingSystem"] = None) -> Dict:
         """Complete training and evaluation pipeline"""
-        self.train_ensemble()
+        self.train_ensemble(profile, budget_s, warm_from)
         forecast_df = self.forecast()
         
         return {
@@ -2,14 +2,11 @@ import pandas as pd
 import numpy as np
 from typing import Dict, Tuple, List
 from datetime import timedelta
-from statsmodels.tsa.arima.model import ARIMA
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 import sqlite3
-import joblib
-import matplotlib.pyplot as plt
-import io
 import base64
 
+from metrics import span
+
 
 class CovidForecastModel:
     def __init__(self):
@@ -20,13 +17,15 @@ class CovidForecastModel:
         self.model_metrics = {}
 
     def aggregate_to_weekly(self, df: pd.DataFrame) -> pd.DataFrame:
-        df['Date'] = pd.to_datetime(df['date'])  # Ensure lowercase 'date' from DB
-        df.set_index('Date', inplace=True)
-        weekly_df = df.resample('W-SUN')['hospitalized'].sum().reset_index()
+        # Indexed copy of the column so the caller's frame is left untouched
+        hospitalized = pd.Series(df['hospitalized'].to_numpy(), index=pd.to_datetime(df['date']))
+        weekly_df = hospitalized.resample('W-SUN').sum().reset_index()
         weekly_df.columns = ['Week', 'Weekly_Hospitalized']
         return weekly_df
 
     def find_best_arima_params(self, train_series: pd.Series) -> Tuple[int, int, int]:
+        from statsmodels.tsa.arima.model import ARIMA
+
         best_aic = float('inf')
         best_params = (1, 1, 1)  # Default fallback
         for p in range(0, 4):
@@ -43,6 +42,8 @@ class CovidForecastModel:
         return best_params
 
     def evaluate_model(self, y_true: np.ndarray, y_pred: np.ndarray) -> Dict[str, float]:
+        from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
         mae = mean_absolute_error(y_true, y_pred)
         mse = mean_squared_error(y_true, y_pred)
         rmse = np.sqrt(mse)
@@ -58,7 +59,14 @@ class CovidForecastModel:
         }
 
     def run_pipeline(self, df: pd.DataFrame):
-        self.weekly_df = self.aggregate_to_weekly(df)
+        self.run_weekly_pipeline(self.aggregate_to_weekly(df))
+
+    @span("covid_run_pipeline")
+    def run_weekly_pipeline(self, weekly_df: pd.DataFrame):
+        """Train on Week / Weekly_Hospitalized totals, e.g. from weekly_rollup.read_weekly"""
+        from statsmodels.tsa.arima.model import ARIMA
+
+        self.weekly_df = weekly_df
 
         # Train/test split
         split_point = int(len(self.weekly_df) * 0.8)
@@ -95,7 +103,7 @@ class CovidForecastModel:
             forecast_date = last_date + timedelta(weeks=i + 1)
             forecast_data.append({
                 "date": forecast_date.strftime('%Y-%m-%d'),
-                "predicted_cases": int(predictions[i]),
+                "predicted_cases": int(predictions.iloc[i]),
                 "confidence_lower": float(conf_int.iloc[i, 0]),
                 "confidence_upper": float(conf_int.iloc[i, 1])
             })
@@ -126,36 +134,27 @@ class CovidForecastModel:
         conn.commit()
         conn.close()
 
-    def get_covid_forecast_plot(self, weeks: int = 12) -> str:
-        """Generate and return base64-encoded COVID-19 forecast plot with confidence intervals"""
-        plt.figure(figsize=(10, 6))
-
-        forecast_result = self.get_forecast(steps=weeks)
-        forecast_data = forecast_result.get("forecasts", [])
-
+    def covid_forecast_plot_data(self, weeks: int = 12) -> Dict:
+        """Data for the 'covid_forecast' chart (see charts.py); empty if untrained"""
+        forecast_data = self.get_forecast(steps=weeks).get("forecasts", [])
         if not forecast_data:
-            return ""
-
-        forecast_dates = pd.to_datetime([item["date"] for item in forecast_data])
-        forecast_values = [item["predicted_cases"] for item in forecast_data]
-
-        # Plot predicted cases
-        plt.plot(forecast_dates, forecast_values, 'r--', label='Forecast', linewidth=2)
+            return {}
 
+        return {
+            "dates": pd.to_datetime([item["date"] for item in forecast_data]).values,
+            "predicted_cases": [item["predicted_cases"] for item in forecast_data],
+        }
 
-        plt.title('COVID-19 Case Forecast')
-        plt.xlabel('Date')
-        plt.ylabel('Predicted Cases')
-        plt.legend()
-        plt.grid(True, alpha=0.3)
-        plt.tight_layout()
+    @span("plot:covid_forecast")
+    def get_covid_forecast_plot(self, weeks: int = 12) -> str:
+        """Generate and return base64-encoded COVID-19 forecast plot with confidence intervals"""
+        from charts import render_chart
 
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png', dpi=120)
-        plt.close()
-        buf.seek(0)
+        data = self.covid_forecast_plot_data(weeks)
+        if not data:
+            return ""
 
-        return base64.b64encode(buf.read()).decode('utf-8')
+        return base64.b64encode(render_chart("covid_forecast", data)).decode('utf-8')
 
 
 
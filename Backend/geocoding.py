@@ -0,0 +1,103 @@
+"""Offline geocoding of the free-text hospital `location` field.
+
+A location resolves to (latitude, longitude) if it is a "lat, lon" pair or
+mentions a place in the gazetteer. The gazetteer is a built-in list of
+Bangalore localities and Indian cities, extended by the CSV at
+GEOCODER_GAZETTEER (columns: name,latitude,longitude). The most specific,
+i.e. longest, place name found in the text wins.
+"""
+
+import csv
+import os
+import re
+from typing import Dict, Optional, Tuple
+
+GEOCODER_GAZETTEER = os.getenv("GEOCODER_GAZETTEER", "data/gazetteer.csv")
+
+PLACES = {
+    # Bangalore localities
+    "whitefield": (12.9698, 77.7500),
+    "koramangala": (12.9352, 77.6245),
+    "indiranagar": (12.9784, 77.6408),
+    "jayanagar": (12.9250, 77.5938),
+    "malleshwaram": (13.0035, 77.5710),
+    "hebbal": (13.0358, 77.5970),
+    "yelahanka": (13.1007, 77.5963),
+    "electronic city": (12.8452, 77.6602),
+    "btm layout": (12.9166, 77.6101),
+    "hsr layout": (12.9121, 77.6446),
+    "marathahalli": (12.9569, 77.7011),
+    "rajajinagar": (12.9915, 77.5560),
+    "basavanagudi": (12.9422, 77.5738),
+    "banashankari": (12.9255, 77.5468),
+    "jp nagar": (12.9063, 77.5857),
+    "bannerghatta road": (12.8880, 77.5970),
+    "yeshwanthpur": (13.0285, 77.5402),
+    "kr puram": (13.0077, 77.6950),
+    "shivajinagar": (12.9857, 77.6057),
+    # Cities
+    "bangalore": (12.9716, 77.5946),
+    "bengaluru": (12.9716, 77.5946),
+    "mysuru": (12.2958, 76.6394),
+    "mysore": (12.2958, 76.6394),
+    "mangaluru": (12.9141, 74.8560),
+    "mangalore": (12.9141, 74.8560),
+    "tumakuru": (13.3379, 77.1173),
+    "tumkur": (13.3379, 77.1173),
+    "hubballi": (15.3647, 75.1240),
+    "hubli": (15.3647, 75.1240),
+    "belagavi": (15.8497, 74.4977),
+    "belgaum": (15.8497, 74.4977),
+    "chennai": (13.0827, 80.2707),
+    "hyderabad": (17.3850, 78.4867),
+    "mumbai": (19.0760, 72.8777),
+    "pune": (18.5204, 73.8567),
+    "delhi": (28.6139, 77.2090),
+    "kolkata": (22.5726, 88.3639),
+    "ahmedabad": (23.0225, 72.5714),
+    "jaipur": (26.9124, 75.7873),
+    "lucknow": (26.8467, 80.9462),
+    "kochi": (9.9312, 76.2673),
+    "thiruvananthapuram": (8.5241, 76.9366),
+}
+
+COORDINATES = re.compile(r"^\s*(-?\d{1,2}(?:\.\d+)?)\s*,\s*(-?\d{1,3}(?:\.\d+)?)\s*$")
+
+_gazetteer: Optional[Dict[str, Tuple[float, float]]] = None
+
+
+def _normalize(text: str) -> str:
+    return " " + re.sub(r"[^a-z0-9]+", " ", text.lower()).strip() + " "
+
+
+def gazetteer() -> Dict[str, Tuple[float, float]]:
+    global _gazetteer
+    if _gazetteer is None:
+        places = dict(PLACES)
+        if os.path.exists(GEOCODER_GAZETTEER):
+            with open(GEOCODER_GAZETTEER, newline="") as f:
+                for row in csv.DictReader(f):
+                    places[row["name"].lower()] = (float(row["latitude"]), float(row["longitude"]))
+        # Longest names first so "electronic city" beats "city"-like substrings
+        _gazetteer = {_normalize(name): coords for name, coords in
+                      sorted(places.items(), key=lambda item: -len(item[0]))}
+    return _gazetteer
+
+
+def geocode(location: Optional[str]) -> Optional[Tuple[float, float]]:
+    """(latitude, longitude) for a location string, or None if it cannot be resolved"""
+    if not location:
+        return None
+
+    match = COORDINATES.match(location)
+    if match:
+        latitude, longitude = float(match.group(1)), float(match.group(2))
+        if -90 <= latitude <= 90 and -180 <= longitude <= 180:
+            return latitude, longitude
+        return None
+
+    text = _normalize(location)
+    for name, coords in gazetteer().items():
+        if name in text:
+            return coords
+    return None
@@ -0,0 +1,153 @@
+"""Materialized "latest value" table for the summary endpoints.
+
+Each database gets a latest_values table with one row per (entity, metric)
+holding the newest value of that metric. It is kept current by SQLite
+triggers on the source table, so every ingest path (API routes, pandas
+to_sql, external loaders) maintains it, and summary endpoints answer with
+a primary-key lookup instead of reading and sorting the whole table.
+
+Check the materialized rows against a recompute from the source tables:
+    python latest_snapshot.py
+"""
+
+import sqlite3
+import sys
+from typing import Dict, List, Optional
+
+# entity -> source table; metrics=None means every column but the date
+LATEST_SPECS = {
+    "bangalore": {"db": "db/covid_data.db", "table": "bangalore_cases", "date_column": "date",
+                  "metrics": ["hospitalized", "recovered", "deceased"]},
+    "dengue": {"db": "db/dengue.db", "table": "dengue_data", "date_column": "date",
+               "metrics": ["reported_cases", "rainfall_mm"]},
+    "hospital": {"db": "db/dengue.db", "table": "hospital_resource_timeseries", "date_column": "date",
+                 "metrics": None},
+}
+
+
+def _metrics(conn: sqlite3.Connection, spec: Dict) -> List[str]:
+    if spec["metrics"] is not None:
+        return spec["metrics"]
+    columns = [row[1] for row in conn.execute(f"PRAGMA table_info({spec['table']})")]
+    return [column for column in columns if column != spec["date_column"]]
+
+
+def _recompute_sql(entity: str, spec: Dict, metrics: List[str]) -> str:
+    """INSERT of the newest source row, one latest_values row per metric"""
+    newest = f"(SELECT * FROM {spec['table']} ORDER BY {spec['date_column']} DESC LIMIT 1)"
+    selects = " UNION ALL ".join(
+        f"SELECT '{entity}', '{metric}', {spec['date_column']}, {metric} FROM {newest}"
+        for metric in metrics
+    )
+    return f"INSERT INTO latest_values (entity, metric, as_of, value) {selects};"
+
+
+def install_latest(conn: sqlite3.Connection, entity: str) -> None:
+    """Create latest_values and the triggers for one entity, then backfill it"""
+    spec = LATEST_SPECS[entity]
+    table, date_column = spec["table"], spec["date_column"]
+    metrics = _metrics(conn, spec)
+
+    # value has no declared type so integers stay integers
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS latest_values (
+        entity TEXT,
+        metric TEXT,
+        as_of TEXT,
+        value,
+        PRIMARY KEY (entity, metric)
+    )
+    """)
+
+    values = ", ".join(f"('{entity}', '{metric}', NEW.{date_column}, NEW.{metric})" for metric in metrics)
+    recompute = _recompute_sql(entity, spec, metrics)
+    current_as_of = f"(SELECT MAX(as_of) FROM latest_values WHERE entity = '{entity}')"
+
+    conn.executescript(f"""
+    BEGIN;  -- committed with the backfill below
+    DROP TRIGGER IF EXISTS latest_{entity}_insert;
+    DROP TRIGGER IF EXISTS latest_{entity}_update;
+    DROP TRIGGER IF EXISTS latest_{entity}_delete;
+
+    CREATE TRIGGER latest_{entity}_insert AFTER INSERT ON {table}
+    BEGIN
+        INSERT INTO latest_values (entity, metric, as_of, value) VALUES {values}
+        ON CONFLICT (entity, metric) DO UPDATE SET as_of = excluded.as_of, value = excluded.value
+        WHERE excluded.as_of >= latest_values.as_of;
+    END;
+
+    CREATE TRIGGER latest_{entity}_update AFTER UPDATE ON {table}
+    BEGIN
+        DELETE FROM latest_values WHERE entity = '{entity}';
+        {recompute}
+    END;
+
+    CREATE TRIGGER latest_{entity}_delete AFTER DELETE ON {table}
+    WHEN OLD.{date_column} >= {current_as_of}
+    BEGIN
+        DELETE FROM latest_values WHERE entity = '{entity}';
+        {recompute}
+    END;
+    """)
+
+    # Backfill (or repair) from the source table
+    conn.execute(f"DELETE FROM latest_values WHERE entity = '{entity}'")
+    conn.execute(recompute)
+    conn.commit()
+
+
+def read_latest(conn: sqlite3.Connection, entity: str) -> Optional[Dict]:
+    """Newest row of an entity as {"date": ..., metric: value, ...}; None if empty"""
+    rows = conn.execute(
+        "SELECT metric, as_of, value FROM latest_values WHERE entity = ?", (entity,)
+    ).fetchall()
+    if not rows:
+        return None
+
+    latest = {"date": rows[0][1]}
+    latest.update({metric: value for metric, _, value in rows})
+    return latest
+
+
+def recompute_latest(conn: sqlite3.Connection, entity: str) -> Optional[Dict]:
+    """Same shape as read_latest, computed from the source table"""
+    spec = LATEST_SPECS[entity]
+    metrics = _metrics(conn, spec)
+    cursor = conn.execute(
+        f"SELECT {spec['date_column']}, {', '.join(metrics)} FROM {spec['table']} "
+        f"WHERE {spec['date_column']} = (SELECT MAX({spec['date_column']}) FROM {spec['table']})"
+    )
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    return dict(zip(["date"] + metrics, row))
+
+
+def check_consistency(conn: sqlite3.Connection, entity: str) -> List[str]:
+    """Differences between the materialized row and a recompute; empty if consistent"""
+    materialized = read_latest(conn, entity)
+    expected = recompute_latest(conn, entity)
+    if materialized is None or expected is None:
+        return [] if materialized == expected else [f"{entity}: materialized={materialized} expected={expected}"]
+
+    problems = []
+    for key, value in expected.items():
+        if materialized.get(key) != value:
+            problems.append(f"{entity}.{key}: materialized={materialized.get(key)!r} expected={value!r}")
+    return problems
+
+
+if __name__ == "__main__":
+    problems = []
+    for entity, spec in LATEST_SPECS.items():
+        conn = sqlite3.connect(spec["db"])
+        try:
+            found = check_consistency(conn, entity)
+        finally:
+            conn.close()
+        print(f"{entity}: {'OK' if not found else f'{len(found)} mismatches'}")
+        problems += found
+
+    for problem in problems:
+        print("  ", problem)
+    sys.exit(1 if problems else 0)
@@ -2,11 +2,15 @@
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from routes import national, district,dengue,resources,overload,recommendations
+from routes import national, district,dengue,resources,overload,recommendations,dashboard,nowcast,hospitals,transfers,metrics,debug,exports,accuracy
 from database import init_db
 from fastapi.staticfiles import StaticFiles  # Add this for graph endpoint
 from routes import auth
 from database_covid import init_db_covid
+import chart_renderer
+import warmup
+from metrics import MetricsMiddleware
+from profiling import ProfilingMiddleware
 
 app = FastAPI()
 
@@ -23,6 +27,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# On-demand and slow-request profiles, served from /debug/profiles
+app.add_middleware(ProfilingMiddleware)
+
+# Per-route latency histograms, scraped from /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Mount static files for graphs (required for /dengue/graph endpoint)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
@@ -34,9 +44,26 @@ app.include_router(resources.router, prefix = "/api")
 app.include_router(overload.router, prefix = "/api")
 app.include_router(recommendations.router, prefix = "/api")
 app.include_router(auth.router, prefix="/api")
+app.include_router(dashboard.router, prefix="/api")
+app.include_router(nowcast.router, prefix="/api")
+app.include_router(hospitals.router, prefix="/api")
+app.include_router(transfers.router, prefix="/api")
+app.include_router(exports.router, prefix="/api")
+app.include_router(accuracy.router, prefix="/api")
+app.include_router(metrics.router)
+app.include_router(debug.router)
 
 @app.on_event("startup")
 async def startup():
     """Initialize forecasting model"""
     # This will trigger the startup_event in dengue.py
-    pass
\ No newline at end of file
+    # Compute the overload risk once and push changes to /overload/stream subscribers
+    await overload.start_alerts()
+    # Heavy imports and chart workers load in the background once we are serving
+    warmup.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    warmup.stop()
+    await overload.stop_alerts()
+    chart_renderer.shutdown()
\ No newline at end of file
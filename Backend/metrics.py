@@ -0,0 +1,167 @@
+"""Process-local latency metrics in the Prometheus text format.
+
+Recording an observation is a bisect and two increments under a lock, and
+nothing is formatted until /metrics is scraped, so instrumentation costs
+next to nothing when no one is scraping. Histograms use fixed buckets so
+memory stays bounded; label sets are kept small (route templates, not raw
+paths).
+
+    MetricsMiddleware       per-route latency of every HTTP request
+    span("stage")           latency of a stage, as a context manager or decorator
+    render(stats)           the exposition text, with subsystem stats as counters
+"""
+
+import bisect
+import os
+import threading
+import time
+from contextlib import ContextDecorator
+from typing import Dict, Iterable, List, Tuple
+
+import profiling
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+
+# Seconds; wide enough for both DB reads and model training
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets=BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts (last is +Inf), sum]
+        self._series: Dict[Tuple, List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][i] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            snapshot = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, counts, total in sorted(snapshot):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                le = 'le="%s"' % bound
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {total}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route", "status"))
+STAGE_SECONDS = Histogram(
+    "stage_duration_seconds", "Latency of instrumented stages (training, forecasting, plots, LLM calls, DB waits)",
+    ("stage", "outcome"))
+
+
+class span(ContextDecorator):
+    """Time a stage into stage_duration_seconds{stage=...}, labelled ok or error"""
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def _recreate_cm(self):
+        # A fresh timer per decorated call, so concurrent calls don't share _start
+        return span(self.stage)
+
+    def __enter__(self):
+        self._profile = profiling.enter_stage()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        profiling.exit_stage(self._profile)
+        if METRICS_ENABLED:
+            STAGE_SECONDS.observe(time.perf_counter() - self._start, self.stage, "ok" if exc_type is None else "error")
+        return False
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording the latency of every HTTP request.
+
+    Requests are labelled with the matched route's path template, so
+    /api/hospitals/{hospital_id}/capacity is one series however many
+    hospitals there are; anything that matched no route is "unmatched".
+    Streaming responses are timed until their last body chunk.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            REQUEST_SECONDS.observe(time.perf_counter() - start, scope["method"],
+                                    getattr(route, "path", "unmatched"), status)
+
+
+def render_stats(stats: Iterable[Tuple[str, Dict[str, str], Dict[str, float]]]) -> List[str]:
+    """Counters from subsystem stats dicts: (prefix, labels, stats) -> prefix_<key>_total"""
+    families: Dict[str, List[str]] = {}
+    for prefix, labels, values in stats:
+        names, label_values = tuple(labels), tuple(labels.values())
+        for key, value in dict(values).items():
+            families.setdefault(f"{prefix}_{key}_total", []).append(f"{_labels(names, label_values)} {value}")
+    lines = []
+    for name, samples in sorted(families.items()):
+        lines.append(f"# TYPE {name} counter")
+        lines.extend(f"{name}{sample}" for sample in samples)
+    return lines
+
+
+def render_gauges(gauges: Iterable[Tuple[str, str, Dict[str, str], float]]) -> List[str]:
+    """Gauges from (name, help, labels, value); samples of one name are grouped"""
+    families: Dict[str, List[str]] = {}
+    helps: Dict[str, str] = {}
+    for name, help, labels, value in gauges:
+        helps.setdefault(name, help)
+        families.setdefault(name, []).append(f"{_labels(tuple(labels), tuple(labels.values()))} {value}")
+    lines = []
+    for name, samples in families.items():
+        lines += [f"# HELP {name} {helps[name]}", f"# TYPE {name} gauge"]
+        lines.extend(f"{name}{sample}" for sample in samples)
+    return lines
+
+
+def render(stats=(), gauges=()) -> str:
+    lines = REQUEST_SECONDS.render() + STAGE_SECONDS.render() + render_stats(stats) + render_gauges(gauges)
+    return "\n".join(lines) + "\n"
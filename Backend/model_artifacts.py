@@ -0,0 +1,425 @@
+"""Slim on-disk artifacts for the trained forecasting models.
+
+An artifact is a directory with:
+  manifest.json  - format version, model kind, schema and per-file sizes
+  meta.json.gz   - compressed scalar metadata (params, metrics, settings)
+  <name>.npy     - uncompressed NumPy arrays, memory-mapped on load
+
+Only what inference needs is kept: no training DataFrame, no ARIMA result
+caches and no sklearn estimator objects (trees are flattened to arrays).
+"""
+
+import errno
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from typing import Dict, Tuple
+
+import numpy as np
+
+ARTIFACT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+META_FILE = "meta.json.gz"
+
+COVID_ARTIFACT_PATH = "artifacts/covid_forecaster"
+DENGUE_ARTIFACT_PATH = "artifacts/dengue_forecaster"
+
+# Size budgets (bytes on disk). The pickled CovidForecastModel is ~165 KB.
+COVID_MAX_BYTES = 16 * 1024
+DENGUE_MAX_BYTES = 8 * 1024 * 1024
+
+# Rows of history the dengue forecast needs to build its lag features
+DENGUE_HISTORY_WEEKS = 8
+
+
+class ArtifactError(Exception):
+    """Artifact is missing, corrupt or over its size budget"""
+
+
+class ArtifactVersionError(ArtifactError):
+    """Artifact was written by an incompatible format or schema"""
+
+
+class FlatTreeEnsemble:
+    """Array-backed replacement for a fitted sklearn tree ensemble.
+
+    Nodes of all trees are concatenated in sklearn's depth-first order, so a
+    node's left child is always the next node. ``feature`` is negative for
+    leaves and ``split`` holds the threshold for internal nodes and the
+    prediction for leaves.
+    """
+
+    def __init__(self, roots, feature, right, split, max_depth: int,
+                 offset: float = 0.0, scale: float = 1.0, average: bool = True, float32: bool = True):
+        self.roots = roots
+        self.feature = feature
+        self.right = right
+        self.split = split
+        self.max_depth = max_depth
+        self.offset = offset
+        self.scale = scale
+        self.average = average
+        self.float32 = float32
+
+    def predict(self, X) -> np.ndarray:
+        # sklearn's trees compare float32 features against float64 thresholds;
+        # histogram boosting compares the float64 features
+        X = np.asarray(X, dtype=np.float32 if self.float32 else np.float64)
+        rows = np.arange(len(X))[:, None]
+        nodes = np.broadcast_to(self.roots, (len(X), len(self.roots))).astype(np.int64)
+
+        # Walk every tree for every row at once, one level per step
+        for _ in range(self.max_depth):
+            feature = self.feature[nodes]
+            leaf = feature < 0
+            if leaf.all():
+                break
+            go_left = X[rows, np.where(leaf, 0, feature)] <= self.split[nodes]
+            nodes = np.where(leaf, nodes, np.where(go_left, nodes + 1, self.right[nodes]))
+
+        leaf_values = self.split[nodes]
+        total = leaf_values.mean(axis=1) if self.average else leaf_values.sum(axis=1)
+        return self.offset + self.scale * total
+
+
+class LinearModel:
+    """Array-backed replacement for a fitted LinearRegression"""
+
+    def __init__(self, coef, intercept: float):
+        self.coef = coef
+        self.intercept = intercept
+
+    def predict(self, X) -> np.ndarray:
+        return np.asarray(X, dtype=np.float64) @ self.coef + self.intercept
+
+
+def _flatten_trees(prefix: str, trees) -> Tuple[Dict[str, np.ndarray], int]:
+    """Concatenate sklearn tree node arrays into the FlatTreeEnsemble layout"""
+    roots, feature, right, split = [], [], [], []
+    offset = 0
+    max_depth = 0
+    for estimator in trees:
+        tree = estimator.tree_
+        n = tree.node_count
+        leaf = tree.children_left == -1
+        internal = np.flatnonzero(~leaf)
+        if not np.array_equal(tree.children_left[internal], internal + 1):
+            raise ArtifactError("Only depth-first built trees can be flattened")
+
+        roots.append(offset)
+        feature.append(np.where(leaf, -1, tree.feature))
+        right.append(np.where(leaf, -1, tree.children_right + offset))
+        split.append(np.where(leaf, tree.value.reshape(n, -1)[:, 0], tree.threshold))
+        max_depth = max(max_depth, int(tree.max_depth))
+        offset += n
+
+    arrays = {
+        f"{prefix}_roots": np.array(roots, dtype=np.int32),
+        f"{prefix}_feature": np.concatenate(feature).astype(np.int16),
+        f"{prefix}_right": np.concatenate(right).astype(np.int32),
+        f"{prefix}_split": np.concatenate(split).astype(np.float64),
+    }
+    return arrays, max_depth
+
+
+def _flatten_hist_trees(prefix: str, predictors) -> Tuple[Dict[str, np.ndarray], int]:
+    """Same layout for HistGradientBoostingRegressor's tree predictors (also depth-first)"""
+    roots, feature, right, split = [], [], [], []
+    offset = 0
+    max_depth = 0
+    for predictor in predictors:
+        nodes = predictor.nodes
+        leaf = nodes["is_leaf"].astype(bool)
+        internal = np.flatnonzero(~leaf)
+        if not np.array_equal(nodes["left"][internal], internal + 1):
+            raise ArtifactError("Only depth-first built trees can be flattened")
+        if nodes["is_categorical"].any():
+            raise ArtifactError("Categorical splits cannot be flattened")
+
+        roots.append(offset)
+        feature.append(np.where(leaf, -1, nodes["feature_idx"]))
+        right.append(np.where(leaf, -1, nodes["right"].astype(np.int64) + offset))
+        split.append(np.where(leaf, nodes["value"], nodes["num_threshold"]))
+        max_depth = max(max_depth, int(nodes["depth"].max()))
+        offset += len(nodes)
+
+    arrays = {
+        f"{prefix}_roots": np.array(roots, dtype=np.int32),
+        f"{prefix}_feature": np.concatenate(feature).astype(np.int16),
+        f"{prefix}_right": np.concatenate(right).astype(np.int32),
+        f"{prefix}_split": np.concatenate(split).astype(np.float64),
+    }
+    return arrays, max_depth
+
+
+def _unflatten_trees(prefix: str, arrays: Dict[str, np.ndarray], max_depth: int, **kwargs) -> FlatTreeEnsemble:
+    return FlatTreeEnsemble(
+        arrays[f"{prefix}_roots"],
+        arrays[f"{prefix}_feature"],
+        arrays[f"{prefix}_right"],
+        arrays[f"{prefix}_split"],
+        max_depth=max_depth,
+        **kwargs,
+    )
+
+
+def _write_artifact(path: str, kind: str, arrays: Dict[str, np.ndarray], meta: Dict,
+                    schema: Dict, max_bytes: int) -> Dict:
+    """Write arrays + compressed metadata, then swap the directory into place"""
+    parent = os.path.dirname(path) or "."
+    os.makedirs(parent, exist_ok=True)
+    # Unique per call, so concurrent saves of the same artifact never share a directory
+    tmp_path = tempfile.mkdtemp(prefix=f"{os.path.basename(path)}.tmp-", dir=parent)
+    os.chmod(tmp_path, 0o755)  # mkdtemp makes it 0700; other workers read the artifact
+    try:
+        manifest = _fill_artifact(tmp_path, kind, arrays, meta, schema, max_bytes)
+        _swap_into_place(tmp_path, path)
+    finally:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+    return manifest
+
+
+def _fill_artifact(tmp_path: str, kind: str, arrays: Dict[str, np.ndarray], meta: Dict,
+                   schema: Dict, max_bytes: int) -> Dict:
+    files = {}
+    array_schema = {}
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        file_name = f"{name}.npy"
+        np.save(os.path.join(tmp_path, file_name), array, allow_pickle=False)
+        files[file_name] = os.path.getsize(os.path.join(tmp_path, file_name))
+        array_schema[name] = {"dtype": array.dtype.str, "shape": list(array.shape)}
+
+    with gzip.open(os.path.join(tmp_path, META_FILE), "wt", encoding="utf-8") as f:
+        json.dump(meta, f)
+    files[META_FILE] = os.path.getsize(os.path.join(tmp_path, META_FILE))
+
+    total_bytes = sum(files.values())
+    if total_bytes > max_bytes:
+        raise ArtifactError(f"{kind} artifact is {total_bytes} bytes, over its {max_bytes} byte budget")
+
+    manifest = {
+        "format_version": ARTIFACT_VERSION,
+        "kind": kind,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "schema": dict(schema, arrays=array_schema),
+        "files": files,
+        "total_bytes": total_bytes,
+        "max_bytes": max_bytes,
+    }
+    with open(os.path.join(tmp_path, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def _swap_into_place(tmp_path: str, path: str, attempts: int = 5) -> None:
+    """Move tmp_path to path, replacing any previous version of the artifact.
+
+    A directory cannot be renamed over a non-empty one, so the previous
+    version is moved aside first. Another process can publish in between;
+    its version is then moved aside too and this one wins.
+    """
+    for attempt in range(attempts):
+        old_path = f"{tmp_path}.old-{attempt}"
+        try:
+            os.replace(path, old_path)
+        except FileNotFoundError:
+            pass
+        try:
+            os.replace(tmp_path, path)
+            return
+        except OSError as e:
+            if e.errno not in (errno.ENOTEMPTY, errno.EEXIST) or attempt == attempts - 1:
+                raise
+        finally:
+            shutil.rmtree(old_path, ignore_errors=True)
+
+
+def read_manifest(path: str) -> Dict:
+    manifest_path = os.path.join(path, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        raise ArtifactError(f"No model artifact at {path}")
+    with open(manifest_path) as f:
+        return json.load(f)
+
+
+def _read_artifact(path: str, kind: str) -> Tuple[Dict, Dict, Dict[str, np.ndarray]]:
+    manifest = read_manifest(path)
+
+    version = manifest.get("format_version")
+    if version != ARTIFACT_VERSION:
+        raise ArtifactVersionError(
+            f"Artifact at {path} has format version {version}, expected {ARTIFACT_VERSION}; retrain the model"
+        )
+    if manifest.get("kind") != kind:
+        raise ArtifactVersionError(f"Artifact at {path} holds a {manifest.get('kind')} model, expected {kind}")
+
+    for file_name, size in manifest["files"].items():
+        file_path = os.path.join(path, file_name)
+        if not os.path.exists(file_path) or os.path.getsize(file_path) != size:
+            raise ArtifactError(f"Artifact file {file_path} is missing or does not match the manifest")
+
+    with gzip.open(os.path.join(path, META_FILE), "rt", encoding="utf-8") as f:
+        meta = json.load(f)
+
+    arrays = {}
+    for name, spec in manifest["schema"]["arrays"].items():
+        array = np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r", allow_pickle=False)
+        if array.dtype.str != spec["dtype"] or list(array.shape) != spec["shape"]:
+            raise ArtifactVersionError(f"Array {name} in {path} does not match the manifest schema")
+        arrays[name] = array
+
+    return manifest, meta, arrays
+
+
+def save_covid_artifact(forecaster, path: str = COVID_ARTIFACT_PATH, max_bytes: int = COVID_MAX_BYTES) -> Dict:
+    """Persist a trained CovidForecastModel without its ARIMA result caches"""
+    import pandas as pd
+
+    if forecaster.fitted_model is None or forecaster.weekly_df is None:
+        raise ValueError("Model is not trained yet.")
+
+    weeks = pd.to_datetime(forecaster.weekly_df["Week"])
+    arrays = {
+        "weeks": weeks.values.astype("datetime64[ns]"),
+        "weekly_hospitalized": forecaster.weekly_df["Weekly_Hospitalized"].to_numpy(dtype=np.float64),
+        "params": np.asarray(forecaster.fitted_model.params, dtype=np.float64),
+    }
+    meta = {
+        "best_params": list(forecaster.best_params),
+        "model_metrics": {k: float(v) for k, v in forecaster.model_metrics.items()},
+    }
+    schema = {"param_names": list(forecaster.fitted_model.model.param_names)}
+    return _write_artifact(path, "covid_arima", arrays, meta, schema, max_bytes)
+
+
+def load_covid_artifact(path: str = COVID_ARTIFACT_PATH):
+    """Rebuild an inference-ready CovidForecastModel by re-filtering stored params"""
+    import pandas as pd
+    from statsmodels.tsa.arima.model import ARIMA
+    from forecasting_covid import CovidForecastModel
+
+    manifest, meta, arrays = _read_artifact(path, "covid_arima")
+
+    weekly_df = pd.DataFrame({
+        "Week": pd.to_datetime(np.asarray(arrays["weeks"])),
+        "Weekly_Hospitalized": np.asarray(arrays["weekly_hospitalized"]),
+    })
+    order = tuple(meta["best_params"])
+    model = ARIMA(weekly_df.set_index("Week")["Weekly_Hospitalized"], order=order)
+
+    param_names = manifest["schema"]["param_names"]
+    if list(model.param_names) != param_names:
+        raise ArtifactVersionError(
+            f"Artifact at {path} has ARIMA params {param_names}, model expects {list(model.param_names)}"
+        )
+
+    forecaster = CovidForecastModel()
+    forecaster.weekly_df = weekly_df
+    forecaster.best_params = order
+    forecaster.model = model
+    # Filtering with fixed params is a single Kalman pass, no optimisation
+    forecaster.fitted_model = model.filter(np.asarray(arrays["params"]))
+    forecaster.model_metrics = meta["model_metrics"]
+    return forecaster
+
+
+def save_dengue_artifact(forecaster, path: str = DENGUE_ARTIFACT_PATH, max_bytes: int = DENGUE_MAX_BYTES) -> Dict:
+    """Persist a trained DengueForecastingSystem as flattened tree arrays"""
+    import pandas as pd
+    from forecasting import FEATURE_COLS
+
+    if "ensemble" not in forecaster.models:
+        raise ValueError("Model is not trained yet.")
+    models = forecaster.models["ensemble"]
+
+    rf_arrays, rf_depth = _flatten_trees("rf", models["RandomForest"].estimators_)
+    gb = models["GradientBoost"]
+    if hasattr(gb, "_predictors"):
+        # HistGradientBoostingRegressor: leaf values already include the learning rate
+        gb_arrays, gb_depth = _flatten_hist_trees("gb", [predictors[0] for predictors in gb._predictors])
+        gb_kind, gb_init, gb_scale = "histogram", float(np.ravel(gb._baseline_prediction)[0]), 1.0
+    else:
+        gb_arrays, gb_depth = _flatten_trees("gb", gb.estimators_[:, 0])
+        gb_kind, gb_init, gb_scale = "gradient", float(np.ravel(gb.init_.constant_)[0]), float(gb.learning_rate)
+    linear = models["LinearReg"]
+
+    history = forecaster.df[["reported_cases", "rainfall_mm"]].tail(DENGUE_HISTORY_WEEKS)
+    backtest = forecaster.forecasts.get("ensemble", {})
+
+    arrays = dict(rf_arrays, **gb_arrays)
+    arrays.update({
+        "lr_coef": np.asarray(linear.coef_, dtype=np.float64),
+        "history_dates": history.index.values.astype("datetime64[ns]"),
+        "history_cases": history["reported_cases"].to_numpy(dtype=np.float64),
+        "history_rainfall": history["rainfall_mm"].to_numpy(dtype=np.float64),
+    })
+    if backtest:
+        arrays.update({
+            "backtest_dates": pd.to_datetime(backtest["dates"]).values.astype("datetime64[ns]"),
+            "backtest_predictions": np.asarray(backtest["predictions"], dtype=np.float64),
+            "backtest_actual": np.asarray(backtest["actual"], dtype=np.float64),
+        })
+
+    meta = {
+        "rf_max_depth": rf_depth,
+        "gb_max_depth": gb_depth,
+        "gb_kind": gb_kind,
+        "gb_init": gb_init,
+        "gb_learning_rate": gb_scale,
+        "lr_intercept": float(linear.intercept_),
+        "metrics": {k: float(v) for k, v in forecaster.metrics.get("ensemble", {}).items()},
+        "training": getattr(forecaster, "training", {}),
+    }
+    schema = {"feature_cols": list(FEATURE_COLS), "models": list(models.keys())}
+    return _write_artifact(path, "dengue_ensemble", arrays, meta, schema, max_bytes)
+
+
+def load_dengue_artifact(path: str = DENGUE_ARTIFACT_PATH):
+    """Rebuild an inference-only DengueForecastingSystem from flattened trees"""
+    import pandas as pd
+    from forecasting import DengueForecastingSystem, FEATURE_COLS
+
+    manifest, meta, arrays = _read_artifact(path, "dengue_ensemble")
+    if manifest["schema"]["feature_cols"] != list(FEATURE_COLS):
+        raise ArtifactVersionError(
+            f"Artifact at {path} was trained on features {manifest['schema']['feature_cols']}, "
+            f"current model uses {list(FEATURE_COLS)}"
+        )
+
+    models = {
+        "RandomForest": _unflatten_trees("rf", arrays, meta["rf_max_depth"]),
+        "GradientBoost": _unflatten_trees(
+            "gb", arrays, meta["gb_max_depth"],
+            offset=meta["gb_init"], scale=meta["gb_learning_rate"], average=False,
+            float32=meta.get("gb_kind", "gradient") == "gradient",
+        ),
+        "LinearReg": LinearModel(arrays["lr_coef"], meta["lr_intercept"]),
+    }
+
+    # Skip __init__: there is no training frame to prepare
+    forecaster = DengueForecastingSystem.__new__(DengueForecastingSystem)
+    forecaster.df = pd.DataFrame(
+        {
+            "reported_cases": np.asarray(arrays["history_cases"]),
+            "rainfall_mm": np.asarray(arrays["history_rainfall"]),
+        },
+        index=pd.DatetimeIndex(np.asarray(arrays["history_dates"]), name="date"),
+    )
+    forecaster.features = None
+    forecaster.models = {"ensemble": models}
+    forecaster.forecasts = {}
+    forecaster.metrics = {"ensemble": meta["metrics"]}
+    forecaster.figures = {}
+    forecaster.training = meta.get("training", {})
+    if "backtest_dates" in arrays:
+        dates = pd.DatetimeIndex(np.asarray(arrays["backtest_dates"]))
+        forecaster.forecasts["ensemble"] = {
+            "predictions": np.asarray(arrays["backtest_predictions"]),
+            "actual": pd.Series(np.asarray(arrays["backtest_actual"]), index=dates),
+            "dates": dates,
+        }
+    return forecaster
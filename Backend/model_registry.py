@@ -0,0 +1,169 @@
+"""Cross-process model versions for multi-worker deployments.
+
+With `uvicorn --workers N`, a trained model is shared through its artifact
+(model_artifacts.py): the arrays are memory-mapped read-only, so every
+worker maps the same page-cache pages instead of holding its own copy.
+The model_versions table in dengue.db holds one row per model:
+
+    version         bumped each time a new artifact is published
+    training_until  lease held by the one worker that is training, so the
+                    other workers wait for its artifact instead of retraining
+
+A SharedModel loads the artifact for the current version. Its ChangeWatcher
+sees other workers' bumps through PRAGMA data_version and the change
+counters, and reloads the artifact; nothing is retrained.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from database import DATABASE_PATH
+from events import ChangeWatcher, install_change_counters, register_watcher
+from model_artifacts import ArtifactError, read_manifest
+
+MODEL_TRAIN_LEASE = float(os.getenv("MODEL_TRAIN_LEASE", 900))
+
+shared_models: Dict[str, "SharedModel"] = {}
+
+
+def install_model_versions(conn: sqlite3.Connection) -> None:
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS model_versions (
+        name TEXT PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0,
+        published_at REAL,
+        training_until REAL
+    )
+    """)
+    conn.commit()
+    install_change_counters(conn, ["model_versions"])
+
+
+def current_version(conn: sqlite3.Connection, name: str) -> int:
+    row = conn.execute("SELECT version FROM model_versions WHERE name = ?", (name,)).fetchone()
+    return row[0] if row else 0
+
+
+def claim_training(conn: sqlite3.Connection, name: str, lease: float = MODEL_TRAIN_LEASE) -> bool:
+    """True if this process may train `name`; False while another holds the lease"""
+    now = time.time()
+    conn.execute("INSERT OR IGNORE INTO model_versions (name) VALUES (?)", (name,))
+    claimed = conn.execute("""
+        UPDATE model_versions SET training_until = ?
+        WHERE name = ? AND (training_until IS NULL OR training_until < ?)
+    """, (now + lease, name, now)).rowcount
+    conn.commit()
+    return claimed == 1
+
+
+def release_training(conn: sqlite3.Connection, name: str) -> None:
+    conn.execute("UPDATE model_versions SET training_until = NULL WHERE name = ?", (name,))
+    conn.commit()
+
+
+def bump_version(conn: sqlite3.Connection, name: str) -> int:
+    """Announce a newly written artifact, releasing the training lease"""
+    conn.execute("""
+        INSERT INTO model_versions (name, version, published_at) VALUES (?, 1, ?)
+        ON CONFLICT (name) DO UPDATE SET
+            version = version + 1, published_at = excluded.published_at, training_until = NULL
+    """, (name, time.time()))
+    conn.commit()
+    return current_version(conn, name)
+
+
+class SharedModel:
+    """The model published under `name`, reloaded from its artifact when the version moves"""
+
+    def __init__(self, name: str, artifact_path: str, load: Callable, on_load: Optional[Callable] = None,
+                 db_path: str = DATABASE_PATH):
+        self.name = name
+        self.artifact_path = artifact_path
+        self.load = load
+        self.on_load = on_load
+        self.db_path = db_path
+
+        self.model = None
+        self.version: Optional[int] = None
+        self.created_at: Optional[str] = None
+        self._lock = threading.Lock()
+        # Forced refreshes skip the lease, so fits in this process are serialized here
+        self._train_lock = threading.Lock()
+        self.watcher = register_watcher(f"model:{name}", ChangeWatcher(db_path, ["model_versions"], self._on_change))
+        self.stats = {"loads": 0, "load_errors": 0, "trainings": 0, "training_errors": 0, "lease_waits": 0}
+        self.last_training_error: Optional[str] = None
+        shared_models[name] = self
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path)
+
+    def refresh(self) -> bool:
+        """Load the artifact if a newer version was published; True if the model changed"""
+        conn = self._connect()
+        try:
+            version = current_version(conn, self.name)
+        finally:
+            conn.close()
+
+        with self._lock:
+            if version == self.version and self.model is not None:
+                return False
+            try:
+                model = self.load(self.artifact_path)
+                created_at = read_manifest(self.artifact_path)["created_at"]
+            except ArtifactError:
+                # Missing, incompatible, or being replaced right now: keep serving what we have
+                self.stats["load_errors"] += 1
+                return False
+            self.model, self.version, self.created_at = model, version, created_at
+            self.stats["loads"] += 1
+        if self.on_load is not None:
+            self.on_load(model)
+        return True
+
+    async def _on_change(self, changed) -> None:
+        await run_in_threadpool(self.refresh)
+
+    def train(self, fit: Callable, save: Callable, force: bool = False) -> bool:
+        """fit() a model, save(model, path) it and publish it to every worker.
+
+        Returns False without training if another worker holds the lease,
+        unless force is set (explicit refreshes). Calls in one process run
+        one at a time.
+        """
+        with self._train_lock:
+            conn = self._connect()
+            try:
+                claimed = claim_training(conn, self.name)
+                if not claimed and not force:
+                    self.stats["lease_waits"] += 1
+                    return False
+                try:
+                    model = fit()
+                    save(model, self.artifact_path)
+                except Exception as e:
+                    self.stats["training_errors"] += 1
+                    self.last_training_error = repr(e)
+                    # A forced fit without the lease must not clear another worker's
+                    if claimed:
+                        release_training(conn, self.name)
+                    raise
+                self.stats["trainings"] += 1
+                bump_version(conn, self.name)
+            finally:
+                conn.close()
+
+        # Serve the memory-mapped artifact like every other worker, not the fitted copy
+        self.refresh()
+        return True
+
+    async def start(self) -> None:
+        await self.watcher.start()
+
+    async def stop(self) -> None:
+        await self.watcher.stop()
@@ -0,0 +1,178 @@
+"""Shared client for the api-ninjas national COVID endpoint.
+
+One pooled requests.Session is reused for every call, and the parsed
+DataFrame is cached for NATIONAL_CACHE_TTL seconds. After that, callers keep
+getting the stale copy (up to NATIONAL_MAX_STALE) while a single background
+thread refreshes it. Every successful fetch is written to disk, so if the
+upstream is down the last snapshot is served instead of an error.
+
+Point NATIONAL_API_URL at benchmarks/fixture_server.py to run offline.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+load_dotenv()
+NATIONAL_API_URL = os.getenv("NATIONAL_API_URL", "https://api.api-ninjas.com/v1/covid19?country=India")
+NATIONAL_API_KEY = os.getenv("NATIONAL_API_KEY")
+NATIONAL_CACHE_TTL = float(os.getenv("NATIONAL_CACHE_TTL", 600))
+NATIONAL_MAX_STALE = float(os.getenv("NATIONAL_MAX_STALE", 24 * 3600))
+NATIONAL_TIMEOUT = float(os.getenv("NATIONAL_TIMEOUT", 10))
+NATIONAL_SNAPSHOT_PATH = os.getenv("NATIONAL_SNAPSHOT_PATH", "cache/national_snapshot.json")
+
+
+class NationalDataError(Exception):
+    """Upstream failed and there is no snapshot to fall back on"""
+
+
+class NationalSnapshot:
+    def __init__(self, record: Dict, df: pd.DataFrame, fetched_at: float, source: str):
+        self.record = record  # country-level fields, without the 'cases' dict
+        self.df = df          # Date / Total Cases / New Cases, oldest first
+        self.fetched_at = fetched_at
+        self.source = source  # "upstream" or "disk"
+
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+
+def parse_payload(data) -> tuple:
+    """Split an api-ninjas response into (record, cases DataFrame)"""
+    import pandas as pd
+
+    if not data or 'cases' not in data[0]:
+        raise NationalDataError("Invalid API data format")
+
+    record = {key: value for key, value in data[0].items() if key != 'cases'}
+    cases = data[0]['cases']
+    df = pd.DataFrame({
+        'Date': pd.to_datetime(list(cases.keys())),
+        'Total Cases': np.fromiter((v.get('total', 0) for v in cases.values()), dtype=np.int64, count=len(cases)),
+        'New Cases': np.abs(np.fromiter((v.get('new', 0) for v in cases.values()), dtype=np.int64, count=len(cases))),
+    })
+    df = df.sort_values("Date").reset_index(drop=True)
+    return record, df
+
+
+class NationalDataClient:
+    def __init__(self, url: str = NATIONAL_API_URL, api_key: Optional[str] = NATIONAL_API_KEY,
+                 ttl: float = NATIONAL_CACHE_TTL, max_stale: float = NATIONAL_MAX_STALE,
+                 timeout: float = NATIONAL_TIMEOUT, snapshot_path: str = NATIONAL_SNAPSHOT_PATH):
+        self.url = url
+        self.api_key = api_key
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.timeout = timeout
+        self.snapshot_path = snapshot_path
+
+        self._session = None
+        self._snapshot: Optional[NationalSnapshot] = None
+        self._lock = threading.Lock()
+        self._background = threading.Lock()
+        self._retry_at = 0.0
+        self.stats = {"fresh_hits": 0, "stale_hits": 0, "fetches": 0, "fetch_errors": 0, "disk_fallbacks": 0}
+
+    @property
+    def session(self):
+        # requests is imported on the first fetch rather than at startup
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=8))
+            session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=8))
+            self._session = session
+        return self._session
+
+    def _fetch(self) -> NationalSnapshot:
+        self.stats["fetches"] += 1
+        response = self.session.get(self.url, headers={"X-Api-Key": self.api_key or ""}, timeout=self.timeout)
+        if response.status_code != 200:
+            raise NationalDataError(f"Failed to fetch data: {response.status_code}")
+
+        data = response.json()
+        record, df = parse_payload(data)
+        snapshot = NationalSnapshot(record, df, time.time(), "upstream")
+        self._write_disk(data, snapshot.fetched_at)
+        return snapshot
+
+    def _write_disk(self, data, fetched_at: float) -> None:
+        os.makedirs(os.path.dirname(self.snapshot_path) or ".", exist_ok=True)
+        tmp_path = f"{self.snapshot_path}.tmp-{os.getpid()}"
+        with open(tmp_path, "w") as f:
+            json.dump({"fetched_at": fetched_at, "data": data}, f)
+        os.replace(tmp_path, self.snapshot_path)
+
+    def _read_disk(self) -> Optional[NationalSnapshot]:
+        try:
+            with open(self.snapshot_path) as f:
+                saved = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        record, df = parse_payload(saved["data"])
+        return NationalSnapshot(record, df, saved["fetched_at"], "disk")
+
+    def _refresh(self) -> NationalSnapshot:
+        """Fetch upstream, falling back to the newest snapshot we have"""
+        import requests
+
+        try:
+            snapshot = self._fetch()
+        except (requests.RequestException, NationalDataError, ValueError) as e:
+            self.stats["fetch_errors"] += 1
+            fallback = self._snapshot or self._read_disk()
+            if fallback is None:
+                raise NationalDataError(str(e)) from e
+            if fallback.source == "disk":
+                self.stats["disk_fallbacks"] += 1
+            # Keep serving the fallback without blocking on upstream for a while
+            self._snapshot = fallback
+            self._retry_at = time.time() + self.ttl
+            return fallback
+        self._snapshot = snapshot
+        return snapshot
+
+    def _refresh_in_background(self) -> None:
+        try:
+            with self._lock:
+                self._refresh()
+        except NationalDataError:
+            pass
+        finally:
+            self._background.release()
+
+    def get(self) -> NationalSnapshot:
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.source == "upstream" and snapshot.age() < self.ttl:
+            self.stats["fresh_hits"] += 1
+            return snapshot
+
+        if snapshot is not None and (snapshot.age() < self.max_stale or time.time() < self._retry_at):
+            # Stale-while-revalidate: answer now, refresh once in the background
+            self.stats["stale_hits"] += 1
+            if time.time() >= self._retry_at and self._background.acquire(blocking=False):
+                threading.Thread(target=self._refresh_in_background, daemon=True).start()
+            return snapshot
+
+        with self._lock:
+            # Another thread may have refreshed while we waited for the lock
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.source == "upstream" and snapshot.age() < self.ttl:
+                self.stats["fresh_hits"] += 1
+                return snapshot
+            return self._refresh()
+
+
+national_client = NationalDataClient()
@@ -0,0 +1,256 @@
+"""Streaming nowcasts between full retrains of the heavy forecasters.
+
+Each series keeps a damped-Holt exponential smoothing state (level, trend)
+that absorbs a new observation in O(1) time and memory, so nowcasts and
+short-horizon forecasts reflect the newest data straight away.
+
+Residuals are measured against the heavy model's forecast for the same step
+while it has one (otherwise against the one-step smoothing forecast) and are
+fed to a two-sided CUSUM on standardized residuals. When the CUSUM crosses
+NOWCAST_DRIFT_THRESHOLD, the series' full retrain runs in a background
+thread, at most once per NOWCAST_RETRAIN_COOLDOWN seconds.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+NOWCAST_ALPHA = float(os.getenv("NOWCAST_ALPHA", 0.5))
+NOWCAST_BETA = float(os.getenv("NOWCAST_BETA", 0.1))
+NOWCAST_PHI = float(os.getenv("NOWCAST_PHI", 0.9))
+NOWCAST_DRIFT_SLACK = float(os.getenv("NOWCAST_DRIFT_SLACK", 0.5))
+NOWCAST_DRIFT_THRESHOLD = float(os.getenv("NOWCAST_DRIFT_THRESHOLD", 5.0))
+NOWCAST_RETRAIN_COOLDOWN = float(os.getenv("NOWCAST_RETRAIN_COOLDOWN", 3600))
+WARMUP_OBSERVATIONS = 8
+RECENT_KEYS = 64
+
+
+class HoltState:
+    """Damped-trend exponential smoothing, updated one observation at a time"""
+
+    def __init__(self, alpha: float = NOWCAST_ALPHA, beta: float = NOWCAST_BETA, phi: float = NOWCAST_PHI):
+        self.alpha = alpha
+        self.beta = beta
+        self.phi = phi
+        self.level: Optional[float] = None
+        self.trend = 0.0
+        self.n = 0
+
+    def predict(self, steps: int = 1) -> Optional[float]:
+        if self.level is None:
+            return None
+        damping = sum(self.phi ** i for i in range(1, steps + 1))
+        return max(0.0, self.level + damping * self.trend)
+
+    def update(self, y: float) -> Optional[float]:
+        """Absorb y and return its one-step-ahead residual (None for the first value)"""
+        self.n += 1
+        if self.level is None:
+            self.level = y
+            return None
+
+        residual = y - self.predict(1)
+        previous_level = self.level
+        self.level = self.alpha * y + (1 - self.alpha) * (previous_level + self.phi * self.trend)
+        self.trend = self.beta * (self.level - previous_level) + (1 - self.beta) * self.phi * self.trend
+        return residual
+
+
+class DriftDetector:
+    """Two-sided CUSUM on residuals standardized by their running mean absolute value"""
+
+    def __init__(self, slack: float = NOWCAST_DRIFT_SLACK, threshold: float = NOWCAST_DRIFT_THRESHOLD,
+                 decay: float = 0.1):
+        self.slack = slack
+        self.threshold = threshold
+        self.decay = decay
+        self.scale: Optional[float] = None
+        self.bias = 0.0
+        self.mae = 0.0
+        self.last_z = 0.0
+        self.reset()
+
+    def reset(self) -> None:
+        self.upper = 0.0
+        self.lower = 0.0
+
+    def update(self, residual: float, detect: bool = True) -> bool:
+        if self.scale is None:
+            self.scale = abs(residual)
+            self.mae = abs(residual)
+            return False
+
+        # 1.25 * mean absolute deviation approximates the standard deviation
+        z = residual / max(1.25 * self.scale, 1e-9)
+        self.last_z = z
+        self.scale += self.decay * (abs(residual) - self.scale)
+        self.bias += self.decay * (residual - self.bias)
+        self.mae += self.decay * (abs(residual) - self.mae)
+        if not detect:
+            return False
+
+        self.upper = max(0.0, self.upper + z - self.slack)
+        self.lower = max(0.0, self.lower - z - self.slack)
+        return max(self.upper, self.lower) > self.threshold
+
+    def metrics(self) -> Dict:
+        return {
+            "bias": self.bias,
+            "mae": self.mae,
+            "last_z": self.last_z,
+            "cusum_upper": self.upper,
+            "cusum_lower": self.lower,
+            "threshold": self.threshold,
+        }
+
+
+class SeriesNowcaster:
+    """Streaming state of one series, plus its link to the heavy model
+
+    fetch(after_key) returns the (key, value) observations newer than
+    after_key in key order; keys are ISO date strings. reference() returns
+    (trained_through_key, [heavy forecast for the following steps]) or None,
+    and retrain() refits the heavy model.
+    """
+
+    def __init__(self, name: str, fetch: Callable[[Optional[str]], List[Tuple[str, float]]],
+                 reference: Callable[[], Optional[Tuple[str, List[float]]]], retrain: Callable[[], None],
+                 cooldown: float = NOWCAST_RETRAIN_COOLDOWN):
+        self.name = name
+        self.fetch = fetch
+        self.reference_fn = reference
+        self.retrain_fn = retrain
+        self.cooldown = cooldown
+
+        self.holt = HoltState()
+        self.drift = DriftDetector()
+        self.last_key: Optional[str] = None
+        self.recent_keys = deque(maxlen=RECENT_KEYS)
+        self.reference: Optional[Tuple[str, List[float]]] = None
+        self.reference_step = 0
+
+        self._lock = threading.Lock()
+        self._retraining = threading.Lock()
+        self.last_retrain_at = 0.0
+        self.last_retrain_error: Optional[str] = None
+        self.stats = {"observations": 0, "syncs": 0, "drift_events": 0, "retrains": 0}
+
+    def set_reference(self, reference: Optional[Tuple[str, List[float]]]) -> None:
+        self.reference = reference
+        self.reference_step = 0
+        if reference is not None:
+            # Observations already absorbed past the training cut-off use up steps
+            self.reference_step = sum(1 for key in self.recent_keys if key[:10] > reference[0][:10])
+        self.drift.reset()
+
+    def _reference_value(self) -> Optional[float]:
+        if self.reference is None or self.reference_step >= len(self.reference[1]):
+            return None
+        return self.reference[1][self.reference_step]
+
+    def observe(self, key: str, value: float, detect: bool = True) -> bool:
+        """Absorb one observation; True if it tipped the drift detector"""
+        if self.last_key is not None and key <= self.last_key:
+            return False
+
+        expected = None
+        if self.reference is not None and key[:10] > self.reference[0][:10]:
+            expected = self._reference_value()
+            self.reference_step += 1
+
+        one_step = self.holt.update(float(value))
+        self.last_key = key
+        self.recent_keys.append(key)
+        self.stats["observations"] += 1
+
+        residual = float(value) - expected if expected is not None else one_step
+        if residual is None:
+            return False
+        return self.drift.update(residual, detect=detect and self.holt.n > WARMUP_OBSERVATIONS)
+
+    def sync(self) -> int:
+        """Absorb observations written since the last sync; returns how many"""
+        with self._lock:
+            first_sync = self.last_key is None
+            rows = self.fetch(self.last_key)
+            self.stats["syncs"] += 1
+            if self.reference is None:
+                # The heavy model may have been trained since the last sync
+                reference = self.reference_fn()
+                if reference is not None:
+                    self.set_reference(reference)
+
+            drifted = False
+            for key, value in rows:
+                # Replaying history on the first sync only warms the state up
+                drifted = self.observe(key, value, detect=not first_sync) or drifted
+
+        if drifted:
+            self.stats["drift_events"] += 1
+            self.trigger_retrain()
+        return len(rows)
+
+    def trigger_retrain(self) -> bool:
+        """Start a background retrain unless one is running or ran recently"""
+        if time.time() - self.last_retrain_at < self.cooldown:
+            return False
+        if not self._retraining.acquire(blocking=False):
+            return False
+        threading.Thread(target=self._retrain, daemon=True).start()
+        return True
+
+    def _retrain(self) -> None:
+        try:
+            self.last_retrain_at = time.time()
+            self.retrain_fn()
+            self.stats["retrains"] += 1
+            self.last_retrain_error = None
+            with self._lock:
+                self.set_reference(self.reference_fn())
+        except Exception as e:
+            self.last_retrain_error = str(e)
+        finally:
+            self._retraining.release()
+
+    def nowcast(self, horizon: int = 4) -> Dict:
+        forecast = [self.holt.predict(step) for step in range(1, horizon + 1)]
+
+        # Heavy-model forecast for the coming steps, shifted by its recent bias
+        adjusted = None
+        if self.reference is not None:
+            upcoming = self.reference[1][self.reference_step:self.reference_step + horizon]
+            adjusted = [max(0.0, value + self.drift.bias) for value in upcoming]
+
+        return {
+            "series": self.name,
+            "as_of": self.last_key,
+            "nowcast": self.holt.level,
+            "forecast": forecast,
+            "adjusted_model_forecast": adjusted,
+        }
+
+    def state(self) -> Dict:
+        return {
+            "series": self.name,
+            "as_of": self.last_key,
+            "level": self.holt.level,
+            "trend": self.holt.trend,
+            "observations": self.holt.n,
+            "reference_through": self.reference[0] if self.reference else None,
+            "reference_step": self.reference_step,
+            "drift": self.drift.metrics(),
+            "retraining": self._retraining.locked(),
+            "last_retrain_at": self.last_retrain_at or None,
+            "last_retrain_error": self.last_retrain_error,
+            "stats": dict(self.stats),
+        }
+
+
+nowcasters: Dict[str, SeriesNowcaster] = {}
+
+
+def register_nowcaster(nowcaster: SeriesNowcaster) -> SeriesNowcaster:
+    nowcasters[nowcaster.name] = nowcaster
+    return nowcaster
@@ -17,22 +17,24 @@ def check_overload(demand: dict, available: dict) -> list:
     return overloaded
 
 
-def predict_overload(forecast_weeks, available_resources):
-    RESOURCE_USAGE = {
-        "icu_rate": 0.15,
-        "ventilator_rate": 0.08,
-        "doctor_rate": 0.05,
-        "nurse_rate": 0.10,
-        "oxygen_rate": 0.07
-
-        # gets low risk 
-        # "icu_rate": 0.1,
-        # "ventilator_rate": 0.05,
-        # "doctor_rate": 0.02,
-        # "nurse_rate": 0.04,
-        # "oxygen_rate": 0.05 
-       }
+# Units needed per predicted case
+RESOURCE_USAGE = {
+    "icu_rate": 0.15,
+    "ventilator_rate": 0.08,
+    "doctor_rate": 0.05,
+    "nurse_rate": 0.10,
+    "oxygen_rate": 0.07
+
+    # gets low risk 
+    # "icu_rate": 0.1,
+    # "ventilator_rate": 0.05,
+    # "doctor_rate": 0.02,
+    # "nurse_rate": 0.04,
+    # "oxygen_rate": 0.05 
+   }
+
 
+def predict_overload(forecast_weeks, available_resources):
     # Use next week's forecast
     next_week = forecast_weeks[0]
     demand = estimate_demand(next_week["predicted"], RESOURCE_USAGE)
@@ -0,0 +1,375 @@
+"""Opt-in profiling of individual production requests.
+
+A request is profiled when:
+  - it carries X-Profile: sample|cprofile (or ?profile=sample|cprofile)
+    together with X-Admin-Token matching PROFILE_ADMIN_TOKEN, or
+  - it is still running after PROFILE_SLOW_MS; it is then sampled from
+    that point until it finishes. Until the threshold passes this costs
+    one event-loop timer per request.
+
+"sample" is a wall-clock sampler over every thread, so it sees the
+threadpool work behind sync routes (pandas, ARIMA fitting, sklearn) as
+well as the event loop. Concurrent requests show up in the same samples.
+"cprofile" profiles the event-loop thread deterministically, plus every
+metrics.span() stage that runs under the request in a worker thread. On
+Python 3.12+ cProfile is built on sys.monitoring, which allows one
+profiler per process and sees every thread, so the event-loop profiler
+covers the stages too (and concurrent requests' work). Only one cprofile
+capture runs at a time, and other requests fall back to sampling, as
+they do when another profiling tool is already active. Chart rendering
+runs in chart_renderer worker processes and shows up only as the time
+spent awaiting them.
+
+The last PROFILE_MAX_STORED profiles are kept in memory. Each holds
+collapsed stacks (flamegraph.pl / speedscope input), the model artifact
+and data versions active at the time, and, for cprofile, a pstats
+summary. They are served by the token-protected /debug/profiles routes.
+"""
+
+import asyncio
+import cProfile
+import hmac
+import io
+import itertools
+import os
+import pstats
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs
+
+PROFILE_ADMIN_TOKEN = os.getenv("PROFILE_ADMIN_TOKEN", "")
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", 2000))  # 0 disables automatic profiles
+PROFILE_MAX_STORED = int(os.getenv("PROFILE_MAX_STORED", 50))
+PROFILE_MAX_SAMPLERS = int(os.getenv("PROFILE_MAX_SAMPLERS", 4))
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", 0.005))
+MAX_STACK_DEPTH = 96
+MODES = ("sample", "cprofile")
+# Before 3.12 a cProfile.Profile only sees the thread that enabled it
+PER_THREAD_PROFILES = sys.version_info < (3, 12)
+
+# Innermost frames of threads that are just waiting for work
+IDLE_FRAMES = {
+    ("selectors.py", "select"), ("threading.py", "wait"), ("queue.py", "get"),
+    ("connection.py", "wait"), ("socket.py", "accept"),
+}
+
+
+def check_admin_token(token: Optional[str]) -> bool:
+    return bool(PROFILE_ADMIN_TOKEN) and hmac.compare_digest(token or "", PROFILE_ADMIN_TOKEN)
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler(threading.Thread):
+    """Counts the Python stacks of all other threads every `interval` seconds"""
+
+    _active = 0
+    _active_lock = threading.Lock()
+
+    def __init__(self, interval: float = PROFILE_SAMPLE_INTERVAL):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.interval = interval
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    @classmethod
+    def try_start(cls) -> Optional["StackSampler"]:
+        """A running sampler, or None when PROFILE_MAX_SAMPLERS are already running"""
+        with cls._active_lock:
+            if cls._active >= PROFILE_MAX_SAMPLERS:
+                return None
+            cls._active += 1
+        sampler = cls()
+        sampler.start()
+        return sampler
+
+    def stop(self) -> Counter:
+        self._stop_event.set()
+        self.join()
+        with StackSampler._active_lock:
+            StackSampler._active -= 1
+        return self.counts
+
+    def run(self) -> None:
+        names = {}
+        while not self._stop_event.wait(self.interval):
+            self.samples += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == self.ident:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                    continue
+                if thread_id not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                if names.get(thread_id, "").startswith("profile-sampler"):
+                    continue
+
+                stack = []
+                while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.counts[";".join(reversed(stack))] += 1
+
+
+class CProfileCapture:
+    """cProfile of the event-loop thread plus span() stages in worker threads"""
+
+    _busy = threading.Lock()
+
+    def __init__(self):
+        self.profiles: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def try_start(cls) -> Optional["CProfileCapture"]:
+        if not cls._busy.acquire(blocking=False):
+            return None
+        capture = cls()
+        capture.loop_profile = capture.enter_thread()
+        if capture.loop_profile is None:
+            cls._busy.release()
+            return None
+        return capture
+
+    def enter_thread(self) -> Optional[cProfile.Profile]:
+        # One profiler per thread at a time: a nested stage is already covered
+        if getattr(_thread_state, "profiling", False):
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiling tool is already active (3.12+: one per process)
+            return None
+        _thread_state.profiling = True
+        with self._lock:
+            self.profiles.append(profile)
+        return profile
+
+    def exit_thread(self, profile: Optional[cProfile.Profile]) -> None:
+        if profile is not None:
+            profile.disable()
+            _thread_state.profiling = False
+
+    def stop(self) -> pstats.Stats:
+        self.exit_thread(self.loop_profile)
+        CProfileCapture._busy.release()
+        stats = pstats.Stats(self.profiles[0])
+        for profile in self.profiles[1:]:
+            stats.add(profile)
+        return stats
+
+
+_thread_state = threading.local()
+_capture: ContextVar[Optional[CProfileCapture]] = ContextVar("profile_capture", default=None)
+
+
+def enter_stage():
+    """Called by metrics.span: profile this stage's thread if the request is under cprofile"""
+    capture = _capture.get()
+    if capture is None or not PER_THREAD_PROFILES:
+        return None
+    return capture, capture.enter_thread()
+
+
+def exit_stage(token) -> None:
+    if token is not None:
+        capture, profile = token
+        capture.exit_thread(profile)
+
+
+def pstats_collapsed(stats: pstats.Stats, min_us: float = 50) -> Dict[str, int]:
+    """Approximate collapsed stacks (in microseconds) from a cProfile call graph.
+
+    A callee's time is split between its callers in proportion to the
+    time recorded on each call edge, walking down from the root functions.
+    Recursion is cut at the first repeat, and paths under min_us are dropped.
+    """
+    entries = stats.stats
+    children: Dict[tuple, List] = {}
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller, edge in callers.items():
+            children.setdefault(caller, []).append((func, edge[3]))
+
+    def label(func) -> str:
+        filename, line, name = func
+        return f"{name} ({os.path.basename(filename)}:{line})" if line else name
+
+    collapsed: Counter = Counter()
+    path: List[str] = []
+    on_path = set()
+
+    def walk(func, share: float) -> None:
+        _, _, self_time, total_time, _ = entries[func]
+        path.append(label(func))
+        on_path.add(func)
+        if self_time * share * 1e6 >= 1:
+            collapsed[";".join(path)] += int(self_time * share * 1e6)
+        if len(path) < MAX_STACK_DEPTH:
+            for child, edge_time in children.get(func, ()):
+                child_total = entries[child][3]
+                child_share = edge_time * share / child_total if child_total else 0
+                if child not in on_path and child_total * child_share * 1e6 >= min_us:
+                    walk(child, child_share)
+        on_path.discard(func)
+        path.pop()
+
+    for func, entry in entries.items():
+        if not entry[4]:
+            walk(func, 1.0)
+    return dict(collapsed)
+
+
+def active_versions() -> Dict:
+    """Model artifact and data versions, recorded with every profile"""
+    from database import DATABASE_PATH
+    from database_covid import DATABASE_PATH as DATABASE_PATH_COVID
+    from latest_snapshot import read_latest
+    from model_artifacts import COVID_ARTIFACT_PATH, DENGUE_ARTIFACT_PATH, ArtifactError, read_manifest
+
+    versions = {"models": {}, "data": {}}
+    for name, path in (("covid", COVID_ARTIFACT_PATH), ("dengue", DENGUE_ARTIFACT_PATH)):
+        try:
+            versions["models"][name] = read_manifest(path).get("created_at")
+        except (ArtifactError, ValueError):
+            versions["models"][name] = None
+
+    try:
+        conn = sqlite3.connect(DATABASE_PATH)
+        try:
+            versions["data"]["change_counters"] = dict(
+                conn.execute("SELECT table_name, version FROM change_counters").fetchall())
+        finally:
+            conn.close()
+        conn = sqlite3.connect(DATABASE_PATH_COVID)
+        try:
+            versions["data"]["bangalore_as_of"] = (read_latest(conn, "bangalore") or {}).get("date")
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        pass
+    return versions
+
+
+class ProfileStore:
+    def __init__(self, max_stored: int = PROFILE_MAX_STORED):
+        self.profiles = deque(maxlen=max_stored)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+    def add(self, profile: Dict) -> None:
+        with self._lock:
+            self.profiles.append(profile)
+
+    def list(self) -> List[Dict]:
+        with self._lock:
+            return [{k: v for k, v in p.items() if k not in ("collapsed", "pstats")} for p in self.profiles]
+
+    def get(self, profile_id: int) -> Optional[Dict]:
+        with self._lock:
+            return next((p for p in self.profiles if p["id"] == profile_id), None)
+
+
+profile_store = ProfileStore()
+
+
+def requested_mode(scope) -> Optional[str]:
+    headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope.get("headers", [])}
+    mode = headers.get("x-profile")
+    if mode is None and b"profile=" in scope.get("query_string", b""):
+        mode = parse_qs(scope["query_string"].decode("latin-1")).get("profile", [None])[0]
+    if mode not in MODES or not check_admin_token(headers.get("x-admin-token")):
+        return None
+    return mode
+
+
+class ProfilingMiddleware:
+    """ASGI middleware capturing on-demand and slow-request profiles"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        mode = requested_mode(scope)
+        if mode is None and PROFILE_SLOW_MS <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        state = {"sampler": None, "capture": None, "trigger": "request", "from_ms": 0.0, "status": 500}
+        profile_id = profile_store.next_id() if mode else None
+        timer = context_token = None
+
+        if mode == "cprofile":
+            state["capture"] = CProfileCapture.try_start()
+            if state["capture"] is not None:
+                context_token = _capture.set(state["capture"])
+        if mode is not None and state["capture"] is None:
+            state["sampler"] = StackSampler.try_start()
+        if mode is None:
+            def start_slow_sampler():
+                state["sampler"] = StackSampler.try_start()
+                state["trigger"], state["from_ms"] = "slow", (time.perf_counter() - start) * 1000
+            timer = asyncio.get_running_loop().call_later(PROFILE_SLOW_MS / 1000, start_slow_sampler)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+                if profile_id is not None:
+                    message = {**message, "headers": list(message.get("headers", [])) +
+                               [(b"x-profile-id", str(profile_id).encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            if timer is not None:
+                timer.cancel()
+            if context_token is not None:
+                _capture.reset(context_token)
+            if state["sampler"] is not None or state["capture"] is not None:
+                await self._store(scope, state, profile_id or profile_store.next_id(), duration_ms)
+
+    async def _store(self, scope, state: Dict, profile_id: int, duration_ms: float) -> None:
+        profile = {
+            "id": profile_id,
+            "created_at": time.time(),
+            "method": scope["method"],
+            "path": scope["path"],
+            "status": state["status"],
+            "duration_ms": round(duration_ms, 1),
+            "trigger": state["trigger"],
+            "profiled_from_ms": round(state["from_ms"], 1),
+        }
+        if state["capture"] is not None:
+            stats = state["capture"].stop()
+            text = io.StringIO()
+            stats.stream = text
+            stats.sort_stats("cumulative").print_stats(40)
+            profile.update(mode="cprofile", unit="microseconds", collapsed=pstats_collapsed(stats),
+                           pstats=text.getvalue())
+        else:
+            sampler = state["sampler"]
+            counts = await asyncio.get_running_loop().run_in_executor(None, sampler.stop)
+            profile.update(mode="sample", unit="samples", interval_s=sampler.interval,
+                           samples=sampler.samples, collapsed=dict(counts))
+        profile["versions"] = await asyncio.get_running_loop().run_in_executor(None, active_versions)
+        profile_store.add(profile)
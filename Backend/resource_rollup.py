@@ -0,0 +1,357 @@
+"""Weekly and monthly utilization rollups, plus raw retention, for hospital_resource_timeseries.
+
+resource_rollup holds one row per (tier, period, resource) with the min,
+max, sum and count of that resource's utilization (used / total) over the
+period. week periods end on Sunday, like weekly_rollup.py; month periods
+are named by their first day. Triggers on the raw table fold each new row
+into its periods and recompute only the periods of replaced, updated or
+deleted rows, so the rollups stay current on every ingest path.
+
+compact() drops raw rows older than RESOURCE_RAW_RETENTION_DAYS. Before
+deleting them, it folds their aggregates into the compacted_* columns of
+their periods. A recompute merges those with whatever raw rows remain, so
+periods keep their exact values after the raw data is gone.
+read_utilization() answers a range query from the coarsest tier at or
+below the requested resolution that still has data for the range.
+
+Check the rollups against a full re-aggregation of the retained raw rows:
+    python resource_rollup.py
+Compact now:
+    python resource_rollup.py --compact
+"""
+
+import os
+import sqlite3
+import sys
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+RESOURCE_RAW_RETENTION_DAYS = int(os.getenv("RESOURCE_RAW_RETENTION_DAYS", 180))  # 0 keeps everything
+RESOURCE_COMPACT_INTERVAL = float(os.getenv("RESOURCE_COMPACT_INTERVAL", 6 * 3600))
+
+RAW_TABLE = "hospital_resource_timeseries"
+
+# resource -> (numerator, total, numerator counts what is free rather than used)
+UTILIZATION = {
+    "beds": ("occupied_beds", "total_beds", False),
+    "icu_beds": ("occupied_icu_beds", "icu_beds", False),
+    "ventilators": ("used_ventilators", "total_ventilators", False),
+    "oxygen_cylinders": ("used_oxygen_cylinders", "total_oxygen_cylinders", False),
+    "doctors": ("available_doctors", "total_doctors", True),
+    "nurses": ("available_nurses", "total_nurses", True),
+    "icu_nurses": ("available_icu_nurses", "total_icu_nurses", True),
+}
+
+
+def utilization_sql(resource: str, row: str = "") -> str:
+    """Utilization of one raw row (columns prefixed with row, e.g. "NEW."), NULL when the total is 0"""
+    numerator, total, free = UTILIZATION[resource]
+    share = f"1.0 * {row}{numerator} / NULLIF({row}{total}, 0)"
+    return f"1.0 - {share}" if free else share
+
+
+# tier -> (period containing a date, first date of a period, first date after it)
+TIERS = {
+    "week": ("date({d}, 'weekday 0')", "date({p}, '-6 days')", "date({p}, '+1 day')"),
+    "month": ("date({d}, 'start of month')", "{p}", "date({p}, '+1 month')"),
+}
+
+# Days each tier's points stand for, coarsest first; raw rows are daily (or finer)
+TIER_DAYS = [("month", 28), ("week", 7), ("raw", 0)]
+
+# A period's value is its compacted part merged with the aggregate of its raw rows
+_MERGE = """
+    min_util = CASE WHEN compacted_samples = 0 THEN excluded.min_util
+                    WHEN excluded.samples = 0 THEN compacted_min
+                    ELSE min(compacted_min, excluded.min_util) END,
+    max_util = CASE WHEN compacted_samples = 0 THEN excluded.max_util
+                    WHEN excluded.samples = 0 THEN compacted_max
+                    ELSE max(compacted_max, excluded.max_util) END,
+    sum_util = compacted_sum + COALESCE(excluded.sum_util, 0),
+    samples = compacted_samples + excluded.samples
+"""
+
+
+def _in_period(tier: str, period: str) -> str:
+    _, first, after = TIERS[tier]
+    return f"date >= {first.format(p=period)} AND date < {after.format(p=period)}"
+
+
+def _recompute_sql(date_expr: str, when: str = "true") -> str:
+    """Recompute every tier and resource for the periods containing date_expr"""
+    statements = []
+    for tier, (period_of, _, _) in TIERS.items():
+        period = period_of.format(d=date_expr)
+        for resource in UTILIZATION:
+            statements.append(f"""
+        INSERT INTO resource_rollup (tier, period, resource, min_util, max_util, sum_util, samples)
+        SELECT '{tier}', {period}, '{resource}', mn, mx, total, n FROM (
+            SELECT MIN(u) AS mn, MAX(u) AS mx, COALESCE(SUM(u), 0) AS total, COUNT(u) AS n
+            FROM (SELECT {utilization_sql(resource)} AS u FROM {RAW_TABLE} WHERE {_in_period(tier, period)})
+        ) WHERE {when}
+        ON CONFLICT (tier, period, resource) DO UPDATE SET {_MERGE};""")
+        statements.append(f"""
+        DELETE FROM resource_rollup WHERE tier = '{tier}' AND period = {period} AND samples = 0;""")
+    return "".join(statements)
+
+
+def _add_row_sql(when: str = "true") -> str:
+    """Fold NEW into the periods it falls in, without rescanning them"""
+    statements = []
+    for tier, (period_of, _, _) in TIERS.items():
+        period = period_of.format(d="NEW.date")
+        for resource in UTILIZATION:
+            statements.append(f"""
+        INSERT INTO resource_rollup (tier, period, resource, min_util, max_util, sum_util, samples)
+        SELECT '{tier}', {period}, '{resource}', u, u, u, 1
+        FROM (SELECT {utilization_sql(resource, "NEW.")} AS u) WHERE u IS NOT NULL AND {when}
+        ON CONFLICT (tier, period, resource) DO UPDATE SET
+            min_util = min(min_util, excluded.min_util), max_util = max(max_util, excluded.max_util),
+            sum_util = sum_util + excluded.sum_util, samples = samples + 1;""")
+    return "".join(statements)
+
+
+def install_resource_rollup(conn: sqlite3.Connection) -> None:
+    """Create the rollup tables and triggers, then backfill from the retained raw rows"""
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS resource_rollup (
+        tier TEXT,
+        period TEXT,
+        resource TEXT,
+        min_util REAL,
+        max_util REAL,
+        sum_util REAL NOT NULL DEFAULT 0,
+        samples INTEGER NOT NULL DEFAULT 0,
+        compacted_min REAL,
+        compacted_max REAL,
+        compacted_sum REAL NOT NULL DEFAULT 0,
+        compacted_samples INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (tier, period, resource)
+    )
+    """)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS resource_compaction (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        raw_since TEXT,
+        compacting INTEGER NOT NULL DEFAULT 0
+    )
+    """)
+    conn.execute("INSERT OR IGNORE INTO resource_compaction (id) VALUES (1)")
+
+    # New rows are folded in directly. A row replacing one with the same date
+    # (INSERT OR REPLACE deletes the old row without firing delete triggers)
+    # is noted before the insert, and its periods are recomputed instead.
+    conn.execute("CREATE TABLE IF NOT EXISTS resource_rollup_replaced (date TEXT PRIMARY KEY)")
+    replaced = "EXISTS (SELECT 1 FROM resource_rollup_replaced WHERE date = NEW.date)"
+
+    # Deletes made by compact() must not touch the rollups: their rows were folded in first
+    conn.executescript(f"""
+    BEGIN;  -- committed with the backfill below
+    DROP TRIGGER IF EXISTS resource_rollup_before_insert;
+    DROP TRIGGER IF EXISTS resource_rollup_insert;
+    DROP TRIGGER IF EXISTS resource_rollup_replace;
+    DROP TRIGGER IF EXISTS resource_rollup_update;
+    DROP TRIGGER IF EXISTS resource_rollup_delete;
+
+    CREATE TRIGGER resource_rollup_before_insert BEFORE INSERT ON {RAW_TABLE}
+    WHEN EXISTS (SELECT 1 FROM {RAW_TABLE} WHERE date = NEW.date)
+    BEGIN
+        INSERT OR IGNORE INTO resource_rollup_replaced (date) VALUES (NEW.date);
+    END;
+
+    CREATE TRIGGER resource_rollup_insert AFTER INSERT ON {RAW_TABLE}
+    BEGIN
+        {_add_row_sql(when=replaced.replace("EXISTS", "NOT EXISTS"))}
+        {_recompute_sql("NEW.date", when=replaced)}
+        DELETE FROM resource_rollup_replaced WHERE date = NEW.date;
+    END;
+
+    CREATE TRIGGER resource_rollup_update AFTER UPDATE ON {RAW_TABLE}
+    BEGIN
+        DELETE FROM resource_rollup_replaced WHERE date = NEW.date;
+        {_recompute_sql("OLD.date")}
+        {_recompute_sql("NEW.date")}
+    END;
+
+    CREATE TRIGGER resource_rollup_delete AFTER DELETE ON {RAW_TABLE}
+    WHEN COALESCE((SELECT compacting FROM resource_compaction WHERE id = 1), 0) = 0
+    BEGIN
+        {_recompute_sql("OLD.date")}
+    END;
+    """)
+
+    # Backfill (or repair) every period that still has raw rows
+    for tier, (period_of, _, _) in TIERS.items():
+        for resource in UTILIZATION:
+            utilization = utilization_sql(resource)
+            conn.execute(f"""
+                INSERT INTO resource_rollup (tier, period, resource, min_util, max_util, sum_util, samples)
+                SELECT '{tier}', period, '{resource}', MIN(u), MAX(u), SUM(u), COUNT(u)
+                FROM (SELECT {period_of.format(d="date")} AS period, {utilization} AS u FROM {RAW_TABLE})
+                WHERE true GROUP BY period
+                ON CONFLICT (tier, period, resource) DO UPDATE SET {_MERGE}
+            """)
+    conn.execute("DELETE FROM resource_rollup WHERE samples = 0")
+    conn.commit()
+
+
+def raw_since(conn: sqlite3.Connection) -> Optional[str]:
+    """Raw rows before this date have been compacted away (None: nothing compacted yet)"""
+    row = conn.execute("SELECT raw_since FROM resource_compaction WHERE id = 1").fetchone()
+    return row[0] if row else None
+
+
+def compact(conn: sqlite3.Connection, retention_days: int = RESOURCE_RAW_RETENTION_DAYS,
+            today: Optional[date] = None) -> int:
+    """Fold raw rows older than the retention window into the rollups and delete them"""
+    if retention_days <= 0:
+        return 0
+    cutoff = ((today or date.today()) - timedelta(days=retention_days)).isoformat()
+
+    # IMMEDIATE: one worker compacts at a time, and no ingest lands between fold and delete
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for tier, (period_of, _, _) in TIERS.items():
+            for resource in UTILIZATION:
+                utilization = utilization_sql(resource)
+                conn.execute(f"""
+                    INSERT INTO resource_rollup (tier, period, resource, min_util, max_util, sum_util, samples,
+                                                 compacted_min, compacted_max, compacted_sum, compacted_samples)
+                    SELECT '{tier}', period, '{resource}', mn, mx, s, n, mn, mx, s, n FROM (
+                        SELECT period, MIN(u) AS mn, MAX(u) AS mx, SUM(u) AS s, COUNT(u) AS n
+                        FROM (SELECT {period_of.format(d="date")} AS period, {utilization} AS u
+                              FROM {RAW_TABLE} WHERE date < ?)
+                        GROUP BY period
+                    ) WHERE n > 0
+                    ON CONFLICT (tier, period, resource) DO UPDATE SET
+                        compacted_min = CASE WHEN compacted_samples = 0 THEN excluded.compacted_min
+                                             ELSE min(compacted_min, excluded.compacted_min) END,
+                        compacted_max = CASE WHEN compacted_samples = 0 THEN excluded.compacted_max
+                                             ELSE max(compacted_max, excluded.compacted_max) END,
+                        compacted_sum = compacted_sum + excluded.compacted_sum,
+                        compacted_samples = compacted_samples + excluded.compacted_samples
+                """, (cutoff,))
+
+        conn.execute("UPDATE resource_compaction SET compacting = 1 WHERE id = 1")
+        deleted = conn.execute(f"DELETE FROM {RAW_TABLE} WHERE date < ?", (cutoff,)).rowcount
+        conn.execute("UPDATE resource_compaction SET compacting = 0 WHERE id = 1")
+        if deleted:
+            # Only a delete moves the start of the raw rows; otherwise raw queries stay raw
+            conn.execute(
+                "UPDATE resource_compaction SET raw_since = max(COALESCE(raw_since, ?), ?) WHERE id = 1",
+                (cutoff, cutoff))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return deleted
+
+
+def choose_tier(conn: sqlite3.Connection, start: Optional[str], resolution_days: float) -> str:
+    """Coarsest tier whose points are no wider than resolution_days and that covers start"""
+    since = raw_since(conn)
+    for tier, days in TIER_DAYS:
+        if days > resolution_days:
+            continue
+        if tier == "raw" and since is not None and (start is None or start < since):
+            # The raw rows for this range are gone; weeks are the finest that remain
+            return "week"
+        return tier
+    return "raw"
+
+
+def read_utilization(conn: sqlite3.Connection, start: Optional[str] = None, end: Optional[str] = None,
+                     resolution_days: float = 0, resources: Optional[List[str]] = None) -> Dict:
+    """Per-resource period, min, max and mean utilization between start and end (inclusive dates)"""
+    resources = resources or list(UTILIZATION)
+    tier = choose_tier(conn, start, resolution_days)
+
+    # An omitted bound is left out of the query: sentinel dates like
+    # 9999-12-31 have no following Sunday, so their period would be NULL
+    series = {}
+    if tier == "raw":
+        columns = ", ".join(f"{utilization_sql(resource)} AS {resource}" for resource in resources)
+        bounds = [("date >= ?", start), ("date < date(?, '+1 day')", end)]
+        where = " AND ".join(["true"] + [sql for sql, value in bounds if value is not None])
+        rows = conn.execute(f"""
+            SELECT date, {columns} FROM {RAW_TABLE} WHERE {where} ORDER BY date
+        """, [value for _, value in bounds if value is not None]).fetchall()
+        for k, resource in enumerate(resources, start=1):
+            values = [(row[0], row[k]) for row in rows if row[k] is not None]
+            utilization = [value for _, value in values]
+            series[resource] = {"period": [period for period, _ in values], "min": utilization,
+                                "max": utilization, "mean": utilization, "samples": [1] * len(values)}
+    else:
+        # A period is included if it overlaps [start, end]
+        period_of = TIERS[tier][0]
+        bounds = [(f"period >= {period_of.format(d='?')}", start), (f"period <= {period_of.format(d='?')}", end)]
+        where = " AND ".join(["tier = ?"] + [sql for sql, value in bounds if value is not None])
+        rows = conn.execute(f"""
+            SELECT resource, period, min_util, max_util, sum_util / samples, samples FROM resource_rollup
+            WHERE {where} ORDER BY resource, period
+        """, [tier] + [value for _, value in bounds if value is not None]).fetchall()
+        for resource in resources:
+            series[resource] = {"period": [], "min": [], "max": [], "mean": [], "samples": []}
+        for resource, period, low, high, mean, samples in rows:
+            if resource in series:
+                entry = series[resource]
+                entry["period"].append(period)
+                entry["min"].append(low)
+                entry["max"].append(high)
+                entry["mean"].append(mean)
+                entry["samples"].append(samples)
+
+    return {"tier": tier, "raw_since": raw_since(conn), "series": series}
+
+
+def check_consistency(conn: sqlite3.Connection) -> List[str]:
+    """Periods where the rollup disagrees with the retained raw rows; empty if consistent
+
+    Periods with compacted rows can only be checked for not having lost samples.
+    """
+    problems = []
+    for tier, (period_of, _, _) in TIERS.items():
+        for resource in UTILIZATION:
+            utilization = utilization_sql(resource)
+            expected = {
+                period: (low, high, total, count)
+                for period, low, high, total, count in conn.execute(f"""
+                    SELECT period, MIN(u), MAX(u), SUM(u), COUNT(u)
+                    FROM (SELECT {period_of.format(d="date")} AS period, {utilization} AS u FROM {RAW_TABLE})
+                    GROUP BY period HAVING COUNT(u) > 0
+                """)
+            }
+            actual = {
+                period: row for period, *row in conn.execute("""
+                    SELECT period, min_util, max_util, sum_util, samples, compacted_samples
+                    FROM resource_rollup WHERE tier = ? AND resource = ?
+                """, (tier, resource))
+            }
+            for period in sorted(set(expected) | set(actual)):
+                want = expected.get(period, (None, None, 0.0, 0))
+                got = actual.get(period)
+                if got is None:
+                    problems.append(f"{tier} {period} {resource}: missing, expected {want[3]} samples")
+                    continue
+                low, high, total, count, compacted = got
+                if count != want[3] + compacted:
+                    problems.append(f"{tier} {period} {resource}: {count} samples, expected {want[3] + compacted}")
+                elif not compacted and (abs(total - want[2]) > 1e-9 * max(1.0, abs(want[2]))
+                                        or low != want[0] or high != want[1]):
+                    problems.append(f"{tier} {period} {resource}: rollup=({low}, {high}, {total}) "
+                                    f"expected=({want[0]}, {want[1]}, {want[2]})")
+    return problems
+
+
+if __name__ == "__main__":
+    conn = sqlite3.connect("db/dengue.db")
+    try:
+        if "--compact" in sys.argv:
+            print(f"compacted {compact(conn)} raw rows older than {RESOURCE_RAW_RETENTION_DAYS} days")
+        problems = check_consistency(conn)
+    finally:
+        conn.close()
+    for problem in problems:
+        print(problem)
+    print("OK" if not problems else f"{len(problems)} inconsistent periods")
+    sys.exit(1 if problems else 0)
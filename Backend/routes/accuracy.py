@@ -0,0 +1,76 @@
+from datetime import date
+from typing import Optional
+import asyncio
+import sqlite3
+
+from fastapi import APIRouter, HTTPException, Query
+from starlette.concurrency import run_in_threadpool
+
+from forecast_accuracy import ACCURACY_SPECS, FORECAST_COMPACT_INTERVAL, compact_forecasts, read_accuracy
+
+router = APIRouter(
+    tags=["forecast-accuracy"],
+    responses={404: {"description": "Not found"}}
+)
+
+
+def _read(series: str, window_days: int, end: Optional[str]):
+    conn = sqlite3.connect(ACCURACY_SPECS[series]["db"])
+    try:
+        return read_accuracy(conn, series, window_days, end)
+    finally:
+        conn.close()
+
+
+@router.get("/forecast-accuracy")
+async def get_forecast_accuracy(
+    series: str = "dengue",
+    window_days: int = Query(91, gt=0),
+    end: Optional[date] = None,
+):
+    """MAE, RMSE, bias, MAPE and interval coverage of stored forecasts, by horizon and model version
+
+    Sums over the precomputed weekly ledger for the weeks in the window
+    ending at `end` (default: the last week with a scored forecast).
+    """
+    if series not in ACCURACY_SPECS:
+        raise HTTPException(status_code=404, detail=f"Unknown series. Choose from: {', '.join(ACCURACY_SPECS)}")
+    return await run_in_threadpool(_read, series, window_days, end and end.isoformat())
+
+
+def compact_all() -> int:
+    deleted = 0
+    for series, spec in ACCURACY_SPECS.items():
+        conn = sqlite3.connect(spec["db"])
+        try:
+            deleted += compact_forecasts(conn, series)
+        finally:
+            conn.close()
+    return deleted
+
+
+_compaction_task = None
+
+
+async def _compact_periodically() -> None:
+    while True:
+        try:
+            await run_in_threadpool(compact_all)
+        except sqlite3.OperationalError:
+            # Locked by a long write; try again next time
+            pass
+        await asyncio.sleep(FORECAST_COMPACT_INTERVAL)
+
+
+@router.on_event("startup")
+async def start_compaction():
+    global _compaction_task
+    _compaction_task = asyncio.create_task(_compact_periodically())
+
+
+@router.on_event("shutdown")
+async def stop_compaction():
+    global _compaction_task
+    if _compaction_task is not None:
+        _compaction_task.cancel()
+        _compaction_task = None
@@ -2,10 +2,14 @@
 
 from fastapi import APIRouter, HTTPException, status, Depends
 from pydantic import BaseModel, EmailStr, validator
+from typing import Optional
 import sqlite3
 import bcrypt
 import re
 
+from geocoding import geocode
+from spatial_index import update_location
+
 DATABASE_PATH = "db/covid_data.db"
 router = APIRouter(tags=["auth"])
 
@@ -17,6 +21,8 @@ class SignupRequest(BaseModel):
     password: str
     location: str
     email: EmailStr
+    latitude: Optional[float] = None   # geocoded from location when omitted
+    longitude: Optional[float] = None
 
     @validator('password')
     def validate_password(cls, v):
@@ -49,21 +55,29 @@ def get_db():
 @router.post("/signup")
 def signup(request: SignupRequest):
     hashed_pw = bcrypt.hashpw(request.password.encode('utf-8'), bcrypt.gensalt())
+    if request.latitude is not None and request.longitude is not None:
+        coords = (request.latitude, request.longitude)
+    else:
+        coords = geocode(request.location)
 
     conn = get_db()
     try:
         cursor = conn.cursor()
         cursor.execute("""
-            INSERT INTO user (hospital_name, hospital_code, password, location, email)
-            VALUES (?, ?, ?, ?, ?)
+            INSERT INTO user (hospital_name, hospital_code, password, location, email, latitude, longitude)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
         """, (
             request.hospital_name,
             request.hospital_code,
             hashed_pw.decode('utf-8'),
             request.location,
-            request.email
+            request.email,
+            coords[0] if coords else None,
+            coords[1] if coords else None
         ))
         conn.commit()
+        if coords:
+            update_location(cursor.lastrowid, request.hospital_name, *coords)
         return {"message": " Signup successful"}
     except sqlite3.IntegrityError as e:
         raise HTTPException(status_code=400, detail="Hospital code or email already exists")
@@ -0,0 +1,187 @@
+"""Aggregated dashboard snapshot: every panel of a dashboard in one request.
+
+Sections are computed concurrently. Reads shared between sections (latest
+hospital resources, the COVID forecaster) go through a per-request memo so
+they run once. Each section has its own TTL cache and timeout; a section
+that times out or fails is reported as such and the rest are still returned.
+"""
+
+import asyncio
+import os
+import sqlite3
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from fastapi import APIRouter, HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from chart_cache import get_charts_base64
+from database import DATABASE_PATH
+from routes import dengue, district, national
+from routes.overload import get_overload, published_risk
+from routes.resources import get_latest_resources_from_db
+
+router = APIRouter(
+    prefix="/dashboard",
+    tags=["dashboard"],
+    responses={404: {"description": "Not found"}}
+)
+
+SECTION_TIMEOUT = float(os.getenv("DASHBOARD_SECTION_TIMEOUT", 5))
+
+# Seconds a computed section may be reused for (0 = always recompute)
+SECTION_MAX_AGE = {
+    "national_summary": 300,
+    "district_summary": 60,
+    "current_cases": 60,
+    "predictions": 300,
+    "forecast_plot": 300,
+    "resources_latest": 15,
+    "overload_risk": 0,
+}
+
+_section_cache: Dict[tuple, tuple] = {}
+
+
+class RequestMemo:
+    """Runs each keyed blocking call at most once per request"""
+
+    def __init__(self):
+        self._results: Dict[str, asyncio.Future] = {}
+
+    async def get(self, key: str, fn: Callable, *args):
+        if key not in self._results:
+            self._results[key] = asyncio.ensure_future(run_in_threadpool(fn, *args))
+        # Shielded so one section timing out does not cancel a shared read
+        return await asyncio.shield(self._results[key])
+
+
+def with_db(fn: Callable, *args):
+    conn = sqlite3.connect(DATABASE_PATH, check_same_thread=False)
+    try:
+        return fn(conn, *args)
+    finally:
+        conn.close()
+
+
+# Shared sections
+
+async def resources_latest(memo: RequestMemo):
+    return await memo.get("latest_resources", with_db, get_latest_resources_from_db)
+
+
+async def overload_risk(memo: RequestMemo):
+    # Kept current by the overload alert watcher
+    result = published_risk()
+    if result is not None:
+        return result
+    available = await resources_latest(memo)
+    return await run_in_threadpool(with_db, lambda conn: get_overload(available, conn))
+
+
+# COVID sections
+
+async def national_summary(memo: RequestMemo):
+    return await run_in_threadpool(national.get_national_summary)
+
+
+async def district_summary(memo: RequestMemo):
+    return await run_in_threadpool(district.get_bangalore_summary)
+
+
+async def covid_predictions(memo: RequestMemo):
+    forecaster = await memo.get("covid_forecaster", district.load_cached_forecaster)
+    if forecaster is None:
+        # No model yet: train one through the regular route
+        return (await run_in_threadpool(district.predict))["predictions"]
+    return forecaster.get_forecast()["forecasts"]
+
+
+async def covid_forecast_plot(memo: RequestMemo):
+    forecaster = await memo.get("covid_forecaster", district.load_cached_forecaster)
+    data = forecaster.covid_forecast_plot_data() if forecaster is not None else {}
+    if not data:
+        raise HTTPException(status_code=404, detail="Forecast not available yet.")
+    return (await get_charts_base64({"image": ("covid_forecast", data)}))["image"]
+
+
+# Dengue sections
+
+async def dengue_current_cases(memo: RequestMemo):
+    return await run_in_threadpool(with_db, dengue.read_current_cases)
+
+
+async def dengue_predictions(memo: RequestMemo):
+    return await run_in_threadpool(with_db, dengue.forecast_and_store)
+
+
+async def dengue_forecast_plot(memo: RequestMemo):
+    if dengue.forecaster is None:
+        raise HTTPException(status_code=503, detail="Model not initialized")
+    return (await get_charts_base64({"image": ("dengue_forecast", dengue.forecaster.forecast_plot_data())}))["image"]
+
+
+DASHBOARDS = {
+    "covid": {
+        "national_summary": national_summary,
+        "district_summary": district_summary,
+        "predictions": covid_predictions,
+        "forecast_plot": covid_forecast_plot,
+        "overload_risk": overload_risk,
+        "resources_latest": resources_latest,
+    },
+    "dengue": {
+        "current_cases": dengue_current_cases,
+        "predictions": dengue_predictions,
+        "forecast_plot": dengue_forecast_plot,
+        "resources_latest": resources_latest,
+        "overload_risk": overload_risk,
+    },
+}
+
+
+async def run_section(disease: str, name: str, section: Callable, memo: RequestMemo) -> Dict:
+    max_age = SECTION_MAX_AGE.get(name, 0)
+    cached = _section_cache.get((disease, name))
+    if cached is not None and time.time() - cached[0] < max_age:
+        return {"status": "ok", "data": cached[1], "max_age": max_age, "age": round(time.time() - cached[0], 1)}
+
+    try:
+        data = await asyncio.wait_for(section(memo), timeout=SECTION_TIMEOUT)
+    except asyncio.TimeoutError:
+        return {"status": "timeout"}
+    except HTTPException as e:
+        return {"status": "error", "detail": e.detail}
+    except Exception as e:
+        return {"status": "error", "detail": str(e)}
+
+    # Some handlers report failures in the payload rather than raising;
+    # those must not be cached and served as ok.
+    if isinstance(data, dict) and "error" in data:
+        return {"status": "error", "detail": data["error"]}
+
+    if max_age:
+        _section_cache[(disease, name)] = (time.time(), data)
+    return {"status": "ok", "data": data, "max_age": max_age, "age": 0}
+
+
+@router.get("/{disease}")
+async def get_dashboard(disease: str, sections: Optional[str] = None):
+    if disease not in DASHBOARDS:
+        raise HTTPException(status_code=404, detail=f"Unknown dashboard: {disease}")
+
+    available = DASHBOARDS[disease]
+    names = sections.split(",") if sections else list(available)
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown sections: {', '.join(unknown)}")
+
+    memo = RequestMemo()
+    results = await asyncio.gather(*(run_section(disease, name, available[name], memo) for name in names))
+
+    return {
+        "disease": disease,
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "sections": dict(zip(names, results)),
+    }
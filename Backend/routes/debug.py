@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+from typing import Optional
+
+from profiling import PROFILE_ADMIN_TOKEN, check_admin_token, profile_store
+
+router = APIRouter(
+    prefix="/debug",
+    tags=["debug"],
+    responses={404: {"description": "Not found"}}
+)
+
+
+def require_admin(token: Optional[str]) -> None:
+    if not PROFILE_ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Profiling is disabled; set PROFILE_ADMIN_TOKEN")
+    if not check_admin_token(token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@router.get("/profiles")
+def list_profiles(x_admin_token: Optional[str] = Header(None)):
+    """Captured profiles, newest last, without their stacks"""
+    require_admin(x_admin_token)
+    return profile_store.list()
+
+
+@router.get("/profiles/{profile_id}")
+def get_profile(profile_id: int, format: str = "json", x_admin_token: Optional[str] = Header(None)):
+    """One profile as JSON, collapsed stacks (flamegraph.pl / speedscope) or pstats text"""
+    require_admin(x_admin_token)
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found (it may have been evicted)")
+
+    if format == "json":
+        return profile
+    if format == "collapsed":
+        lines = (f"{stack} {count}" for stack, count in sorted(profile["collapsed"].items()))
+        return PlainTextResponse("\n".join(lines) + "\n")
+    if format == "pstats":
+        if "pstats" not in profile:
+            raise HTTPException(status_code=400, detail="pstats output is only available for cprofile captures")
+        return PlainTextResponse(profile["pstats"])
+    raise HTTPException(status_code=400, detail="format must be json, collapsed or pstats")
@@ -1,14 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
-import pandas as pd
+from starlette.concurrency import run_in_threadpool
+import asyncio
+import logging
+import os
 import sqlite3
-import matplotlib.pyplot as plt
 import io
 from datetime import datetime
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-from database import get_db
-from forecasting import DengueForecastingSystem
+from chart_cache import get_charts_base64, image_response
+from database import DATABASE_PATH, get_db
+from events import notify_change
+from dataset_cache import load_frame
+from model_artifacts import DENGUE_ARTIFACT_PATH, load_dengue_artifact, save_dengue_artifact
+from model_registry import SharedModel
+
+if TYPE_CHECKING:
+    from forecasting import DengueForecastingSystem
 
 router = APIRouter(
     prefix="/dengue",
@@ -16,18 +25,88 @@ router = APIRouter(
     responses={404: {"description": "Not found"}}
 )
 
+logger = logging.getLogger(__name__)
+
 # Initialize forecaster when the router starts
 forecaster = None
 
+def _serve(model) -> None:
+    global forecaster
+    forecaster = model
+
+# Every worker serves the same memory-mapped artifact, reloaded when any worker publishes a new one
+dengue_model = SharedModel("dengue", DENGUE_ARTIFACT_PATH, load_dengue_artifact, on_load=_serve)
+
+# The last ensemble this worker fitted, sklearn trees included, for profiles that warm-start
+_last_fit = None
+
+def fit_forecaster() -> "DengueForecastingSystem":
+    # sklearn is only loaded here, not when the API starts
+    from forecasting import DENGUE_TRAINING_PROFILE, TRAINING_PROFILES, DengueForecastingSystem
+    global _last_fit
+
+    model = DengueForecastingSystem(df=load_frame("dengue_data"))
+    model.run_pipeline(warm_from=_last_fit)
+    if TRAINING_PROFILES[DENGUE_TRAINING_PROFILE]["warm_trees"]:
+        _last_fit = model
+    return model
+
+def retrain_forecaster(force: bool = True) -> bool:
+    """Refit the ensemble on the current dengue_data and publish it to every worker.
+
+    Without force, returns False if another worker is already training.
+    """
+    return dengue_model.train(fit_forecaster, save_dengue_artifact, force=force)
+
+def artifact_is_current() -> bool:
+    """True if the served model already covers the latest dengue_data week"""
+    if forecaster is None:
+        return False
+    conn = sqlite3.connect(DATABASE_PATH)
+    try:
+        latest = conn.execute("SELECT MAX(date) FROM dengue_data").fetchone()[0]
+    finally:
+        conn.close()
+    return latest is None or forecaster.df.index[-1] >= datetime.fromisoformat(str(latest))
+
 @router.on_event("startup")
 async def startup_event():
-    global forecaster
-    conn = sqlite3.connect('db/dengue.db')
-    df = pd.read_sql("SELECT * FROM dengue_data", conn)
-    conn.close()
-    
-    forecaster = DengueForecastingSystem(df=df)
-    forecaster.run_pipeline()
+    # Loading the flattened trees takes milliseconds; retraining takes seconds
+    # and pulls in sklearn, so it runs after startup, in one worker, and only when needed
+    await run_in_threadpool(dengue_model.refresh)
+    await dengue_model.start()
+    if not artifact_is_current():
+        retrain = asyncio.get_running_loop().run_in_executor(None, retrain_forecaster, False)
+        retrain.add_done_callback(_log_retrain_failure)
+
+def _log_retrain_failure(future: asyncio.Future) -> None:
+    # Nothing awaits the startup retrain; dengue_model.stats counts the failure
+    if not future.cancelled() and future.exception() is not None:
+        logger.error("Startup dengue retrain failed", exc_info=future.exception())
+
+@router.on_event("shutdown")
+async def shutdown_event():
+    await dengue_model.stop()
+
+def read_current_cases(db: sqlite3.Connection, weeks: int = 4) -> list:
+    """Latest `weeks` weekly case counts, newest first"""
+    import pandas as pd
+
+    # Safest approach - let pandas handle the connection
+    query = """
+    SELECT date, reported_cases 
+    FROM dengue_data 
+    ORDER BY date DESC 
+    LIMIT ?
+    """
+    data = pd.read_sql(query, db, params=(weeks,))
+
+    # Convert dates to strings for JSON serialization
+    if not data.empty:
+        data['date'] = pd.to_datetime(data['date'])
+        data['date'] = data['date'].dt.strftime('%Y-%m-%d')
+
+    return data.to_dict(orient="records")
 
 @router.get("/current")
 async def get_current_cases(
@@ -36,21 +115,7 @@ async def get_current_cases(
 ):
     """Get latest case counts"""
     try:
-        # Safest approach - let pandas handle the connection
-        query = """
-        SELECT date, reported_cases 
-        FROM dengue_data 
-        ORDER BY date DESC 
-        LIMIT ?
-        """
-        data = pd.read_sql(query, db, params=(weeks,))
-        
-        # Convert dates to strings for JSON serialization
-        if not data.empty:
-            data['date'] = pd.to_datetime(data['date'])
-            data['date'] = data['date'].dt.strftime('%Y-%m-%d')
-            
-        return JSONResponse(data.to_dict(orient="records"))
+        return JSONResponse(read_current_cases(db, weeks))
         
     except Exception as e:
         raise HTTPException(
@@ -58,22 +123,21 @@ async def get_current_cases(
             detail=f"Failed to fetch current cases: {str(e)}"
         )
 
-@router.get("/predict")
-async def predict_cases(
-    weeks: int = 4,
-    db: sqlite3.Connection = Depends(get_db)
-):
+def forecast_and_store(db: sqlite3.Connection, weeks: int = 4) -> list:
+    """Forecast the next `weeks` weeks and store them as today's batch"""
+    import pandas as pd
 
     if forecaster is None:
         raise HTTPException(status_code=503, detail="Model not initialized")
     
     forecast = forecaster.forecast(weeks=weeks)
-    print("Forecast columns:", forecast.columns.tolist())
 
     # Save to database
     forecast = forecast.rename(columns={
             'date': 'prediction_date',
         })
+    # ISO dates, the format dengue_data uses, which the accuracy ledger matches against
+    forecast['prediction_date'] = pd.to_datetime(forecast['prediction_date']).dt.strftime('%Y-%m-%d')
     forecast['forecast_date'] = datetime.now().strftime('%Y-%m-%d')
 
     #  Remove duplicates for today
@@ -81,29 +145,42 @@ async def predict_cases(
     db.execute("DELETE FROM forecasts WHERE forecast_date = ?", (today,))
 
     forecast.to_sql('forecasts', db, if_exists='append', index=False)
-    
-    #  Convert dates to strings for JSON
-    forecast['forecast_date'] = pd.to_datetime(forecast['forecast_date']).dt.strftime('%Y-%m-%d')
-    forecast['prediction_date'] = pd.to_datetime(forecast['prediction_date']).dt.strftime('%Y-%m-%d')
+    notify_change("forecasts")
+
+    return forecast.to_dict(orient="records")
 
-    return JSONResponse(forecast.to_dict(orient="records"))
+@router.get("/predict")
+async def predict_cases(
+    weeks: int = 4,
+    db: sqlite3.Connection = Depends(get_db)
+):
+    return JSONResponse(forecast_and_store(db, weeks))
 
 @router.get("/plot_base64")
 async def get_forecast_plot_base64(weeks: int = 12):
     if forecaster is None:
         raise HTTPException(status_code=503, detail="Model not initialized")
 
-    image_base64 = forecaster.get_forecast_plot(weeks=weeks)
-    return {"image": image_base64}
+    images = await get_charts_base64({"image": ("dengue_forecast", forecaster.forecast_plot_data())})
+    return {"image": images["image"]}
+
+@router.get("/plot.{fmt}")
+async def get_forecast_plot_image(fmt: str, request: Request):
+    if forecaster is None:
+        raise HTTPException(status_code=503, detail="Model not initialized")
+
+    return await image_response(request, "dengue_forecast", forecaster.forecast_plot_data(), fmt=fmt)
 
 
 
 @router.post("/refresh")
-async def refresh_model(db: sqlite3.Connection = Depends(get_db)):
-    # Retrain model with latest data
-    global forecaster
-    df = pd.read_sql("SELECT * FROM dengue_data", db)
-    
-    forecaster = DengueForecastingSystem(df=df)
-    forecaster.run_complete_analysis()
-    return {"status": "model retrained"}
\ No newline at end of file
+async def refresh_model():
+    # Retrain model with latest data; the other workers reload the new artifact
+    await run_in_threadpool(retrain_forecaster)
+    return {"status": "model retrained", "version": dengue_model.version}
+
+@router.get("/model")
+async def get_model_version():
+    """Model version this worker is serving"""
+    return {"version": dengue_model.version, "created_at": dengue_model.created_at, "pid": os.getpid(),
+            "training": getattr(forecaster, "training", None)}
\ No newline at end of file
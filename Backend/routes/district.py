@@ -1,36 +1,44 @@
 # routes/district.py
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Request
+from starlette.concurrency import run_in_threadpool
 import sqlite3
-import pandas as pd
 import os
-import matplotlib
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
-import io
-import base64
-from forecasting_covid import CovidForecastModel
-import joblib
+from chart_cache import get_charts_base64, image_response
+from dataset_cache import load_dataset
+from database_covid import DATABASE_PATH as DATABASE_PATH_COVID
+from downsampling import series_response
+from latest_snapshot import read_latest
+from weekly_rollup import read_weekly
+from datetime import date, datetime
+from typing import TYPE_CHECKING, Optional
+from model_artifacts import (
+    COVID_ARTIFACT_PATH, ArtifactError,
+    load_covid_artifact, save_covid_artifact,
+)
 import numpy as np
 import sqlite3
+if TYPE_CHECKING:
+    from forecasting_covid import CovidForecastModel
+
 router = APIRouter(
      tags=["covid"]
 )
 
 @router.get("/district/bangalore/summary")
 def get_bangalore_summary():
-    db_path = os.path.join(os.path.dirname(__file__), "../db/covid_data.db")
-    conn = sqlite3.connect(db_path)
-    df = pd.read_sql_query("SELECT * FROM bangalore_cases ORDER BY date", conn)
-    conn.close()
-
-    df["date"] = pd.to_datetime(df["date"])
-    df = df.sort_values("date")
+    # Materialized by triggers on bangalore_cases: a primary-key lookup
+    conn = sqlite3.connect(DATABASE_PATH_COVID)
+    try:
+        latest = read_latest(conn, "bangalore")
+    finally:
+        conn.close()
+    if latest is None:
+        raise HTTPException(status_code=404, detail="No Bangalore data available.")
 
     #Get latest row
-    latest_row = df.iloc[-1]
-    latest_date = latest_row["date"].strftime("%Y-%m-%d")
-    hospitalized = int(latest_row["hospitalized"])
+    latest_date = datetime.fromisoformat(str(latest["date"])).strftime("%Y-%m-%d")
+    hospitalized = int(latest["hospitalized"])
 
     return {
         "date": latest_date,
@@ -56,61 +64,97 @@ def get_bangalore_summary():
     #}
 
 
-def fig_to_base64(fig):
-    buf = io.BytesIO()
-    fig.savefig(buf, format="png", bbox_inches="tight")
-    buf.seek(0)
-    return base64.b64encode(buf.read()).decode("utf-8")
+def load_bangalore_csv():
+    # Cleaned CSV, served as memory-mapped columns sorted by date
+    return load_dataset("bangalore_csv")
+
+def bangalore_chart_requests(df) -> dict:
+    """Chart id and data for each Bangalore plot, keyed by plot name"""
+    dates = df['Date.Announced']
+    hospitalized = df['Hospitalized']
+    recovered = df['Recovered']
+    deceased = df['Deceased']
+    series = {"dates": dates, "hospitalized": hospitalized, "recovered": recovered, "deceased": deceased}
+
+    return {
+        # 1. Line plot: Hospitalized, Recovered, Deceased
+        "trend_line": ("bangalore_trend_line", series),
+        # 2. Bar plot: Daily Hospitalized
+        "hospitalized_bar": ("bangalore_hospitalized_bar", {"dates": dates, "hospitalized": hospitalized}),
+        # 3. Stacked Area Plot
+        "stacked_area": ("bangalore_stacked_area", series),
+    }
 
 @router.get("/district/bangalore/plots")
-def all_bangalore_plots():
-    # Load CSV (cleaned version)
-    df = pd.read_csv("data/df_bangalore_urban.csv", parse_dates=["Date.Announced"])
-    df = df.sort_values("Date.Announced")
-
-    images = {}
-
-    # 1. Line plot: Hospitalized, Recovered, Deceased
-    fig1, ax1 = plt.subplots(figsize=(12, 6))
-    ax1.plot(df['Date.Announced'], df['Hospitalized'], label='Hospitalized')
-    ax1.plot(df['Date.Announced'], df['Recovered'], label='Recovered')
-    ax1.plot(df['Date.Announced'], df['Deceased'], label='Deceased')
-    ax1.set_title("COVID Case Trends in Bangalore")
-    ax1.set_xlabel("Date")
-    ax1.set_ylabel("Count")
-    ax1.legend()
-    ax1.grid(True)
-    fig1.tight_layout()
-    images["trend_line"] = fig_to_base64(fig1)
-
-    # 2. Bar plot: Daily Hospitalized
-    fig2, ax2 = plt.subplots(figsize=(12, 6))
-    ax2.bar(df['Date.Announced'], df['Hospitalized'], color='skyblue')
-    ax2.set_title("Daily Hospitalized Cases")
-    ax2.set_xlabel("Date")
-    ax2.set_ylabel("Hospitalized")
-    ax2.grid(True)
-    fig2.tight_layout()
-    images["hospitalized_bar"] = fig_to_base64(fig2)
-
-    # 3. Stacked Area Plot
-    fig3, ax3 = plt.subplots(figsize=(12, 6))
-    ax3.stackplot(df['Date.Announced'], df['Hospitalized'], df['Recovered'], df['Deceased'],
-                  labels=['Hospitalized', 'Recovered', 'Deceased'], colors=['orange', 'green', 'red'])
-    ax3.set_title("Stacked Area: COVID Trends")
-    ax3.set_xlabel("Date")
-    ax3.set_ylabel("Count")
-    ax3.legend(loc='upper left')
-    ax3.grid(True)
-    fig3.tight_layout()
-    images["stacked_area"] = fig_to_base64(fig3)
-
-    return images
+async def all_bangalore_plots():
+    df = await run_in_threadpool(load_bangalore_csv)
+    # Figures whose data changed render in parallel in the chart worker pool
+    return await get_charts_base64(bangalore_chart_requests(df))
+
+@router.get("/district/bangalore/plots/{name}.{fmt}")
+async def bangalore_plot_image(name: str, fmt: str, request: Request):
+    df = await run_in_threadpool(load_bangalore_csv)
+    charts = bangalore_chart_requests(df)
+    if name not in charts:
+        raise HTTPException(status_code=404, detail=f"Unknown plot: {name}")
+    chart_id, data = charts[name]
+    return await image_response(request, chart_id, data, fmt=fmt)
+
+@router.get("/district/bangalore/series")
+async def bangalore_series(
+    series: Optional[str] = None,
+    points: int = 500,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    format: str = "json",
+):
+    """Downsampled hospitalized/recovered/deceased series for client-side charts"""
+    df = await run_in_threadpool(load_bangalore_csv)
+    dates = df['Date.Announced']
+    columns = {"hospitalized": "Hospitalized", "recovered": "Recovered", "deceased": "Deceased"}
+    data = {name: (dates, df[column]) for name, column in columns.items()}
+    return series_response("bangalore", df.version, data, series, points, start, end, format)
+
+def train_forecaster() -> "CovidForecastModel":
+    """Fit the ARIMA model on the weekly rollup, then save the artifact and forecasts"""
+    # statsmodels is only loaded once a model is actually trained
+    from forecasting_covid import CovidForecastModel
+
+    # Weekly totals are kept current by triggers on bangalore_cases
+    conn = sqlite3.connect(DATABASE_PATH_COVID)
+    try:
+        weekly_df = read_weekly(conn, "bangalore")
+    finally:
+        conn.close()
+
+    forecaster = CovidForecastModel()
+    forecaster.run_weekly_pipeline(weekly_df)
+    result = forecaster.get_forecast()
+    save_covid_artifact(forecaster, COVID_ARTIFACT_PATH)
+
+    #  Save to DB
+    forecaster.save_predictions_to_db(result["forecasts"])
+    return forecaster
+
+def load_cached_forecaster():
+    """Load the slim COVID artifact, migrating the legacy pickle if needed"""
+    try:
+        return load_covid_artifact(COVID_ARTIFACT_PATH)
+    except ArtifactError:
+        # Missing, or written by an incompatible version: rebuild below
+        pass
 
-@router.get("/predict")
-def predict():
     if os.path.exists("covid_forecaster.pkl"):
+        import joblib
         forecaster = joblib.load("covid_forecaster.pkl")
+        save_covid_artifact(forecaster, COVID_ARTIFACT_PATH)
+        return forecaster
+    return None
+
+@router.get("/predict")
+def predict():
+    forecaster = load_cached_forecaster()
+    if forecaster is not None:
         result = forecaster.get_forecast()
         return {
             "status": "success",
@@ -119,18 +163,8 @@ def predict():
         }
 
     else:
-        conn = sqlite3.connect("db/covid_data.db")
-        df = pd.read_sql("SELECT date, hospitalized FROM bangalore_cases", conn)
-        conn.close()
-
-        forecaster = CovidForecastModel()
-        forecaster.run_pipeline(df)
-        result = forecaster.get_forecast()  
-        forecaster.save_predictions_to_db(result["forecasts"])
-        joblib.dump(forecaster, "covid_forecaster.pkl")
-
-        #  Save to DB
-        forecaster.save_predictions_to_db(result["forecasts"])
+        forecaster = train_forecaster()
+        result = forecaster.get_forecast()
 
         return {
             "status": "success",
@@ -139,11 +173,19 @@ def predict():
         }
 
 @router.get("/forecast_plot")
-def predict_plot():
-    if os.path.exists("covid_forecaster.pkl"):
-        forecaster = joblib.load("covid_forecaster.pkl")
-        base64_img = forecaster.get_covid_forecast_plot()  # returns base64-encoded PNG
+async def predict_plot():
+    forecaster = await run_in_threadpool(load_cached_forecaster)
+    if forecaster is not None:
+        data = forecaster.covid_forecast_plot_data()
+        base64_img = (await get_charts_base64({"image": ("covid_forecast", data)}))["image"] if data else ""
         return {"status": "success", "image_base64": base64_img}
     else:
         return {"status": "error", "message": "Forecast not available yet."}
 
+@router.get("/forecast_plot.{fmt}")
+async def predict_plot_image(fmt: str, request: Request):
+    forecaster = await run_in_threadpool(load_cached_forecaster)
+    data = forecaster.covid_forecast_plot_data() if forecaster is not None else {}
+    if not data:
+        raise HTTPException(status_code=404, detail="Forecast not available yet.")
+    return await image_response(request, "covid_forecast", data, fmt=fmt)
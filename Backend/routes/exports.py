@@ -0,0 +1,41 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from table_export import EXPORT_FORMATS, EXPORT_TABLES, CursorError, stream_export
+
+router = APIRouter(
+    prefix="/export",
+    tags=["export"],
+    responses={404: {"description": "Not found"}}
+)
+
+
+@router.get("/{table}")
+async def export_table(
+    table: str,
+    format: str = "ndjson",
+    after: Optional[str] = None,
+    limit: Optional[int] = Query(None, gt=0),
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+):
+    """Stream a table as NDJSON or CSV in primary-key order
+
+    With `limit`, the response is one page; pass its X-Next-Cursor header
+    back as `after` for the next one (no header on the last page).
+    """
+    if table not in EXPORT_TABLES:
+        raise HTTPException(status_code=404, detail=f"Unknown table. Choose from: {', '.join(EXPORT_TABLES)}")
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown format. Choose from: {', '.join(EXPORT_FORMATS)}")
+    try:
+        headers, body = await run_in_threadpool(
+            stream_export, table, format, after, limit, start and start.isoformat(), end and end.isoformat())
+    except CursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # A sync iterator: Starlette pulls each chunk in the threadpool
+    return StreamingResponse(body, media_type=EXPORT_FORMATS[format], headers=headers)
@@ -0,0 +1,87 @@
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+from starlette.concurrency import run_in_threadpool
+from datetime import datetime
+from typing import Dict, Optional
+import sqlite3
+
+from database_covid import DATABASE_PATH
+from spatial_index import RESOURCES, get_hospital_index, update_capacity
+
+router = APIRouter(
+    prefix="/hospitals",
+    tags=["hospitals"],
+    responses={404: {"description": "Not found"}}
+)
+
+
+class CapacityReport(BaseModel):
+    available_beds: Optional[int] = Field(None, ge=0)
+    available_icu_beds: Optional[int] = Field(None, ge=0)
+    available_ventilators: Optional[int] = Field(None, ge=0)
+    available_oxygen_cylinders: Optional[int] = Field(None, ge=0)
+    available_doctors: Optional[int] = Field(None, ge=0)
+    available_nurses: Optional[int] = Field(None, ge=0)
+
+
+def save_capacity(hospital_id: int, available: Dict[str, Optional[int]]) -> None:
+    """Upsert a hospital's available units (hospital_capacity column -> value) and update the index"""
+    available = {column: value for column, value in available.items()
+                 if column in RESOURCES.values() and value is not None}
+    if not available:
+        return
+
+    columns = ", ".join(available)
+    updates = ", ".join(f"{column} = excluded.{column}" for column in available)
+    conn = sqlite3.connect(DATABASE_PATH)
+    try:
+        conn.execute(f"""
+            INSERT INTO hospital_capacity (hospital_id, updated_at, {columns})
+            VALUES (?, ?, {", ".join("?" * len(available))})
+            ON CONFLICT (hospital_id) DO UPDATE SET updated_at = excluded.updated_at, {updates}
+        """, [hospital_id, datetime.now().isoformat(timespec="seconds")] + list(available.values()))
+        conn.commit()
+    finally:
+        conn.close()
+
+    by_resource = {name: available[column] for name, column in RESOURCES.items() if column in available}
+    update_capacity(hospital_id, by_resource)
+
+
+@router.put("/{hospital_id}/capacity")
+def report_capacity(hospital_id: int, report: CapacityReport):
+    save_capacity(hospital_id, report.dict())
+    return {"message": "Capacity updated"}
+
+
+@router.get("/nearest")
+async def nearest_with_capacity(
+    resource: str,
+    min_units: int = 1,
+    k: int = 5,
+    lat: Optional[float] = None,
+    lon: Optional[float] = None,
+    hospital_id: Optional[int] = None,
+):
+    """k nearest hospitals with at least min_units of `resource` available
+
+    The origin is either lat/lon or a hospital's own location (excluded from
+    the results).
+    """
+    if resource not in RESOURCES:
+        raise HTTPException(status_code=400, detail=f"Unknown resource: {resource}. Use one of {list(RESOURCES)}")
+    if not 1 <= k <= 100 or min_units < 0:
+        raise HTTPException(status_code=400, detail="k must be 1-100 and min_units >= 0")
+
+    index = await run_in_threadpool(get_hospital_index)
+    if lat is None or lon is None:
+        origin = index.location(hospital_id) if hospital_id is not None else None
+        if origin is None:
+            raise HTTPException(status_code=400, detail="Give lat and lon, or a geocoded hospital_id")
+        lat, lon = origin
+
+    return {
+        "resource": resource,
+        "min_units": min_units,
+        "hospitals": index.nearest(lat, lon, resource, min_units, k, exclude=hospital_id),
+    }
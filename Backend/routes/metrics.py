@@ -0,0 +1,72 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+import anyio.to_thread
+
+import metrics
+import table_export
+import warmup
+from chart_cache import chart_cache
+from dataset_cache import dataset_cache
+from events import bus, registered_watchers
+from model_registry import shared_models
+from national_client import national_client
+from nowcast import nowcasters
+from spatial_index import hospital_index
+
+router = APIRouter(tags=["metrics"])
+
+
+def _ratio(hits: float, total: float) -> float:
+    return hits / total if total else 0.0
+
+
+def subsystem_stats():
+    """(prefix, labels, stats dict) for every subsystem that keeps counters"""
+    yield "chart_cache", {}, chart_cache.stats
+    yield "dataset_cache", {}, dataset_cache.stats
+    yield "national_client", {}, national_client.stats
+    yield "hospital_index", {}, hospital_index.stats
+    yield "table_export", {}, table_export.stats
+    for name, watcher in registered_watchers().items():
+        yield "change_watcher", {"watcher": name}, watcher.stats
+    for name, nowcaster in list(nowcasters.items()):
+        yield "nowcaster", {"series": name}, nowcaster.stats
+    for name, model in list(shared_models.items()):
+        yield "shared_model", {"model": name}, model.stats
+
+
+def gauges():
+    charts, datasets, national = chart_cache.stats, dataset_cache.stats, national_client.stats
+    chart_hits = charts["memory_hits"] + charts["disk_hits"]
+    national_hits = national["fresh_hits"] + national["stale_hits"]
+    yield "cache_hit_ratio", "Share of lookups served without recomputing", {"cache": "chart_cache"}, \
+        _ratio(chart_hits, chart_hits + charts["misses"])
+    yield "cache_hit_ratio", "Share of lookups served without recomputing", {"cache": "dataset_cache"}, \
+        _ratio(datasets["hits"] + datasets["reopens"], sum(datasets.values()))
+    yield "cache_hit_ratio", "Share of lookups served without recomputing", {"cache": "national_client"}, \
+        _ratio(national_hits, national_hits + national["fetches"])
+
+    # Sync routes and their DB connections run in this pool, so waiting tasks are DB/pool waits
+    pool = anyio.to_thread.current_default_thread_limiter().statistics()
+    yield "threadpool_busy_threads", "Worker threads in use by sync routes and run_in_threadpool", {}, pool.borrowed_tokens
+    yield "threadpool_size", "Worker thread limit", {}, pool.total_tokens
+    yield "threadpool_waiting_tasks", "Tasks queued for a free worker thread", {}, pool.tasks_waiting
+
+    for name, model in list(shared_models.items()):
+        if model.version is not None:
+            yield "model_version", "Published model version this worker serves", {"model": name}, model.version
+
+    for name, count in list(bus.subscribers.items()):
+        yield "event_subscribers", "Open SSE/WebSocket subscriptions per topic", {"topic": name}, count
+
+    for name, seconds in list(warmup.stats["modules"].items()):
+        yield "prewarm_import_seconds", "Background import time after startup", {"module": name}, seconds
+    if warmup.stats["charts_s"] is not None:
+        yield "prewarm_chart_workers_seconds", "Time to start and warm the chart workers", {}, warmup.stats["charts_s"]
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus text exposition of request, stage and subsystem metrics"""
+    return PlainTextResponse(metrics.render(subsystem_stats(), gauges()),
+                             media_type="text/plain; version=0.0.4; charset=utf-8")
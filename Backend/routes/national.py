@@ -1,14 +1,13 @@
-from fastapi import APIRouter
-import pandas as pd
-import matplotlib
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
-import seaborn as sns
-import io
-import base64
-import requests
-import os
-from dotenv import load_dotenv
+from fastapi import APIRouter, HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+from chart_cache import data_version, get_charts_base64, image_response
+from downsampling import series_response
+from datetime import date
+from typing import TYPE_CHECKING, Optional
+from national_client import NationalDataError, national_client
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 router = APIRouter(
      tags=["covid"]
@@ -16,124 +15,81 @@ router = APIRouter(
 
 @router.get("/national/summary")
 def get_national_summary():
-    url = "https://api.api-ninjas.com/v1/covid19?country=India"
-    load_dotenv()
-    API_KEY = os.getenv("NATIONAL_API_KEY")
-    headers = {"X-Api-Key": API_KEY}  
-    response = requests.get(url, headers=headers)
-
-    if response.status_code != 200:
-        return {"error": f"Failed to fetch data: {response.status_code}"}
-
-    data = response.json()
-    if not data or 'cases' not in data[0]:
-        return {"error": "Invalid API data format"}
-
-    # Extract date-wise cases data
-    cases = data[0]['cases']
-    rows = []
-    for date_str, values in cases.items():
-        total = values.get("total", 0)
-        new = abs(values.get("new", 0))
-        rows.append({
-            "Date": pd.to_datetime(date_str),
-            "Total Cases": total,
-            "New Cases": new
-        })
+    try:
+        snapshot = national_client.get()
+    except NationalDataError as e:
+        return {"error": str(e)}
 
-    # Convert to DataFrame and sort by Date
-    df = pd.DataFrame(rows)
-    df = df.sort_values("Date", ascending=False).reset_index(drop=True)
-    latest = df.iloc[0]
+    record = snapshot.record
+    latest = snapshot.df.iloc[-1]
 
     return {
-        "country": data[0].get("country", "India"),
+        "country": record.get("country", "India"),
         "total_cases": int(latest["Total Cases"]),
         "new_cases": int(latest["New Cases"]),
-        "active": data[0].get("active_cases", 0),
-        "recovered": data[0].get("recovered", 0),
-        "deaths": data[0].get("deaths", 0),
+        "active": record.get("active_cases", 0),
+        "recovered": record.get("recovered", 0),
+        "deaths": record.get("deaths", 0),
         "last_updated": latest["Date"].strftime("%Y-%m-%d")
     }
 
 
-# fetching api data
+# fetching api data (shared, cached parse of the same upstream response)
 def fetch_india_covid_data():
-    url = "https://api.api-ninjas.com/v1/covid19?country=India"
-    headers = {"X-Api-Key": "kuk994yIHFlDNzO39qCffQ==4tsspAbJbD6OWZB9"}  # api key
-    response = requests.get(url, headers=headers)
+    return national_client.get().df
 
-    if response.status_code == 200:
-        cases = response.json()[0]['cases']
-        rows = []
-        for date_str, values in cases.items():
-            rows.append({
-                'Date': pd.to_datetime(date_str),
-                'Total Cases': values.get('total', 0),
-                'New Cases': abs(values.get('new', 0))
-            })
-        df = pd.DataFrame(rows).sort_values("Date").reset_index(drop=True)
-        return df
-    else:
-        raise Exception(f"Failed to fetch API data: {response.status_code}")
-
-#to convert plot to base64
-def fig_to_base64(fig):
-    buf = io.BytesIO()
-    fig.savefig(buf, format='png', bbox_inches='tight')
-    buf.seek(0)
-    return base64.b64encode(buf.read()).decode('utf-8')
-
-@router.get("/national/plots")
-def get_all_national_plots():
-    df = fetch_india_covid_data()
+def national_chart_requests(df: "pd.DataFrame") -> dict:
+    """Chart id and data for each national plot, keyed by plot name"""
     df_last_30 = df.tail(30)
 
-    plots = {}
+    dates = df["Date"].values
+    total_cases = df["Total Cases"].values
+    new_cases = df["New Cases"].values
 
-    # Plot 1: Bar - New Cases (Last 30 days)
-    fig1, ax1 = plt.subplots(figsize=(14, 6))
-    ax1.bar(df_last_30["Date"], df_last_30["New Cases"], color='steelblue')
-    ax1.set_title("Daily New COVID-19 Cases (Last 30 Days)")
-    ax1.set_xlabel("Date")
-    ax1.set_ylabel("New Cases")
-    ax1.tick_params(axis='x', rotation=45)
-    fig1.tight_layout()
-    plots["new_cases_bar"] = fig_to_base64(fig1)
-
-    # Plot 2: Total vs New Cases (Dual Y-axis)
-    fig2, ax2 = plt.subplots(figsize=(14, 6))
-    ax2.plot(df["Date"], df["Total Cases"], color="orange")
-    ax2.set_ylabel("Total Cases", color="orange")
-    ax2b = ax2.twinx()
-    ax2b.plot(df["Date"], df["New Cases"], color="steelblue", alpha=0.6)
-    ax2b.set_ylabel("New Cases", color="steelblue")
-    fig2.suptitle("COVID-19 Total vs New Cases in India Over Time")
-    fig2.tight_layout()
-    plots["total_vs_new"] = fig_to_base64(fig2)
-
-    # Plot 3: Line - Total Cases
-    fig3, ax3 = plt.subplots(figsize=(14, 6))
-    sns.lineplot(data=df, x="Date", y="Total Cases", color="orange", ax=ax3)
-    ax3.set_title("Total COVID-19 Cases in India Over Time")
-    ax3.set_xlabel("Date")
-    ax3.set_ylabel("Total Cases")
-    ax3.tick_params(axis='x', rotation=45)
-    ax3.grid(True)
-    import matplotlib.ticker as ticker
-    ax3.yaxis.set_major_formatter(ticker.FuncFormatter(lambda x, _: f'{x*1e-6:.0f}M'))
-    fig3.tight_layout()
-    plots["total_cases_line"] = fig_to_base64(fig3)
+    return {
+        # Plot 1: Bar - New Cases (Last 30 days)
+        "new_cases_bar": ("national_new_cases_bar", {
+            "dates": df_last_30["Date"].values, "new_cases": df_last_30["New Cases"].values,
+        }),
+        # Plot 2: Total vs New Cases (Dual Y-axis)
+        "total_vs_new": ("national_total_vs_new", {
+            "dates": dates, "total_cases": total_cases, "new_cases": new_cases,
+        }),
+        # Plot 3: Line - Total Cases
+        "total_cases_line": ("national_total_cases_line", {"dates": dates, "total_cases": total_cases}),
+        # Plot 4: Line - New Cases
+        "new_cases_line": ("national_new_cases_line", {"dates": dates, "new_cases": new_cases}),
+    }
 
-    # Plot 4: Line - New Cases
-    fig4, ax4 = plt.subplots(figsize=(14, 6))
-    sns.lineplot(data=df, x="Date", y="New Cases", color="steelblue", ax=ax4)
-    ax4.set_title("Daily New COVID-19 Cases in India Over Time")
-    ax4.set_xlabel("Date")
-    ax4.set_ylabel("New Cases")
-    ax4.tick_params(axis='x', rotation=45)
-    ax4.grid(True)
-    fig4.tight_layout()
-    plots["new_cases_line"] = fig_to_base64(fig4)
+@router.get("/national/plots")
+async def get_all_national_plots():
+    df = await run_in_threadpool(fetch_india_covid_data)
+    # Figures whose data changed render in parallel in the chart worker pool
+    return await get_charts_base64(national_chart_requests(df))
+
+@router.get("/national/plots/{name}.{fmt}")
+async def get_national_plot_image(name: str, fmt: str, request: Request):
+    df = await run_in_threadpool(fetch_india_covid_data)
+    charts = national_chart_requests(df)
+    if name not in charts:
+        raise HTTPException(status_code=404, detail=f"Unknown plot: {name}")
+    chart_id, data = charts[name]
+    return await image_response(request, chart_id, data, fmt=fmt)
+
+@router.get("/national/series")
+async def get_national_series(
+    series: Optional[str] = None,
+    points: int = 500,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    format: str = "json",
+):
+    """Downsampled total/new case series for client-side charts"""
+    df = await run_in_threadpool(fetch_india_covid_data)
+    data = {
+        "total_cases": (df["Date"].values, df["Total Cases"].values),
+        "new_cases": (df["Date"].values, df["New Cases"].values),
+    }
+    version = data_version({"date": df["Date"].values, "total": df["Total Cases"].values, "new": df["New Cases"].values})
+    return series_response("national", version, data, series, points, start, end, format)
 
-    return plots
@@ -0,0 +1,98 @@
+from fastapi import APIRouter, HTTPException
+from starlette.concurrency import run_in_threadpool
+import sqlite3
+from typing import List, Optional, Tuple
+
+from database import DATABASE_PATH
+from database_covid import DATABASE_PATH as DATABASE_PATH_COVID
+from nowcast import SeriesNowcaster, nowcasters, register_nowcaster
+from routes import dengue, district
+
+router = APIRouter(
+    prefix="/nowcast",
+    tags=["nowcast"],
+    responses={404: {"description": "Not found"}}
+)
+
+# Heavy-model forecast steps kept for residuals and the adjusted forecast
+REFERENCE_STEPS = 12
+
+
+def fetch_rows(db_path: str, query: str, after_key: Optional[str]) -> List[Tuple[str, float]]:
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(query, (after_key or "",)).fetchall()
+    finally:
+        conn.close()
+
+
+# Dengue: weekly reported cases against the ensemble
+
+def fetch_dengue(after_key: Optional[str]) -> List[Tuple[str, float]]:
+    return fetch_rows(DATABASE_PATH, """
+        SELECT date, reported_cases FROM dengue_data
+        WHERE date > ? AND reported_cases IS NOT NULL
+        ORDER BY date
+    """, after_key)
+
+
+def dengue_reference() -> Optional[Tuple[str, List[float]]]:
+    model = dengue.forecaster
+    if model is None:
+        return None
+    forecast = model.forecast(weeks=REFERENCE_STEPS)
+    return model.df.index[-1].strftime("%Y-%m-%d"), [float(v) for v in forecast["cases_predicted"]]
+
+
+# COVID: completed weeks of the Bangalore hospitalization rollup against ARIMA
+
+def fetch_covid(after_key: Optional[str]) -> List[Tuple[str, float]]:
+    # The newest week is still filling up unless all seven days are in
+    return fetch_rows(DATABASE_PATH_COVID, """
+        SELECT week, hospitalized FROM weekly_hospitalized
+        WHERE region = 'bangalore' AND week > ?
+          AND (days = 7 OR week < (SELECT MAX(week) FROM weekly_hospitalized WHERE region = 'bangalore'))
+        ORDER BY week
+    """, after_key)
+
+
+def covid_reference() -> Optional[Tuple[str, List[float]]]:
+    model = district.load_cached_forecaster()
+    if model is None:
+        return None
+    forecasts = model.get_forecast(steps=REFERENCE_STEPS)["forecasts"]
+    return model.weekly_df["Week"].iloc[-1].strftime("%Y-%m-%d"), [float(f["predicted_cases"]) for f in forecasts]
+
+
+# Every worker sees the same drift; only the one holding the training lease retrains
+register_nowcaster(SeriesNowcaster("dengue", fetch_dengue, dengue_reference,
+                                   lambda: dengue.retrain_forecaster(force=False)))
+register_nowcaster(SeriesNowcaster("covid_bangalore", fetch_covid, covid_reference, district.train_forecaster))
+
+
+def get_nowcaster(series: str) -> SeriesNowcaster:
+    if series not in nowcasters:
+        raise HTTPException(status_code=404, detail=f"Unknown series: {series}")
+    return nowcasters[series]
+
+
+@router.get("/{series}")
+async def get_nowcast(series: str, horizon: int = 4):
+    """Nowcast and short-horizon forecast, including observations written since the last call"""
+    nowcaster = get_nowcaster(series)
+    await run_in_threadpool(nowcaster.sync)
+    return nowcaster.nowcast(horizon)
+
+
+@router.get("/{series}/state")
+async def get_nowcast_state(series: str):
+    """Smoothing state, drift metrics and retrain status"""
+    nowcaster = get_nowcaster(series)
+    await run_in_threadpool(nowcaster.sync)
+    return nowcaster.state()
+
+
+@router.post("/{series}/retrain")
+async def retrain_series(series: str):
+    started = get_nowcaster(series).trigger_retrain()
+    return {"status": "retrain started" if started else "retrain already running or in cooldown"}
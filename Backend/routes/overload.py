@@ -1,12 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+import asyncio
+import os
 import sqlite3
-import pandas as pd
-from datetime import datetime, timedelta
-from typing import Dict
+from datetime import date, datetime, timedelta
+from typing import Dict, Set
 
 from routes.resources import get_latest_resources_from_db
-from database import get_db
+from database import DATABASE_PATH, get_db
+from events import ChangeWatcher, bus, register_watcher
+from latest_snapshot import read_latest
 from overload_risk import predict_overload
 
 router = APIRouter(
@@ -15,10 +19,8 @@ router = APIRouter(
     responses={404: {"description": "Not found"}}
 )
 
-def get_overload(
-    available_resources: Dict = Depends(get_latest_resources_from_db),
-    db: sqlite3.Connection = Depends(get_db)
-):
+def next_week_forecast(db: sqlite3.Connection):
+    """(next Sunday, latest predicted cases for it), or (next Sunday, None) if not forecast"""
     cursor = db.cursor()
 
     # Get next week's date (assuming forecasts are by week-end)
@@ -38,11 +40,16 @@ def get_overload(
 
 
     row = cursor.fetchone()
+    return next_sunday, (row[1] if row else None)
 
-    if not row:
-        raise HTTPException(status_code=404, detail="Forecast for next week not found")
+def get_overload(
+    available_resources: Dict = Depends(get_latest_resources_from_db),
+    db: sqlite3.Connection = Depends(get_db)
+):
+    next_sunday, predicted_cases = next_week_forecast(db)
 
-    predicted_cases = row[1]
+    if predicted_cases is None:
+        raise HTTPException(status_code=404, detail="Forecast for next week not found")
 
     # Filter only the relevant resource fields
     filtered_resources = {
@@ -61,8 +68,130 @@ def get_overload(
 
     return overload_result
 
+# Pushed overload alerts
+#
+# The risk only changes when a resource snapshot or a forecast is written (or
+# the forecast week rolls over), so it is recomputed then and pushed to
+# subscribers instead of being recomputed on every poll.
+
+ALERT_HEARTBEAT = float(os.getenv("ALERT_HEARTBEAT", 15))
+ALERT_TABLES = ["hospital_resource_timeseries", "forecasts"]
+
+# Resource series per hospital, as named in latest_snapshot. There is one
+# resource series today; each entity gets its own topic.
+ALERT_ENTITIES = ["hospital"]
+
+
+def alert_topic(entity: str) -> str:
+    if entity not in ALERT_ENTITIES:
+        raise HTTPException(status_code=404, detail=f"Unknown hospital: {entity}")
+    return f"overload:{entity}"
+
+
+def compute_overload(entity: str) -> Dict:
+    conn = sqlite3.connect(DATABASE_PATH)
+    try:
+        available = read_latest(conn, entity) or {}
+        try:
+            return {"entity": entity, "status": "ok", **get_overload(available, conn)}
+        except HTTPException as e:
+            return {"entity": entity, "status": "unavailable", "detail": e.detail}
+    finally:
+        conn.close()
+
+
+async def refresh_alerts(changed: Set[str]) -> None:
+    """Recompute the risk of the affected hospitals and publish the ones that changed"""
+    # Both tables feed every hospital's risk while there is a single resource
+    # series; per-hospital resource writes would narrow this to one entity
+    for entity in ALERT_ENTITIES:
+        result = await run_in_threadpool(compute_overload, entity)
+        topic = bus.topic(alert_topic(entity))
+        previous = dict(topic.message or {})
+        previous.pop("computed_at", None)
+        if previous != result:
+            topic.publish({**result, "computed_at": datetime.now().isoformat(timespec="seconds")})
+
+
+alert_watcher = register_watcher("overload", ChangeWatcher(DATABASE_PATH, ALERT_TABLES, refresh_alerts))
+_rollover_task = None
+
+
+async def _refresh_on_rollover() -> None:
+    # The forecast week looked up by get_overload moves with the date
+    while True:
+        tomorrow = datetime.combine(date.today() + timedelta(days=1), datetime.min.time())
+        await asyncio.sleep((tomorrow - datetime.now()).total_seconds() + 1)
+        try:
+            await refresh_alerts(set(ALERT_TABLES))
+        except Exception:
+            pass
+
+
+async def start_alerts() -> None:
+    global _rollover_task
+    await alert_watcher.start()
+    await refresh_alerts(set(ALERT_TABLES))
+    _rollover_task = asyncio.create_task(_refresh_on_rollover())
+
+
+async def stop_alerts() -> None:
+    global _rollover_task
+    if _rollover_task is not None:
+        _rollover_task.cancel()
+        _rollover_task = None
+    await alert_watcher.stop()
+
+
+def published_risk(entity: str = "hospital"):
+    """Last pushed risk in get_overload's shape; None if alerts have not started"""
+    message = bus.topic(alert_topic(entity)).message
+    if message is None:
+        return None
+    if message["status"] != "ok":
+        raise HTTPException(status_code=404, detail=message["detail"])
+    return {key: value for key, value in message.items() if key not in ("entity", "status", "computed_at")}
+
+
 @router.get("/overload_risk")
 def get_risk(
-    result: Dict = Depends(get_overload)
+    entity: str = "hospital",
+    db: sqlite3.Connection = Depends(get_db)
 ):
+    result = published_risk(entity)
+    if result is None:
+        # Alerts not started (e.g. a script importing the router): compute directly
+        return get_overload(get_latest_resources_from_db(db), db)
     return result
+
+
+@router.get("/stream")
+async def stream_risk(request: Request, entity: str = "hospital"):
+    """Server-sent events: the current risk, then every change"""
+    name = alert_topic(entity)
+    last_event_id = request.headers.get("last-event-id")
+    after_version = int(last_event_id) if last_event_id and last_event_id.isdigit() else 0
+
+    async def events():
+        yield "retry: 3000\n\n"
+        async for topic in bus.subscribe(name, after_version, ALERT_HEARTBEAT):
+            yield topic.sse_frame if topic is not None else ": keep-alive\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@router.websocket("/ws")
+async def risk_socket(websocket: WebSocket, entity: str = "hospital"):
+    """WebSocket variant of /stream; each message is the risk JSON"""
+    if entity not in ALERT_ENTITIES:
+        await websocket.close(code=1008)
+        return
+
+    await websocket.accept()
+    try:
+        async for topic in bus.subscribe(alert_topic(entity), 0, ALERT_HEARTBEAT):
+            # Heartbeats also surface closed connections that never send
+            await websocket.send_text(topic.encoded if topic is not None else '{"heartbeat": true}')
+    except (WebSocketDisconnect, RuntimeError):
+        pass
@@ -1,19 +1,22 @@
 from fastapi import APIRouter, Depends
-import requests
 from routes.overload import get_overload
 import os
 from dotenv import load_dotenv
+from metrics import span
 
 router = APIRouter(
     prefix="/llm",
     tags=["LLM Recommendations"]
 )
 load_dotenv()
-GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
+GROQ_API_URL = os.getenv("GROQ_API_URL", "https://api.groq.com/openai/v1/chat/completions")
 GROQ_API_KEY = os.getenv("GROQ_API_KEY") 
 MODEL_NAME = "llama3-8b-8192"
 
+@span("llm_call")
 def call_llm(prompt: str):
+    import requests
+
     headers = {
         "Authorization": f"Bearer {GROQ_API_KEY}",
         "Content-Type": "application/json"
@@ -1,8 +1,14 @@
-from fastapi import APIRouter, Depends
-from typing import Dict,List
+from fastapi import APIRouter, Depends, HTTPException
+from starlette.concurrency import run_in_threadpool
+from typing import Dict,List,Optional
+import asyncio
 import sqlite3
 from datetime import datetime
-from database import get_db 
+from database import DATABASE_PATH, get_db
+from events import notify_change
+from latest_snapshot import read_latest
+from resource_rollup import RESOURCE_COMPACT_INTERVAL, UTILIZATION, compact, read_utilization
+from routes.hospitals import save_capacity
 from pydantic import BaseModel,Field
 from decimal import Decimal
 from datetime import date
@@ -34,20 +40,12 @@ class FullResourceData(BaseModel):
     total_icu_nurses: int
     available_icu_nurses: int
     staff_reduction_factor: Decimal = Field(..., gt=0, lt=2)
+    hospital_id: Optional[int] = None  # also updates that hospital's spare capacity
 
 
 def get_latest_resources_from_db(conn: sqlite3.Connection = Depends(get_db)) -> dict:
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT * FROM hospital_resource_timeseries
-        ORDER BY date DESC LIMIT 1
-    """)
-    row = cursor.fetchone()
-    if row is None:
-        return {}
-
-    columns = [description[0] for description in cursor.description]
-    return dict(zip(columns, row))
+    # Maintained by triggers on hospital_resource_timeseries (see latest_snapshot.py)
+    return read_latest(conn, "hospital") or {}
 
 
 @router.get("/hospital-resources/latest", response_model=Dict)
@@ -69,6 +67,31 @@ def get_trend_data(conn: sqlite3.Connection = Depends(get_db)):
     return [dict(zip(columns, row)) for row in rows]
 
 
+@router.get("/hospital-resources/utilization")
+def get_utilization(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    resolution_days: Optional[float] = None,
+    points: int = 200,
+    resources: Optional[str] = None,
+    conn: sqlite3.Connection = Depends(get_db),
+):
+    """Min/max/mean utilization per resource, from raw rows or the weekly/monthly rollups
+
+    Without resolution_days, the range is split into about `points` points.
+    The coarsest tier no wider than that resolution answers the query.
+    """
+    names = resources.split(",") if resources else None
+    unknown = [name for name in names or [] if name not in UTILIZATION]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown resources: {', '.join(unknown)}. Use {list(UTILIZATION)}")
+    if resolution_days is None:
+        first = start or date.fromisoformat(conn.execute(
+            "SELECT COALESCE(MIN(period), DATE('now')) FROM resource_rollup WHERE tier = 'month'").fetchone()[0])
+        resolution_days = ((end or date.today()) - first).days / max(points, 1)
+    return read_utilization(conn, start and start.isoformat(), end and end.isoformat(), resolution_days, names)
+
+
 
 @router.post("/hospital-resources/add")
 def add_resource_data(data: FullResourceData, conn: sqlite3.Connection = Depends(get_db)):
@@ -83,7 +106,7 @@ def add_resource_data(data: FullResourceData, conn: sqlite3.Connection = Depends
             total_doctors, available_doctors,
             total_nurses, available_nurses,
             total_icu_nurses, available_icu_nurses,
-            staff_reduction_factor
+            staff_reduction_factors
         )
         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
     """, (
@@ -99,5 +122,49 @@ def add_resource_data(data: FullResourceData, conn: sqlite3.Connection = Depends
     ))
 
     conn.commit()
+    notify_change("hospital_resource_timeseries")
+    if data.hospital_id is not None:
+        save_capacity(data.hospital_id, {
+            "available_beds": data.available_beds,
+            "available_icu_beds": data.available_icu_beds,
+            "available_ventilators": data.available_ventilators,
+            "available_oxygen_cylinders": data.available_oxygen_cylinders,
+            "available_doctors": data.available_doctors,
+            "available_nurses": data.available_nurses,
+        })
     return {"message": "Resource data added successfully"}
 
+
+def compact_resources() -> int:
+    conn = sqlite3.connect(DATABASE_PATH)
+    try:
+        return compact(conn)
+    finally:
+        conn.close()
+
+
+_compaction_task = None
+
+
+async def _compact_periodically() -> None:
+    while True:
+        try:
+            await run_in_threadpool(compact_resources)
+        except sqlite3.OperationalError:
+            # Busy with another worker's compaction or a long write; try again next time
+            pass
+        await asyncio.sleep(RESOURCE_COMPACT_INTERVAL)
+
+
+@router.on_event("startup")
+async def start_compaction():
+    global _compaction_task
+    _compaction_task = asyncio.create_task(_compact_periodically())
+
+
+@router.on_event("shutdown")
+async def stop_compaction():
+    global _compaction_task
+    if _compaction_task is not None:
+        _compaction_task.cancel()
+        _compaction_task = None
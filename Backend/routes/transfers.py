@@ -0,0 +1,99 @@
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, List, Optional
+import sqlite3
+
+import numpy as np
+
+from database import DATABASE_PATH
+from database_covid import DATABASE_PATH as DATABASE_PATH_COVID
+from routes.overload import next_week_forecast
+from transfer_optimizer import (
+    TRANSFER_MAX_KM, TRANSFER_RESOURCES, TransferError, load_plan, plan_transfers, save_plan,
+)
+
+router = APIRouter(
+    prefix="/transfers",
+    tags=["transfers"],
+    responses={404: {"description": "Not found"}}
+)
+
+
+class PlanRequest(BaseModel):
+    resources: Optional[List[str]] = None
+    # hospital_id -> predicted cases; defaults to the regional forecast split by bed share
+    predicted_cases: Optional[Dict[int, float]] = None
+    warm_start: bool = True
+    max_km: float = TRANSFER_MAX_KM
+
+
+def load_transfer_hospitals():
+    """Geocoded hospitals with their bed share and available units of each transferable resource"""
+    columns = ", ".join(f"COALESCE(c.{column}, 0)" for column, _ in TRANSFER_RESOURCES.values())
+    conn = sqlite3.connect(DATABASE_PATH_COVID)
+    try:
+        rows = conn.execute(f"""
+            SELECT u.hospital_id, u.latitude, u.longitude, COALESCE(c.available_beds, 0), {columns}
+            FROM user u LEFT JOIN hospital_capacity c ON c.hospital_id = u.hospital_id
+            WHERE u.latitude IS NOT NULL AND u.longitude IS NOT NULL
+            ORDER BY u.hospital_id
+        """).fetchall()
+    finally:
+        conn.close()
+    data = np.array(rows, dtype=np.float64).reshape(-1, 4 + len(TRANSFER_RESOURCES))
+    available = {resource: data[:, 4 + k] for k, resource in enumerate(TRANSFER_RESOURCES)}
+    return data[:, 0].astype(np.int64), data[:, 1], data[:, 2], data[:, 3], available
+
+
+def regional_cases(beds: np.ndarray) -> np.ndarray:
+    """Next week's regional forecast, split across hospitals by share of available beds"""
+    conn = sqlite3.connect(DATABASE_PATH)
+    try:
+        _, predicted = next_week_forecast(conn)
+    finally:
+        conn.close()
+    if predicted is None:
+        raise HTTPException(status_code=404, detail="Forecast for next week not found")
+    share = beds / beds.sum() if beds.sum() > 0 else np.full(len(beds), 1 / len(beds))
+    return predicted * share
+
+
+def build_plan(request: PlanRequest) -> Dict:
+    hospital_ids, latitude, longitude, beds, available = load_transfer_hospitals()
+    if not len(hospital_ids):
+        raise HTTPException(status_code=404, detail="No geocoded hospitals")
+
+    if request.predicted_cases is not None:
+        predicted = np.array([request.predicted_cases.get(int(h), 0.0) for h in hospital_ids])
+    else:
+        predicted = regional_cases(beds)
+
+    previous = load_plan() if request.warm_start else None
+    try:
+        plan = plan_transfers(hospital_ids, latitude, longitude, available, predicted,
+                              previous=previous, resources=request.resources, max_km=request.max_km)
+    except TransferError as e:
+        raise HTTPException(status_code=500, detail=f"Transfer optimisation failed: {e}")
+    plan["warm_started"] = previous is not None
+    save_plan(plan)
+    return plan
+
+
+@router.post("/plan")
+async def create_plan(request: PlanRequest):
+    """Solve a minimum unit-km transfer plan for the next week's forecast demand"""
+    unknown = set(request.resources or []) - set(TRANSFER_RESOURCES)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown resources: {sorted(unknown)}. Use {list(TRANSFER_RESOURCES)}")
+    if request.max_km <= 0:
+        raise HTTPException(status_code=400, detail="max_km must be positive")
+    return await run_in_threadpool(build_plan, request)
+
+
+@router.get("/plan")
+def get_plan():
+    plan = load_plan()
+    if plan is None:
+        raise HTTPException(status_code=404, detail="No transfer plan yet")
+    return plan
@@ -0,0 +1,294 @@
+"""KD-tree over hospitals for "k nearest with spare capacity" queries.
+
+Hospitals are indexed by their position on the unit sphere (3-D), where
+straight-line distance orders points exactly like great-circle distance.
+Every tree node also stores the maximum available units of each resource in
+its subtree. A query for ">= N units of R" therefore skips whole subtrees
+without enough capacity, and a best-first search stops as soon as no
+remaining node can beat the k-th hospital found.
+
+A capacity update rewrites one row and the maxima on its leaf-to-root path,
+which is O(log n). Hospitals added or moved after a build go to a small
+overflow list that queries scan directly. The tree is rebuilt once that
+list grows past sqrt(n).
+"""
+
+import heapq
+import math
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Resource name -> column of hospital_capacity
+RESOURCES = {
+    "icu_beds": "available_icu_beds",
+    "ventilators": "available_ventilators",
+    "oxygen_cylinders": "available_oxygen_cylinders",
+    "doctors": "available_doctors",
+    "nurses": "available_nurses",
+    "beds": "available_beds",
+}
+RESOURCE_NAMES = list(RESOURCES)
+EARTH_RADIUS_KM = 6371.0088
+LEAF_SIZE = 64
+MIN_OVERFLOW = 64
+
+
+def to_unit_vectors(latitude, longitude) -> np.ndarray:
+    lat, lon = np.radians(np.asarray(latitude, dtype=float)), np.radians(np.asarray(longitude, dtype=float))
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+def chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(np.asarray(chord) / 2, 1.0))
+
+
+class KDTree:
+    """Static tree over a fixed point set; capacities stay mutable"""
+
+    def __init__(self, points: np.ndarray, capacity: np.ndarray, leaf_size: int = LEAF_SIZE):
+        n = len(points)
+        self.order = np.arange(n)
+        starts, ends, lefts, rights, parents = [], [], [], [], []
+
+        def build(start: int, end: int, parent: int) -> int:
+            node = len(starts)
+            starts.append(start)
+            ends.append(end)
+            lefts.append(-1)
+            rights.append(-1)
+            parents.append(parent)
+            if end - start > leaf_size:
+                idx = self.order[start:end]
+                spread = points[idx].max(axis=0) - points[idx].min(axis=0)
+                axis = int(np.argmax(spread))
+                mid = (end - start) // 2
+                part = np.argpartition(points[idx, axis], mid)
+                self.order[start:end] = idx[part]
+                lefts[node] = build(start, start + mid, node)
+                rights[node] = build(start + mid, end, node)
+            return node
+
+        if n:
+            build(0, n, -1)
+        self.start = np.array(starts, dtype=np.int64)
+        self.end = np.array(ends, dtype=np.int64)
+        self.left = np.array(lefts, dtype=np.int64)
+        self.right = np.array(rights, dtype=np.int64)
+        self.parent = np.array(parents, dtype=np.int64)
+
+        # Points and capacities stored in tree order so each leaf is one slice
+        self.points = points[self.order]
+        self.capacity = capacity[self.order].astype(np.float64)
+        self.position = np.empty(n, dtype=np.int64)
+        self.position[self.order] = np.arange(n)
+
+        nodes = len(starts)
+        self.lower = np.empty((nodes, 3))
+        self.upper = np.empty((nodes, 3))
+        self.max_capacity = np.empty((nodes, capacity.shape[1]))
+        self.leaf_of = np.empty(n, dtype=np.int64)
+        for node in range(nodes - 1, -1, -1):
+            # Children always come after their parent, so reverse order is bottom-up
+            if self.left[node] < 0:
+                s, e = self.start[node], self.end[node]
+                self.lower[node] = self.points[s:e].min(axis=0)
+                self.upper[node] = self.points[s:e].max(axis=0)
+                self.max_capacity[node] = self.capacity[s:e].max(axis=0)
+                self.leaf_of[s:e] = node
+            else:
+                l, r = self.left[node], self.right[node]
+                self.lower[node] = np.minimum(self.lower[l], self.lower[r])
+                self.upper[node] = np.maximum(self.upper[l], self.upper[r])
+                self.max_capacity[node] = np.maximum(self.max_capacity[l], self.max_capacity[r])
+
+        # Plain lists for the per-node work in query(), where numpy scalar access dominates
+        self._children = list(zip(self.left.tolist(), self.right.tolist()))
+        self._bounds = list(zip(self.lower.tolist(), self.upper.tolist()))
+
+    def set_capacity(self, row: int, values: np.ndarray) -> None:
+        """Update the capacity of input row `row` and the maxima above it"""
+        pos = self.position[row]
+        self.capacity[pos] = values
+        node = self.leaf_of[pos]
+        s, e = self.start[node], self.end[node]
+        self.max_capacity[node] = self.capacity[s:e].max(axis=0)
+        node = self.parent[node]
+        while node >= 0:
+            self.max_capacity[node] = np.maximum(self.max_capacity[self.left[node]],
+                                                 self.max_capacity[self.right[node]])
+            node = self.parent[node]
+
+    def _min_distance(self, node: int, point: Tuple[float, float, float]) -> float:
+        lower, upper = self._bounds[node]
+        total = 0.0
+        for p, lo, hi in zip(point, lower, upper):
+            gap = lo - p if p < lo else p - hi if p > hi else 0.0
+            total += gap * gap
+        return math.sqrt(total)
+
+    def query(self, point: np.ndarray, k: int, resource: int, min_units: float,
+              exclude: int = -1) -> List[Tuple[float, int]]:
+        """Up to k (chord distance, input row) pairs with capacity[resource] >= min_units"""
+        if not len(self.start) or self.max_capacity[0, resource] < min_units:
+            return []
+
+        max_capacity = self.max_capacity[:, resource]
+        xyz = tuple(point.tolist())
+        best: List[Tuple[float, int]] = []  # max-heap of (-distance, row)
+        frontier = [(0.0, 0)]
+        while frontier:
+            distance, node = heapq.heappop(frontier)
+            if len(best) == k and distance >= -best[0][0]:
+                break
+            left, right = self._children[node]
+            if left < 0:
+                s, e = self.start[node], self.end[node]
+                candidates = np.flatnonzero(self.capacity[s:e, resource] >= min_units) + s
+                if not len(candidates):
+                    continue
+                diff = self.points[candidates] - point
+                distances = np.sqrt(np.einsum("ij,ij->i", diff, diff))
+                for d, row in zip(distances.tolist(), self.order[candidates].tolist()):
+                    if row == exclude:
+                        continue
+                    if len(best) < k:
+                        heapq.heappush(best, (-d, row))
+                    elif d < -best[0][0]:
+                        heapq.heapreplace(best, (-d, row))
+                continue
+            for child in (left, right):
+                if max_capacity[child] >= min_units:
+                    child_distance = self._min_distance(child, xyz)
+                    if len(best) < k or child_distance < -best[0][0]:
+                        heapq.heappush(frontier, (child_distance, child))
+        return sorted((-d, row) for d, row in best)
+
+
+class HospitalIndex:
+    """Hospitals by location and spare capacity, updated as snapshots arrive"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tree: Optional[KDTree] = None
+        self._ids = np.empty(0, dtype=np.int64)        # input row -> hospital_id
+        self._row: Dict[int, int] = {}                  # hospital_id -> input row (tree)
+        self._coords: Dict[int, Tuple[float, float]] = {}
+        self._capacity: Dict[int, np.ndarray] = {}
+        self._overflow: Dict[int, np.ndarray] = {}      # hospital_id -> unit vector, not in tree
+        self.names: Dict[int, str] = {}
+        self.stats = {"builds": 0, "updates": 0, "queries": 0}
+
+    def __len__(self) -> int:
+        return len(self._coords)
+
+    def build(self, hospitals: List[Tuple[int, str, float, float, np.ndarray]]) -> None:
+        """Replace the index with (hospital_id, name, latitude, longitude, capacity) rows"""
+        with self._lock:
+            self.names = {h[0]: h[1] for h in hospitals}
+            self._coords = {h[0]: (h[2], h[3]) for h in hospitals}
+            self._capacity = {h[0]: np.asarray(h[4], dtype=np.float64) for h in hospitals}
+            self._rebuild()
+
+    def _rebuild(self) -> None:
+        ids = np.fromiter(self._coords, dtype=np.int64, count=len(self._coords))
+        coords = np.array([self._coords[i] for i in ids.tolist()]).reshape(-1, 2)
+        capacity = np.array([self._capacity[i] for i in ids.tolist()]).reshape(-1, len(RESOURCES))
+        self._tree = KDTree(to_unit_vectors(coords[:, 0], coords[:, 1]).reshape(-1, 3), capacity)
+        self._ids = ids
+        self._row = {hospital_id: row for row, hospital_id in enumerate(ids.tolist())}
+        self._overflow = {}
+        self.stats["builds"] += 1
+
+    def set_location(self, hospital_id: int, name: str, latitude: float, longitude: float) -> None:
+        with self._lock:
+            self.names[hospital_id] = name
+            self._coords[hospital_id] = (latitude, longitude)
+            self._capacity.setdefault(hospital_id, np.zeros(len(RESOURCES)))
+            if hospital_id in self._row:
+                # Moved: hide the stale tree entry, serve it from the overflow
+                self._tree.set_capacity(self._row.pop(hospital_id), np.full(len(RESOURCES), -np.inf))
+            self._overflow[hospital_id] = to_unit_vectors(latitude, longitude)
+            if len(self._overflow) > max(MIN_OVERFLOW, math.isqrt(len(self._coords))):
+                self._rebuild()
+
+    def set_capacity(self, hospital_id: int, available: Dict[str, float]) -> None:
+        """Update some of a hospital's available units, keyed by RESOURCES name"""
+        with self._lock:
+            values = self._capacity.setdefault(hospital_id, np.zeros(len(RESOURCES)))
+            for name, units in available.items():
+                if name in RESOURCES and units is not None:
+                    values[RESOURCE_NAMES.index(name)] = units
+            if hospital_id in self._row:
+                self._tree.set_capacity(self._row[hospital_id], values)
+            self.stats["updates"] += 1
+
+    def nearest(self, latitude: float, longitude: float, resource: str, min_units: float = 1,
+                k: int = 5, exclude: Optional[int] = None) -> List[Dict]:
+        """k nearest hospitals with at least min_units of resource available"""
+        r = RESOURCE_NAMES.index(resource)
+        point = to_unit_vectors(latitude, longitude)
+        with self._lock:
+            self.stats["queries"] += 1
+            exclude_row = self._row.get(exclude, -1) if exclude is not None else -1
+            found = []
+            if self._tree is not None:
+                found = [(d, int(self._ids[row])) for d, row in self._tree.query(point, k, r, min_units, exclude_row)]
+            for hospital_id, vector in self._overflow.items():
+                if hospital_id != exclude and self._capacity[hospital_id][r] >= min_units:
+                    found.append((float(np.linalg.norm(vector - point)), hospital_id))
+            found = sorted(found)[:k]
+
+            return [{
+                "hospital_id": hospital_id,
+                "hospital_name": self.names.get(hospital_id),
+                "distance_km": round(float(chord_to_km(chord)), 3),
+                "available": int(self._capacity[hospital_id][r]),
+            } for chord, hospital_id in found]
+
+    def location(self, hospital_id: int) -> Optional[Tuple[float, float]]:
+        return self._coords.get(hospital_id)
+
+
+def load_hospitals(conn: sqlite3.Connection) -> List[Tuple[int, str, float, float, np.ndarray]]:
+    """Geocoded hospitals joined with their latest reported capacity"""
+    columns = ", ".join(f"COALESCE(c.{column}, 0)" for column in RESOURCES.values())
+    rows = conn.execute(f"""
+        SELECT u.hospital_id, u.hospital_name, u.latitude, u.longitude, {columns}
+        FROM user u LEFT JOIN hospital_capacity c ON c.hospital_id = u.hospital_id
+        WHERE u.latitude IS NOT NULL AND u.longitude IS NOT NULL
+    """).fetchall()
+    return [(row[0], row[1], row[2], row[3], np.array(row[4:], dtype=np.float64)) for row in rows]
+
+
+hospital_index = HospitalIndex()
+_loaded = threading.Event()
+_load_lock = threading.Lock()
+
+
+def get_hospital_index(db_path: str = "db/covid_data.db") -> HospitalIndex:
+    """The shared index, loaded from the database on first use"""
+    if not _loaded.is_set():
+        with _load_lock:
+            if not _loaded.is_set():
+                conn = sqlite3.connect(db_path)
+                try:
+                    hospital_index.build(load_hospitals(conn))
+                finally:
+                    conn.close()
+                _loaded.set()
+    return hospital_index
+
+
+def update_location(hospital_id: int, name: str, latitude: float, longitude: float) -> None:
+    """Apply a new or changed location to the index if it has been loaded"""
+    if _loaded.is_set():
+        hospital_index.set_location(hospital_id, name, latitude, longitude)
+
+
+def update_capacity(hospital_id: int, available: Dict[str, float]) -> None:
+    """Apply a capacity report to the index if it has been loaded"""
+    if _loaded.is_set():
+        hospital_index.set_capacity(hospital_id, available)
@@ -0,0 +1,168 @@
+"""Keyset-paginated, streaming NDJSON/CSV export of the large tables.
+
+Rows are read in chunks of EXPORT_CHUNK_ROWS, each chunk its own
+`WHERE key > last ORDER BY key LIMIT n` query on the primary key, and
+encoded straight into the response. Memory stays at one chunk whatever
+the table size, and no read transaction is held between chunks, so a
+slow client never blocks ingest.
+
+A page ends after `limit` rows. Its cursor (the last key, base64 encoded)
+continues the export from the next row:
+    GET /api/export/forecasts?format=csv&limit=100000
+    GET /api/export/forecasts?format=csv&limit=100000&after=<X-Next-Cursor>
+"""
+
+import base64
+import csv
+import io
+import json
+import os
+import sqlite3
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", 5000))
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+
+class ExportTable(NamedTuple):
+    db: str
+    table: str
+    key: Tuple[str, ...]  # primary key, in export order; start/end filter its first column
+
+
+EXPORT_TABLES = {
+    "forecasts": ExportTable("db/dengue.db", "forecasts", ("forecast_date", "prediction_date")),
+    "hospital_resource_timeseries": ExportTable("db/dengue.db", "hospital_resource_timeseries", ("date",)),
+    "dengue_data": ExportTable("db/dengue.db", "dengue_data", ("date",)),
+    "bangalore_cases": ExportTable("db/covid_data.db", "bangalore_cases", ("date",)),
+}
+
+stats = {"exports": 0, "pages": 0, "chunks": 0, "rows": 0, "bytes": 0}
+
+
+class CursorError(ValueError):
+    pass
+
+
+def encode_cursor(key: tuple) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, spec: ExportTable) -> tuple:
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError as e:
+        raise CursorError(f"Malformed cursor: {e}") from e
+    if not isinstance(key, list) or len(key) != len(spec.key):
+        raise CursorError(f"Cursor must hold {len(spec.key)} key values")
+    return tuple(key)
+
+
+def _where(spec: ExportTable, after: Optional[tuple], start: Optional[str],
+           end: Optional[str]) -> Tuple[str, list]:
+    clauses, params = [], []
+    if after is not None:
+        # Row-value comparison follows the (composite) primary key order
+        clauses.append(f"({', '.join(spec.key)}) > ({', '.join('?' * len(spec.key))})")
+        params.extend(after)
+    if start is not None:
+        clauses.append(f"{spec.key[0]} >= ?")
+        params.append(start)
+    if end is not None:
+        # Dates may carry a time of day; include all of `end`
+        clauses.append(f"{spec.key[0]} < date(?, '+1 day')")
+        params.append(end)
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+def columns(conn: sqlite3.Connection, spec: ExportTable) -> List[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({spec.table})")]
+
+
+def next_cursor(conn: sqlite3.Connection, spec: ExportTable, after: Optional[tuple], limit: int,
+                start: Optional[str] = None, end: Optional[str] = None) -> Optional[str]:
+    """Cursor for the page after `limit` rows from `after`, or None if that page ends the export
+
+    Walks only the primary-key index, so the header can be sent before the rows.
+    """
+    where, params = _where(spec, after, start, end)
+    keys = ", ".join(spec.key)
+    rows = conn.execute(f"SELECT {keys} FROM {spec.table}{where} ORDER BY {keys} LIMIT 1 OFFSET ?",
+                        params + [limit - 1]).fetchone()
+    if rows is None:
+        return None
+    more_where, more_params = _where(spec, tuple(rows), start, end)
+    if conn.execute(f"SELECT 1 FROM {spec.table}{more_where} LIMIT 1", more_params).fetchone() is None:
+        return None
+    return encode_cursor(tuple(rows))
+
+
+def iter_chunks(conn: sqlite3.Connection, spec: ExportTable, names: List[str], after: Optional[tuple] = None,
+                limit: Optional[int] = None, start: Optional[str] = None, end: Optional[str] = None,
+                chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[List[tuple]]:
+    """Lists of up to chunk_rows rows (names, in key order), one keyset query per chunk"""
+    key_index = [names.index(column) for column in spec.key]
+    keys = ", ".join(spec.key)
+    remaining = limit
+    while remaining is None or remaining > 0:
+        size = chunk_rows if remaining is None else min(chunk_rows, remaining)
+        where, params = _where(spec, after, start, end)
+        rows = conn.execute(f"SELECT {', '.join(names)} FROM {spec.table}{where} ORDER BY {keys} LIMIT ?",
+                            params + [size]).fetchall()
+        if not rows:
+            return
+        stats["chunks"] += 1
+        stats["rows"] += len(rows)
+        yield rows
+        if len(rows) < size:
+            return
+        after = tuple(rows[-1][i] for i in key_index)
+        if remaining is not None:
+            remaining -= len(rows)
+
+
+def encode_chunk(rows: List[tuple], names: List[str], fmt: str) -> bytes:
+    if fmt == "csv":
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerows(rows)
+        return buffer.getvalue().encode()
+    return "".join(json.dumps(dict(zip(names, row))) + "\n" for row in rows).encode()
+
+
+def stream_export(name: str, fmt: str = "ndjson", after: Optional[str] = None, limit: Optional[int] = None,
+                  start: Optional[str] = None, end: Optional[str] = None) -> Tuple[Dict[str, str], Iterator[bytes]]:
+    """(response headers, body iterator) for one page (or all) of an export
+
+    Raises KeyError for an unknown table and CursorError for a bad cursor.
+    The iterator owns its connection and closes it when exhausted or closed.
+    """
+    spec = EXPORT_TABLES[name]
+    key = decode_cursor(after, spec) if after else None
+
+    conn = sqlite3.connect(spec.db, check_same_thread=False)
+    try:
+        names = columns(conn, spec)
+        headers = {"Content-Disposition": f'attachment; filename="{name}.{fmt}"'}
+        if limit is not None:
+            cursor = next_cursor(conn, spec, key, limit, start, end)
+            if cursor is not None:
+                headers["X-Next-Cursor"] = cursor
+    except Exception:
+        conn.close()
+        raise
+    stats["exports" if key is None else "pages"] += 1
+
+    def body() -> Iterator[bytes]:
+        try:
+            if fmt == "csv":
+                header = encode_chunk([names], names, fmt)
+                stats["bytes"] += len(header)
+                yield header
+            for rows in iter_chunks(conn, spec, names, key, limit, start, end):
+                data = encode_chunk(rows, names, fmt)
+                stats["bytes"] += len(data)
+                yield data
+        finally:
+            conn.close()
+
+    return headers, body()
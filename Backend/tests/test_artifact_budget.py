@@ -0,0 +1,37 @@
+"""Saved model artifacts stay within their size budgets and forecast like the models they came from.
+
+benchmarks/artifact_budget.py prints the same comparison, with load times
+and allocations.
+"""
+
+import pytest
+
+pytest.importorskip("sklearn")
+pytest.importorskip("statsmodels")
+
+from benchmarks.artifact_budget import compare, synthetic_daily_hospitalized, synthetic_weekly_dengue
+from forecasting import DengueForecastingSystem
+from forecasting_covid import CovidForecastModel
+from model_artifacts import (
+    COVID_MAX_BYTES, DENGUE_MAX_BYTES,
+    load_covid_artifact, load_dengue_artifact,
+    save_covid_artifact, save_dengue_artifact,
+)
+
+
+def test_covid_artifact_budget(tmp_path):
+    covid = CovidForecastModel()
+    covid.run_pipeline(synthetic_daily_hospitalized())
+    assert compare(
+        "covid_forecaster", covid, save_covid_artifact, load_covid_artifact, COVID_MAX_BYTES,
+        lambda m: [f["predicted_cases"] for f in m.get_forecast(steps=8)["forecasts"]], str(tmp_path),
+    ) == []
+
+
+def test_dengue_artifact_budget(tmp_path):
+    dengue = DengueForecastingSystem(df=synthetic_weekly_dengue())
+    dengue.train_ensemble()
+    assert compare(
+        "dengue_forecaster", dengue, save_dengue_artifact, load_dengue_artifact, DENGUE_MAX_BYTES,
+        lambda m: m.forecast(weeks=8)["cases_predicted"].to_numpy(), str(tmp_path),
+    ) == []
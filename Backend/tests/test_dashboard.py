@@ -0,0 +1,30 @@
+"""Dashboard section caching."""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("matplotlib")
+
+from routes import dashboard
+
+
+def test_error_payload_is_not_cached(monkeypatch):
+    monkeypatch.setattr(dashboard, "_section_cache", {})
+    calls = []
+
+    async def failing(memo):
+        calls.append(1)
+        return {"error": "no data"}
+
+    async def run():
+        return await dashboard.run_section("covid", "national_summary", failing, dashboard.RequestMemo())
+
+    first = asyncio.run(run())
+    second = asyncio.run(run())
+
+    assert first == {"status": "error", "detail": "no data"}
+    assert second == first
+    assert len(calls) == 2
+    assert dashboard._section_cache == {}
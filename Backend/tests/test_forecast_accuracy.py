@@ -0,0 +1,66 @@
+"""The accuracy ledger scores forecasts written by the real /dengue/predict path."""
+
+import os
+import sqlite3
+from datetime import date
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("sklearn")
+
+from benchmarks import synthetic
+from forecast_accuracy import check_consistency, compact_forecasts
+
+
+@pytest.fixture
+def dengue_db(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("db")
+    from database import DATABASE_PATH, init_db
+    init_db()
+    conn = sqlite3.connect(DATABASE_PATH)
+    synthetic.dengue_data(260).to_sql("dengue_data", conn, if_exists="append", index=False)
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def test_stored_forecasts_are_scored_when_actuals_arrive(dengue_db, monkeypatch):
+    from forecasting import DengueForecastingSystem
+    from routes import dengue
+
+    history = synthetic.dengue_data(260)
+    system = DengueForecastingSystem(df=history)
+    system.train_ensemble()
+    monkeypatch.setattr(dengue, "forecaster", system)
+
+    stored = dengue.forecast_and_store(dengue_db, weeks=4)
+    dengue_db.commit()
+    targets = [row["prediction_date"] for row in stored]
+    assert targets == [row[0] for row in dengue_db.execute(
+        "SELECT prediction_date FROM forecasts ORDER BY prediction_date")]
+    assert all(len(target) == len("2020-01-05") for target in targets)
+
+    for target in targets:
+        dengue_db.execute("INSERT INTO dengue_data VALUES (?, ?, ?)", (target, 50, 100.0))
+    dengue_db.commit()
+
+    scored = dengue_db.execute("SELECT target, actual FROM forecast_errors ORDER BY target").fetchall()
+    assert scored == [(target, 50.0) for target in targets]
+    assert check_consistency(dengue_db, "dengue") == []
+
+    # Compaction keeps the scores of the rows it drops
+    assert compact_forecasts(dengue_db, "dengue", retention_days=1, today=date(2100, 1, 1)) == len(targets)
+    assert dengue_db.execute("SELECT COUNT(*) FROM forecast_errors").fetchone()[0] == len(targets)
+
+
+def test_compaction_keeps_forecasts_waiting_for_an_actual(dengue_db):
+    last = dengue_db.execute("SELECT MAX(date) FROM dengue_data").fetchone()[0]
+    dengue_db.execute("INSERT INTO forecasts VALUES ('2015-01-01', ?, 10, 5, 15)", (last + " 00:00:00",))
+    dengue_db.execute("INSERT INTO forecasts VALUES ('2015-01-01', '2100-01-03 00:00:00', 10, 5, 15)")
+    dengue_db.commit()
+
+    assert compact_forecasts(dengue_db, "dengue", retention_days=1, today=date(2050, 1, 1)) == 1
+    assert dengue_db.execute("SELECT prediction_date FROM forecasts").fetchall() == [("2100-01-03 00:00:00",)]
+    assert dengue_db.execute("SELECT target FROM forecast_errors").fetchall() == [(last,)]
@@ -0,0 +1,87 @@
+"""Concurrent training and saving of a shared model in one worker."""
+
+import os
+import sqlite3
+import threading
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("starlette")
+
+from model_artifacts import _read_artifact, _write_artifact
+from model_registry import SharedModel, claim_training, install_model_versions
+
+
+def save(value, path):
+    _write_artifact(path, "test", {"values": np.full(1000, value)}, {"value": value}, {}, 1 << 20)
+
+
+def load(path):
+    return _read_artifact(path, "test")[1]["value"]
+
+
+def test_concurrent_saves_of_one_artifact(tmp_path):
+    path = str(tmp_path / "artifacts" / "model")
+    errors = []
+
+    def saves(offset):
+        for i in range(60):
+            try:
+                save(offset + i, path)
+            except Exception as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=saves, args=(offset,)) for offset in (0, 1000)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert load(path) in (59, 1059)
+    assert os.listdir(tmp_path / "artifacts") == ["model"]
+
+
+@pytest.fixture
+def shared(tmp_path):
+    db_path = str(tmp_path / "models.db")
+    conn = sqlite3.connect(db_path)
+    install_model_versions(conn)
+    conn.close()
+    return SharedModel("test-model", str(tmp_path / "model"), load, db_path=db_path)
+
+
+def test_forced_and_leased_training_do_not_overlap(shared):
+    running, overlaps = [], []
+
+    def fit():
+        running.append(1)
+        overlaps.append(len(running))
+        threading.Event().wait(0.05)
+        running.pop()
+        return 1
+
+    threads = [threading.Thread(target=shared.train, args=(fit, save), kwargs={"force": force})
+               for force in (False, True, True)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert overlaps and max(overlaps) == 1
+
+
+def test_failed_forced_fit_keeps_another_workers_lease(shared):
+    conn = sqlite3.connect(shared.db_path)
+    assert claim_training(conn, shared.name)
+
+    def fit():
+        raise RuntimeError("fit failed")
+
+    with pytest.raises(RuntimeError):
+        shared.train(fit, save, force=True)
+    assert not claim_training(conn, shared.name)
+    assert shared.stats["training_errors"] == 1
+    assert shared.last_training_error == "RuntimeError('fit failed')"
+    conn.close()
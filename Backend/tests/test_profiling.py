@@ -0,0 +1,41 @@
+"""cprofile captures of stages that run in worker threads."""
+
+import contextvars
+import threading
+
+import profiling
+
+
+def busy_stage():
+    return sum(i * i for i in range(20000))
+
+
+def run_stage(errors):
+    token = profiling.enter_stage()
+    try:
+        busy_stage()
+    finally:
+        profiling.exit_stage(token)
+    if getattr(profiling._thread_state, "profiling", False):
+        errors.append("worker thread left marked as profiling")
+
+
+def test_worker_thread_stage_is_profiled():
+    capture = profiling.CProfileCapture.try_start()
+    assert capture is not None
+    token = profiling._capture.set(capture)
+    errors = []
+    try:
+        thread = threading.Thread(target=contextvars.copy_context().run, args=(run_stage, errors))
+        thread.start()
+        thread.join()
+    finally:
+        profiling._capture.reset(token)
+        stats = capture.stop()
+
+    assert errors == []
+    assert any(func[2] == "busy_stage" for func in stats.stats)
+    # The capture slot is free again
+    next_capture = profiling.CProfileCapture.try_start()
+    assert next_capture is not None
+    next_capture.stop()
@@ -0,0 +1,54 @@
+"""Utilization reads over the rollups, with open-ended ranges and after compaction."""
+
+import os
+import sqlite3
+from datetime import date, timedelta
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from resource_rollup import choose_tier, compact, raw_since, read_utilization
+
+FIRST_DAY = date(2026, 8, 1)
+DAYS = 76
+
+
+@pytest.fixture
+def conn(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("db")
+    from database import DATABASE_PATH, init_db
+    init_db()
+    conn = sqlite3.connect(DATABASE_PATH)
+    conn.executemany(
+        "INSERT INTO hospital_resource_timeseries (date, total_beds, occupied_beds) VALUES (?, 100, ?)",
+        [((FIRST_DAY + timedelta(days=i)).isoformat(), 40 + i % 20) for i in range(DAYS)])
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+@pytest.mark.parametrize("resolution_days, tier", [(7, "week"), (31, "month")])
+def test_open_ended_ranges(conn, resolution_days, tier):
+    last_day = (FIRST_DAY + timedelta(days=DAYS - 1)).isoformat()
+    bounded = read_utilization(conn, FIRST_DAY.isoformat(), last_day, resolution_days, ["beds"])
+    assert bounded["tier"] == tier
+    periods = bounded["series"]["beds"]["period"]
+    assert periods
+
+    for start, end in [(None, None), (FIRST_DAY.isoformat(), None), (None, last_day)]:
+        result = read_utilization(conn, start, end, resolution_days, ["beds"])
+        assert result["tier"] == tier
+        assert result["series"]["beds"]["period"] == periods
+
+
+def test_compaction_without_old_rows_keeps_raw_reads(conn):
+    assert compact(conn, retention_days=180, today=FIRST_DAY + timedelta(days=DAYS)) == 0
+    assert raw_since(conn) is None
+    assert choose_tier(conn, None, 0) == "raw"
+    assert len(read_utilization(conn, None, None, 0, ["beds"])["series"]["beds"]["period"]) == DAYS
+
+    assert compact(conn, retention_days=30, today=FIRST_DAY + timedelta(days=DAYS)) > 0
+    assert raw_since(conn) is not None
+    assert choose_tier(conn, None, 0) == "week"
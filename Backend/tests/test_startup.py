@@ -0,0 +1,34 @@
+"""`import main` stays cheap: no heavy libraries, and within the startup budget.
+
+benchmarks/startup_bench.py measures the same against a seeded working
+directory, plus the time to the first 200 from a real server.
+"""
+
+import os
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from benchmarks.startup_bench import IMPORT_BUDGET_S, imported_heavy_modules, time_python
+
+
+@pytest.fixture
+def workdir(tmp_path):
+    # The directories main.py expects; the databases are created on import
+    for name in ("db", "data", "static", "cache"):
+        os.makedirs(tmp_path / name)
+    return str(tmp_path)
+
+
+def test_import_main_loads_no_heavy_modules(workdir):
+    assert imported_heavy_modules(workdir) == []
+
+
+def test_import_main_within_budget(workdir):
+    # The first import creates the databases, as on a fresh deployment; time the ones after it
+    time_python(workdir, "import main")
+    interpreter = min(time_python(workdir, "pass") for _ in range(3))
+    # Best of three, so a stall on a busy machine does not fail the budget
+    import_s = min(time_python(workdir, "import main") for _ in range(3)) - interpreter
+    assert import_s < IMPORT_BUDGET_S
@@ -0,0 +1,250 @@
+"""Minimum-cost transfers of scarce resources between hospitals.
+
+For each resource, hospitals whose availability exceeds their forecast
+demand (predicted cases x RESOURCE_USAGE rate) are suppliers, and the rest
+are in deficit. Moving one unit costs the great-circle distance in km. Each
+resource is a transportation problem:
+
+    minimise   sum(distance[a] * flow[a]) + UNMET_PENALTY_KM * sum(unmet[j])
+    subject to outflow(i) <= surplus(i)                for every supplier i
+               inflow(j) + unmet[j] = deficit(j)       for every hospital j in deficit
+               flow, unmet >= 0
+
+The problem is kept sparse: each deficit hospital starts out connected to
+its TRANSFER_NEIGHBOURS nearest suppliers within TRANSFER_MAX_KM (found with
+a KD-tree), and further arcs are priced in from the LP duals only where
+they can lower the cost (see solve_resource). It is solved with HiGHS dual
+simplex, whose vertex solutions are integral for integer supplies and
+deficits.
+
+Warm start: given the previous plan, its transfers that still fit today's
+surplus and deficit are kept as they are, its arcs are added to the
+candidate set, and only the residual problem is solved. Plans therefore
+stay stable from day to day, and the LP shrinks to what actually changed.
+"""
+
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from overload_risk import RESOURCE_USAGE
+from spatial_index import chord_to_km, to_unit_vectors
+
+TRANSFER_MAX_KM = float(os.getenv("TRANSFER_MAX_KM", 300))
+TRANSFER_NEIGHBOURS = int(os.getenv("TRANSFER_NEIGHBOURS", 12))
+TRANSFER_PLAN_PATH = os.getenv("TRANSFER_PLAN_PATH", "cache/transfer_plan.json")
+UNMET_PENALTY_KM = 10 * TRANSFER_MAX_KM
+MAX_PRICING_ROUNDS = 20
+
+# Transferable resource -> (hospital_capacity column, RESOURCE_USAGE rate)
+TRANSFER_RESOURCES = {
+    "ventilators": ("available_ventilators", "ventilator_rate"),
+    "oxygen_cylinders": ("available_oxygen_cylinders", "oxygen_rate"),
+    "doctors": ("available_doctors", "doctor_rate"),
+    "nurses": ("available_nurses", "nurse_rate"),
+}
+
+
+class TransferError(Exception):
+    """The LP solver failed on a transfer problem"""
+
+
+def _km_to_chord(km: float) -> float:
+    return 2 * np.sin(min(km / (2 * 6371.0088), np.pi / 2))
+
+
+def _solve_lp(arcs: np.ndarray, cost: np.ndarray, suppliers: np.ndarray, consumers: np.ndarray,
+              surplus: np.ndarray, deficit: np.ndarray, n: int):
+    from scipy import sparse
+    from scipy.optimize import linprog
+
+    # Variables: one flow per arc, then one unmet-demand slack per consumer
+    m, c = len(arcs), len(consumers)
+    supplier_row = np.full(n, -1)
+    supplier_row[suppliers] = np.arange(len(suppliers))
+    consumer_row = np.full(n, -1)
+    consumer_row[consumers] = np.arange(c)
+
+    a_ub = sparse.csr_matrix((np.ones(m), (supplier_row[arcs[:, 0]], np.arange(m))), shape=(len(suppliers), m + c))
+    a_eq = sparse.csr_matrix(
+        (np.ones(m + c), (np.concatenate([consumer_row[arcs[:, 1]], np.arange(c)]), np.arange(m + c))),
+        shape=(c, m + c))
+    objective = np.concatenate([cost, np.full(c, UNMET_PENALTY_KM)])
+
+    result = linprog(objective, A_ub=a_ub, b_ub=surplus[suppliers], A_eq=a_eq, b_eq=deficit[consumers],
+                     bounds=(0, None), method="highs-ds")
+    if result.status != 0:
+        raise TransferError(result.message)
+    return result
+
+
+def solve_resource(points: np.ndarray, surplus: np.ndarray, deficit: np.ndarray,
+                   extra_arcs: Optional[np.ndarray] = None, max_km: float = TRANSFER_MAX_KM,
+                   neighbours: int = TRANSFER_NEIGHBOURS) -> Dict:
+    """Optimal flows for one resource; surplus/deficit are per-hospital unit counts
+
+    Starts from a sparse arc set and adds arcs by column generation: with
+    duals v (deficit rows) and u <= 0 (supply rows), an arc i->j can only
+    improve the plan if distance(i, j) < v[j] + u[i]. Each round therefore
+    ball-queries suppliers within v[j] km of each consumer and adds the arcs
+    with negative reduced cost, until there are none (optimal over all arcs
+    within max_km).
+
+    Returns {"arcs": (m, 2) source/destination rows, "flow": (m,), "unmet": (n,),
+    "cost_km": total unit-km moved, "variables": final LP size, "rounds": LP solves}.
+    """
+    from scipy.spatial import cKDTree
+
+    n = len(points)
+    suppliers = np.flatnonzero(surplus > 0)
+    consumers = np.flatnonzero(deficit > 0)
+    unmet = np.zeros(n)
+    empty = {"arcs": np.empty((0, 2), dtype=np.int64), "flow": np.empty(0), "unmet": unmet,
+             "cost_km": 0.0, "variables": 0, "rounds": 0}
+    if not len(consumers):
+        return empty
+    if not len(suppliers):
+        unmet[consumers] = deficit[consumers]
+        return {**empty, "unmet": unmet}
+
+    # Initial arcs: nearest suppliers of each consumer, plus the warm-start arcs
+    tree = cKDTree(points[suppliers])
+    k = min(neighbours, len(suppliers))
+    distances, nearest = tree.query(points[consumers], k=k, distance_upper_bound=_km_to_chord(max_km))
+    distances, nearest = distances.reshape(len(consumers), k), nearest.reshape(len(consumers), k)
+    found = np.isfinite(distances)
+    arcs = np.column_stack([suppliers[nearest[found]], np.repeat(consumers, k).reshape(-1, k)[found]])
+    if extra_arcs is not None and len(extra_arcs):
+        useful = (surplus[extra_arcs[:, 0]] > 0) & (deficit[extra_arcs[:, 1]] > 0)
+        arcs = np.unique(np.vstack([arcs, extra_arcs[useful]]), axis=0)
+
+    supplier_dual = np.zeros(n)
+    rounds = 0
+    while True:
+        cost = chord_to_km(np.linalg.norm(points[arcs[:, 0]] - points[arcs[:, 1]], axis=1))
+        result = _solve_lp(arcs, cost, suppliers, consumers, surplus, deficit, n)
+        rounds += 1
+        if rounds >= MAX_PRICING_ROUNDS:
+            break
+
+        consumer_dual = result.eqlin.marginals
+        supplier_dual[suppliers] = result.ineqlin.marginals
+        pricing = np.flatnonzero(consumer_dual > 1e-9)
+        if not len(pricing):
+            break
+        radius = np.array([_km_to_chord(km) for km in np.minimum(consumer_dual[pricing], max_km)])
+        reachable = tree.query_ball_point(points[consumers[pricing]], radius)
+
+        known = set((arcs[:, 0] * n + arcs[:, 1]).tolist())
+        new_arcs = []
+        for j, v, candidates in zip(consumers[pricing].tolist(), consumer_dual[pricing].tolist(), reachable):
+            if not candidates:
+                continue
+            sources = suppliers[candidates]
+            reduced = (chord_to_km(np.linalg.norm(points[sources] - points[j], axis=1))
+                       - v - supplier_dual[sources])
+            # Only the most promising few per consumer, to keep the LP small
+            best = np.argsort(reduced)[:neighbours]
+            for i in sources[best[reduced[best] < -1e-6]].tolist():
+                if i * n + j not in known:
+                    new_arcs.append((i, j))
+        if not new_arcs:
+            break
+        arcs = np.vstack([arcs, np.array(new_arcs, dtype=np.int64)])
+
+    m = len(arcs)
+    flow = np.round(result.x[:m])
+    unmet[consumers] = np.round(result.x[m:])
+    used = flow > 0
+    return {
+        "arcs": arcs[used],
+        "flow": flow[used],
+        "unmet": unmet,
+        "cost_km": float(cost[used] @ flow[used]),
+        "variables": m + len(consumers),
+        "rounds": rounds,
+    }
+
+
+def plan_transfers(hospital_ids: np.ndarray, latitude: np.ndarray, longitude: np.ndarray,
+                   available: Dict[str, np.ndarray], predicted_cases: np.ndarray,
+                   previous: Optional[Dict] = None, resources: Optional[List[str]] = None,
+                   max_km: float = TRANSFER_MAX_KM, neighbours: int = TRANSFER_NEIGHBOURS) -> Dict:
+    """Transfer plan for all hospitals; `previous` is an earlier plan to warm-start from"""
+    start = time.perf_counter()
+    hospital_ids = np.asarray(hospital_ids)
+    points = to_unit_vectors(latitude, longitude).reshape(-1, 3)
+    row_of = {int(hospital_id): row for row, hospital_id in enumerate(hospital_ids.tolist())}
+
+    transfers, unmet_totals, stats = [], {}, {}
+    for resource in resources or list(TRANSFER_RESOURCES):
+        _, rate = TRANSFER_RESOURCES[resource]
+        demand = np.ceil(np.asarray(predicted_cases, dtype=float) * RESOURCE_USAGE[rate])
+        balance = np.asarray(available[resource], dtype=float) - demand
+        surplus, deficit = np.maximum(balance, 0), np.maximum(-balance, 0)
+
+        # Warm start: keep yesterday's transfers that still fit, solve the rest
+        kept, previous_arcs = [], []
+        for t in (previous or {}).get("transfers", []):
+            if t["resource"] != resource or t["from"] not in row_of or t["to"] not in row_of:
+                continue
+            i, j = row_of[t["from"]], row_of[t["to"]]
+            previous_arcs.append((i, j))
+            units = min(t["units"], surplus[i], deficit[j])
+            if units > 0:
+                surplus[i] -= units
+                deficit[j] -= units
+                kept.append((i, j, units))
+
+        solved = solve_resource(points, surplus, deficit,
+                                np.array(previous_arcs, dtype=np.int64).reshape(-1, 2), max_km, neighbours)
+
+        moves: Dict[tuple, float] = {}
+        for i, j, units in kept:
+            moves[(i, j)] = moves.get((i, j), 0) + units
+        for (i, j), units in zip(solved["arcs"].tolist(), solved["flow"].tolist()):
+            moves[(i, j)] = moves.get((i, j), 0) + units
+
+        for (i, j), units in sorted(moves.items()):
+            transfers.append({
+                "resource": resource,
+                "from": int(hospital_ids[i]),
+                "to": int(hospital_ids[j]),
+                "units": int(units),
+                "distance_km": round(float(chord_to_km(np.linalg.norm(points[i] - points[j]))), 2),
+            })
+        unmet_totals[resource] = int(solved["unmet"].sum())
+        stats[resource] = {
+            "deficit_hospitals": int((balance < 0).sum()),
+            "kept_units": int(sum(units for _, _, units in kept)),
+            "lp_variables": solved["variables"],
+            "lp_rounds": solved["rounds"],
+        }
+
+    return {
+        "created_at": time.time(),
+        "transfers": transfers,
+        "total_unit_km": round(sum(t["units"] * t["distance_km"] for t in transfers), 2),
+        "unmet": unmet_totals,
+        "stats": stats,
+        "solve_seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def save_plan(plan: Dict, path: str = TRANSFER_PLAN_PATH) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "w") as f:
+        json.dump(plan, f)
+    os.replace(tmp_path, path)
+
+
+def load_plan(path: str = TRANSFER_PLAN_PATH) -> Optional[Dict]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
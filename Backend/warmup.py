@@ -0,0 +1,75 @@
+"""Background pre-warming of the heavy libraries, after the server is ready.
+
+Route modules import pandas, sklearn, statsmodels, scipy and requests only
+inside the code paths that use them, so `import main` and startup stay
+fast. Left alone, the first request down each path would then pay for the
+import. With PREWARM_ENABLED, those imports (and the chart worker
+processes) are loaded in the background once startup has finished, so
+the server answers immediately and the first requests rarely wait.
+
+Set PREWARM_ENABLED=0 to load everything on first use instead, e.g. for
+short-lived workers or when measuring cold paths.
+"""
+
+import asyncio
+import importlib
+import os
+import time
+from typing import Dict, List
+
+import chart_renderer
+
+PREWARM_ENABLED = os.getenv("PREWARM_ENABLED", "1") == "1"
+PREWARM_DELAY = float(os.getenv("PREWARM_DELAY", 1.0))
+
+# Cheapest and most widely used first
+PREWARM_MODULES = [
+    "pandas",
+    "requests",
+    "forecasting",
+    "sklearn.metrics",
+    "sklearn.ensemble",
+    "statsmodels.tsa.arima.model",
+    "scipy.optimize",
+    "scipy.spatial",
+]
+
+stats = {"modules": {}, "charts_s": None}
+_task = None
+
+
+def import_modules(modules: List[str] = PREWARM_MODULES) -> Dict[str, float]:
+    """Import each module, returning the seconds each one took (0 if already loaded)"""
+    timings = {}
+    for name in modules:
+        start = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            continue
+        timings[name] = round(time.perf_counter() - start, 4)
+    return timings
+
+
+async def _prewarm() -> None:
+    # Let startup finish and the server start accepting connections first
+    await asyncio.sleep(PREWARM_DELAY)
+    loop = asyncio.get_running_loop()
+    stats["modules"] = await loop.run_in_executor(None, import_modules)
+    start = time.perf_counter()
+    await chart_renderer.start()
+    stats["charts_s"] = round(time.perf_counter() - start, 4)
+
+
+def start() -> None:
+    """Schedule pre-warming on the running loop, if enabled"""
+    global _task
+    if PREWARM_ENABLED and _task is None:
+        _task = asyncio.get_running_loop().create_task(_prewarm())
+
+
+def stop() -> None:
+    global _task
+    if _task is not None:
+        _task.cancel()
+        _task = None
@@ -0,0 +1,150 @@
+"""Incrementally maintained weekly rollup of daily hospitalizations.
+
+weekly_hospitalized holds one row per (region, week), where week is the
+W-SUN period end (the Sunday closing the week, as pandas resample labels
+it). Triggers on the daily table recompute only the week a written row
+falls in, from at most seven daily rows, so the forecaster reads ready
+weekly totals instead of re-aggregating the whole daily history.
+
+Check the rollup against a full re-aggregation:
+    python weekly_rollup.py
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import sys
+from typing import TYPE_CHECKING, List
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+WEEKLY_SPECS = {
+    "bangalore": {"db": "db/covid_data.db", "table": "bangalore_cases", "date_column": "date",
+                  "value_column": "hospitalized"},
+}
+
+
+def _week_end(date_expr: str) -> str:
+    # 'weekday 0' moves forward to the next Sunday, or stays on a Sunday
+    return f"date({date_expr}, 'weekday 0')"
+
+
+def _recompute_week_sql(region: str, spec, date_expr: str) -> str:
+    """Re-sum the week containing date_expr; drops the row if the week is now empty"""
+    table, date_column, value_column = spec["table"], spec["date_column"], spec["value_column"]
+    week = _week_end(date_expr)
+    in_week = (f"{date_column} >= date({week}, '-6 days') "
+               f"AND {date_column} < date({week}, '+1 day')")
+    return f"""
+        INSERT INTO weekly_hospitalized (region, week, hospitalized, days)
+        SELECT '{region}', {week}, COALESCE(SUM({value_column}), 0), COUNT(*)
+        FROM {table} WHERE {in_week}
+        ON CONFLICT (region, week) DO UPDATE SET
+            hospitalized = excluded.hospitalized, days = excluded.days;
+        DELETE FROM weekly_hospitalized WHERE region = '{region}' AND week = {week} AND days = 0;
+    """
+
+
+def install_weekly_rollup(conn: sqlite3.Connection, region: str) -> None:
+    """Create weekly_hospitalized and the triggers for one region, then backfill it"""
+    spec = WEEKLY_SPECS[region]
+    table, date_column, value_column = spec["table"], spec["date_column"], spec["value_column"]
+
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS weekly_hospitalized (
+        region TEXT,
+        week TEXT,
+        hospitalized INTEGER,
+        days INTEGER,
+        PRIMARY KEY (region, week)
+    )
+    """)
+
+    # Recomputing (rather than adding deltas) keeps INSERT OR REPLACE and
+    # re-sent days from being counted twice
+    conn.executescript(f"""
+    BEGIN;  -- committed with the backfill below
+    DROP TRIGGER IF EXISTS weekly_{region}_insert;
+    DROP TRIGGER IF EXISTS weekly_{region}_update;
+    DROP TRIGGER IF EXISTS weekly_{region}_delete;
+
+    CREATE TRIGGER weekly_{region}_insert AFTER INSERT ON {table}
+    BEGIN
+        {_recompute_week_sql(region, spec, f"NEW.{date_column}")}
+    END;
+
+    CREATE TRIGGER weekly_{region}_update AFTER UPDATE OF {date_column}, {value_column} ON {table}
+    BEGIN
+        {_recompute_week_sql(region, spec, f"OLD.{date_column}")}
+        {_recompute_week_sql(region, spec, f"NEW.{date_column}")}
+    END;
+
+    CREATE TRIGGER weekly_{region}_delete AFTER DELETE ON {table}
+    BEGIN
+        {_recompute_week_sql(region, spec, f"OLD.{date_column}")}
+    END;
+    """)
+
+    # Backfill (or repair) from the daily table
+    conn.execute("DELETE FROM weekly_hospitalized WHERE region = ?", (region,))
+    conn.execute(f"""
+        INSERT INTO weekly_hospitalized (region, week, hospitalized, days)
+        SELECT '{region}', {_week_end(date_column)}, SUM({value_column}), COUNT(*)
+        FROM {table} GROUP BY 2
+    """)
+    conn.commit()
+
+
+def read_weekly(conn: sqlite3.Connection, region: str) -> pd.DataFrame:
+    """Week / Weekly_Hospitalized, oldest first, as aggregate_to_weekly returns it
+
+    Weeks without any daily rows are filled with 0, like resample('W-SUN').sum().
+    """
+    import pandas as pd
+
+    rows = conn.execute(
+        "SELECT week, hospitalized FROM weekly_hospitalized WHERE region = ? ORDER BY week", (region,)
+    ).fetchall()
+    if not rows:
+        return pd.DataFrame({"Week": pd.to_datetime([]), "Weekly_Hospitalized": pd.Series([], dtype="int64")})
+
+    weekly = pd.Series([value for _, value in rows], index=pd.to_datetime([week for week, _ in rows]))
+    weeks = pd.date_range(weekly.index[0], weekly.index[-1], freq="W-SUN")
+    weekly = weekly.reindex(weeks, fill_value=0)
+    return pd.DataFrame({"Week": weeks, "Weekly_Hospitalized": weekly.to_numpy(dtype="int64")})
+
+
+def check_consistency(conn: sqlite3.Connection, region: str) -> List[str]:
+    """Weeks where the rollup differs from a full re-aggregation; empty if consistent"""
+    import pandas as pd
+
+    spec = WEEKLY_SPECS[region]
+    daily = pd.read_sql(f"SELECT {spec['date_column']}, {spec['value_column']} FROM {spec['table']}", conn)
+    expected = (daily.set_index(pd.to_datetime(daily[spec["date_column"]]))[spec["value_column"]]
+                .resample("W-SUN").sum())
+    actual = read_weekly(conn, region).set_index("Week")["Weekly_Hospitalized"]
+
+    problems = []
+    for week in expected.index.union(actual.index):
+        want, got = expected.get(week), actual.get(week)
+        if want != got:
+            problems.append(f"{region} {week.date()}: rollup={got} expected={want}")
+    return problems
+
+
+if __name__ == "__main__":
+    problems = []
+    for region, spec in WEEKLY_SPECS.items():
+        conn = sqlite3.connect(spec["db"])
+        try:
+            found = check_consistency(conn, region)
+        finally:
+            conn.close()
+        print(f"{region}: {'OK' if not found else f'{len(found)} mismatched weeks'}")
+        problems += found
+
+    for problem in problems:
+        print("  ", problem)
+    sys.exit(1 if problems else 0)
@@ -12,6 +12,34 @@ import {
   ChevronRight
 } from "lucide-react";
 
+const transformResources = (data) => ({
+  icu_beds: {
+    available: data.available_icu_beds,
+    total: data.icu_beds,
+    utilization: Math.round((1 - data.available_icu_beds / data.icu_beds) * 100)
+  },
+  ventilators: {
+    available: data.available_ventilators,
+    total: data.total_ventilators,
+    utilization: Math.round((1 - data.available_ventilators / data.total_ventilators) * 100)
+  },
+  oxygen_cylinders: {
+    available: data.available_oxygen_cylinders,
+    total: data.total_oxygen_cylinders,
+    utilization: Math.round((1 - data.available_oxygen_cylinders / data.total_oxygen_cylinders) * 100)
+  },
+  doctors: {
+    available: data.available_doctors,
+    total: data.total_doctors,
+    utilization: Math.round((1 - data.available_doctors / data.total_doctors) * 100)
+  },
+  nurses: {
+    available: data.available_nurses,
+    total: data.total_nurses,
+    utilization: Math.round((1 - data.available_nurses / data.total_nurses) * 100)
+  }
+});
+
 const CovidDashboard = () => {
   const [nationalData, setNationalData] = useState(null);
   const [districtSummary, setDistrictSummary] = useState(null);
@@ -28,82 +56,35 @@ const CovidDashboard = () => {
   };
 
   useEffect(() => {
-    // fetch national covid data
-    fetch("http://localhost:8002/api/national/summary")
-      .then((res) => res.json())
-      .then((data) => setNationalData(data))
-      .catch((err) => console.error("Failed to fetch national data", err));
-
-    // fetch district covid data
-    fetch("http://localhost:8002/api/district/bangalore/summary")
-      .then((res) => res.json())
-      .then((data) => setDistrictSummary(data))
-      .catch((err) => console.error("Failed to fetch district data", err));
-
-    // Fetch forecasted cases
-    fetch("http://localhost:8002/api/predict")
+    // One request for every panel; failed or timed-out sections are skipped
+    fetch("http://localhost:8002/api/dashboard/covid")
       .then((res) => res.json())
-      .then((data) => setForecast(data.predictions))
-      .catch((err) => console.error("Failed to fetch forecast", err));
+      .then(({ sections }) => {
+        const ok = (name) => sections[name] && sections[name].status === "ok";
 
-    // fetch forecast graph
-    fetch("http://localhost:8002/api/forecast_plot")
-      .then((res) => res.json())
-      .then((data) => {
-        if (data.image_base64) {
-          setPlotImage(`data:image/png;base64,${data.image_base64}`);
-        }
+        if (ok("national_summary")) setNationalData(sections.national_summary.data);
+        if (ok("district_summary")) setDistrictSummary(sections.district_summary.data);
+        if (ok("predictions")) setForecast(sections.predictions.data);
+        if (ok("forecast_plot")) setPlotImage(`data:image/png;base64,${sections.forecast_plot.data}`);
+        if (ok("overload_risk")) setOverloadData(sections.overload_risk.data);
+        else console.error("Overload API error:", sections.overload_risk);
+        if (ok("resources_latest")) setHospitalData(transformResources(sections.resources_latest.data));
         setLoading(false);
       })
       .catch((err) => {
-        console.error("Failed to fetch dengue plot", err);
+        console.error("Failed to fetch dashboard", err);
         setLoading(false);
       });
+  }, []);
 
-      // fetch overload
-      fetch("http://localhost:8002/api/overload/overload_risk")
-      .then((res) => {
-        if (!res.ok) throw new Error("Failed to fetch overload data");
-        return res.json();
-      })
-      .then((data) => setOverloadData(data))
-      .catch((err) => console.error("Overload API error:", err));
-
-
-     // fetch hospital resources
-     fetch('http://localhost:8002/api/resources/hospital-resources/latest')
-    .then(response => response.json())
-    .then(data => {
-      const transformed = {
-        icu_beds: {
-          available: data.available_icu_beds,
-          total: data.icu_beds,
-          utilization: Math.round((1 - data.available_icu_beds / data.icu_beds) * 100)
-        },
-        ventilators: {
-          available: data.available_ventilators,
-          total: data.total_ventilators,
-          utilization: Math.round((1 - data.available_ventilators / data.total_ventilators) * 100)
-        },
-        oxygen_cylinders: {
-          available: data.available_oxygen_cylinders,
-          total: data.total_oxygen_cylinders,
-          utilization: Math.round((1 - data.available_oxygen_cylinders / data.total_oxygen_cylinders) * 100)
-        },
-        doctors: {
-          available: data.available_doctors,
-          total: data.total_doctors,
-          utilization: Math.round((1 - data.available_doctors / data.total_doctors) * 100)
-        },
-        nurses: {
-          available: data.available_nurses,
-          total: data.total_nurses,
-          utilization: Math.round((1 - data.available_nurses / data.total_nurses) * 100)
-        }
-      };
-      setHospitalData(transformed);
-    })
-    .catch(error => console.error("Failed to fetch hospital resource data:", error));
+  useEffect(() => {
+    // Overload risk is pushed whenever resources or forecasts change
+    const source = new EventSource("http://localhost:8002/api/overload/stream");
+    source.addEventListener("overload", (event) => {
+      const update = JSON.parse(event.data);
+      if (update.status === "ok") setOverloadData(update);
+    });
+    return () => source.close();
   }, []);
 
   const getRiskColor = (risk) => {
@@ -1,6 +1,34 @@
 import React, { useEffect, useState } from "react";
 import { AlertTriangle, Activity, TrendingUp, Users, Bed, Zap, Heart, UserCheck, Calendar, MapPin, ChevronRight } from "lucide-react";
 
+const transformResources = (data) => ({
+  icu_beds: {
+    available: data.available_icu_beds,
+    total: data.icu_beds,
+    utilization: Math.round((1 - data.available_icu_beds / data.icu_beds) * 100)
+  },
+  ventilators: {
+    available: data.available_ventilators,
+    total: data.total_ventilators,
+    utilization: Math.round((1 - data.available_ventilators / data.total_ventilators) * 100)
+  },
+  oxygen_cylinders: {
+    available: data.available_oxygen_cylinders,
+    total: data.total_oxygen_cylinders,
+    utilization: Math.round((1 - data.available_oxygen_cylinders / data.total_oxygen_cylinders) * 100)
+  },
+  doctors: {
+    available: data.available_doctors,
+    total: data.total_doctors,
+    utilization: Math.round((1 - data.available_doctors / data.total_doctors) * 100)
+  },
+  nurses: {
+    available: data.available_nurses,
+    total: data.total_nurses,
+    utilization: Math.round((1 - data.available_nurses / data.total_nurses) * 100)
+  }
+});
+
 const Dengue_Dashboard = () => {
   const [currentCases, setCurrentCases] = useState([]);
   const [forecast, setForecast] = useState([]);
@@ -23,75 +51,35 @@ const Dengue_Dashboard = () => {
 
 
   useEffect(() => {
-    // Fetch current dengue cases
-    fetch("http://localhost:8002/api/dengue/current")
-      .then((res) => res.json())
-      .then((data) => setCurrentCases(data))
-      .catch((err) => console.error("Failed to fetch current dengue cases", err));
-
-    // Fetch forecasted cases
-    fetch("http://localhost:8002/api/dengue/predict")
+    // One request for every panel; failed or timed-out sections are skipped
+    fetch("http://localhost:8002/api/dashboard/dengue")
       .then((res) => res.json())
-      .then((data) => setForecast(data))
-      .catch((err) => console.error("Failed to fetch forecast", err));
+      .then(({ sections }) => {
+        const ok = (name) => sections[name] && sections[name].status === "ok";
 
-    // Fetch forecast plot (base64 image)
-    fetch("http://localhost:8002/api/dengue/plot_base64")
-      .then((res) => res.json())
-      .then((data) => {
-        if (data.image) {
-          setPlotImage(`data:image/png;base64,${data.image}`);
-        }
+        if (ok("current_cases")) setCurrentCases(sections.current_cases.data);
+        if (ok("predictions")) setForecast(sections.predictions.data);
+        if (ok("forecast_plot")) setPlotImage(`data:image/png;base64,${sections.forecast_plot.data}`);
+        if (ok("resources_latest")) setCurrentData(transformResources(sections.resources_latest.data));
+        if (ok("overload_risk")) setOverloadData(sections.overload_risk.data);
+        else console.error("Overload API error:", sections.overload_risk);
         setLoading(false);
       })
       .catch((err) => {
-        console.error("Failed to fetch dengue plot", err);
+        console.error("Failed to fetch dashboard", err);
         setLoading(false);
       });
-      // fetch hospital resources
-     fetch('http://localhost:8002/api/resources/hospital-resources/latest')
-    .then(response => response.json())
-    .then(data => {
-      const transformed = {
-        icu_beds: {
-          available: data.available_icu_beds,
-          total: data.icu_beds,
-          utilization: Math.round((1 - data.available_icu_beds / data.icu_beds) * 100)
-        },
-        ventilators: {
-          available: data.available_ventilators,
-          total: data.total_ventilators,
-          utilization: Math.round((1 - data.available_ventilators / data.total_ventilators) * 100)
-        },
-        oxygen_cylinders: {
-          available: data.available_oxygen_cylinders,
-          total: data.total_oxygen_cylinders,
-          utilization: Math.round((1 - data.available_oxygen_cylinders / data.total_oxygen_cylinders) * 100)
-        },
-        doctors: {
-          available: data.available_doctors,
-          total: data.total_doctors,
-          utilization: Math.round((1 - data.available_doctors / data.total_doctors) * 100)
-        },
-        nurses: {
-          available: data.available_nurses,
-          total: data.total_nurses,
-          utilization: Math.round((1 - data.available_nurses / data.total_nurses) * 100)
-        }
-      };
-      setCurrentData(transformed);
-    })
-    .catch(error => console.error("Failed to fetch hospital resource data:", error));
 
-    // fetch overload
-    fetch("http://localhost:8002/api/overload/overload_risk")
-    .then((res) => {
-      if (!res.ok) throw new Error("Failed to fetch overload data");
-      return res.json();
-    })
-    .then((data) => setOverloadData(data))
-    .catch((err) => console.error("Overload API error:", err));
+  }, []);
 
+  useEffect(() => {
+    // Overload risk is pushed whenever resources or forecasts change
+    const source = new EventSource("http://localhost:8002/api/overload/stream");
+    source.addEventListener("overload", (event) => {
+      const update = JSON.parse(event.data);
+      if (update.status === "ok") setOverloadData(update);
+    });
+    return () => source.close();
   }, []);
 
   const getRiskColor = (risk) => {